@@ -0,0 +1,39 @@
+"""user_list_counters
+
+Revision ID: 20241201_0004
+Revises: 20241109_0003
+Create Date: 2024-12-01 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20241201_0004"
+down_revision = "20241109_0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("jobs_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+    op.add_column(
+        "users",
+        sa.Column("ledger_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+    op.execute(
+        """
+        UPDATE users SET
+            jobs_count = (SELECT count(*) FROM jobs WHERE jobs.user_id = users.id),
+            ledger_count = (
+                SELECT count(*) FROM credit_ledger WHERE credit_ledger.user_id = users.id
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "ledger_count")
+    op.drop_column("users", "jobs_count")
@@ -0,0 +1,72 @@
+"""hot_query_indexes
+
+Revision ID: 20241215_0005
+Revises: 20241201_0004
+Create Date: 2024-12-15 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20241215_0005"
+down_revision = "20241201_0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_jobs_user_id_created_at",
+            "jobs",
+            ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_jobs_done_updated_at",
+            "jobs",
+            ["updated_at"],
+            postgresql_where=sa.text("status = 'done'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_credit_ledger_user_id_created_at",
+            "credit_ledger",
+            ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_credit_ledger_job_id_reason",
+            "credit_ledger",
+            ["job_id", "reason"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_uploads_expires_at",
+            "uploads",
+            ["expires_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table_name, index_name in (
+            ("uploads", "ix_uploads_expires_at"),
+            ("credit_ledger", "ix_credit_ledger_job_id_reason"),
+            ("credit_ledger", "ix_credit_ledger_user_id_created_at"),
+            ("jobs", "ix_jobs_done_updated_at"),
+            ("jobs", "ix_jobs_user_id_created_at"),
+        ):
+            op.drop_index(
+                index_name,
+                table_name=table_name,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,40 @@
+"""job_dispatch_outbox
+
+Revision ID: 20241222_0006
+Revises: 20241215_0005
+Create Date: 2024-12-22 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20241222_0006"
+down_revision = "20241215_0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("dispatched_at", sa.DateTime(timezone=True), nullable=True))
+    # Jobs that already exist were enqueued by the old synchronous path.
+    op.execute("UPDATE jobs SET dispatched_at = created_at")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_jobs_undispatched_created_at",
+            "jobs",
+            ["created_at"],
+            postgresql_where=sa.text("dispatched_at IS NULL"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_jobs_undispatched_created_at",
+            table_name="jobs",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("jobs", "dispatched_at")
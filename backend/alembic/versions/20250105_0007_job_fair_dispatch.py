@@ -0,0 +1,36 @@
+"""job_fair_dispatch
+
+Revision ID: 20250105_0007
+Revises: 20241222_0006
+Create Date: 2025-01-05 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20250105_0007"
+down_revision = "20241222_0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_jobs_active_user_id_created_at",
+            "jobs",
+            ["user_id", "created_at"],
+            postgresql_where=sa.text("status IN ('queued', 'processing')"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_jobs_active_user_id_created_at",
+            table_name="jobs",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,48 @@
+"""job_provider_requests
+
+Revision ID: 20250112_0008
+Revises: 20250105_0007
+Create Date: 2025-01-12 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20250112_0008"
+down_revision = "20250105_0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("jobs", sa.Column("provider_request_id", sa.String(length=128), nullable=True))
+    op.add_column(
+        "jobs", sa.Column("provider_submitted_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.add_column("jobs", sa.Column("provider_status", sa.String(length=32), nullable=True))
+    # Jobs processing during the deploy count as alive since they started.
+    op.execute("UPDATE jobs SET heartbeat_at = started_at WHERE status = 'processing'")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_jobs_processing_heartbeat_at",
+            "jobs",
+            ["heartbeat_at"],
+            postgresql_where=sa.text("status = 'processing'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_jobs_processing_heartbeat_at",
+            table_name="jobs",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("jobs", "provider_status")
+    op.drop_column("jobs", "provider_submitted_at")
+    op.drop_column("jobs", "provider_request_id")
+    op.drop_column("jobs", "heartbeat_at")
@@ -0,0 +1,25 @@
+"""job_retry_attempts
+
+Revision ID: 20250119_0009
+Revises: 20250112_0008
+Create Date: 2025-01-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20250119_0009"
+down_revision = "20250112_0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "jobs",
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("jobs", "attempts")
@@ -1,9 +1,13 @@
 import logging
+import uuid
 
+import jwt
 from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.identity_cache import CachedIdentity, get_telegram_identity_cache, profile_hash
 from app.auth.telegram import TelegramInitDataError, verify_init_data
+from app.auth.tokens import decode_token, session_tokens_enabled
 from app.core.models.user import User
 from app.core.repositories.users import UserRepository
 from app.core.settings import get_settings
@@ -18,6 +22,41 @@ async def get_current_user(
     request: Request,
     session: AsyncSession = Depends(get_session),
 ) -> User:
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return user_from_session_token(token)
+    return await get_telegram_user(request, session)
+
+
+def user_from_session_token(token: str) -> User:
+    """Build the caller from a session token issued by ``POST /auth/telegram``.
+
+    The token already carries everything routes need from the user, so the
+    returned ``User`` is transient: no initData check and no database access.
+    """
+    if not session_tokens_enabled():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired session token.",
+        )
+    try:
+        claims = decode_token(token)
+        user_id = uuid.UUID(str(claims["user_id"]))
+    except (jwt.PyJWTError, KeyError, ValueError):
+        logger.warning("auth_failed reason=session_token_invalid")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired session token.",
+        )
+    return User(
+        id=user_id,
+        platform=claims.get("platform") or "telegram",
+        platform_user_id=str(claims.get("platform_user_id") or ""),
+    )
+
+
+async def get_telegram_user(request: Request, session: AsyncSession) -> User:
     init_data = request.headers.get("X-Telegram-Init-Data")
     if not init_data:
         logger.warning(
@@ -72,10 +111,24 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid Telegram initData signature.",
         )
+    cache = get_telegram_identity_cache()
+    cache_key = str(platform_user_id).strip()
+    current_hash = profile_hash(user_payload)
+    cached = await cache.get(cache_key)
+    if cached is not None and cached.profile_hash == current_hash:
+        return User(
+            id=cached.user_id,
+            platform="telegram",
+            platform_user_id=cache_key,
+            username=user_payload.get("username"),
+            first_name=user_payload.get("first_name"),
+            last_name=user_payload.get("last_name"),
+        )
     repo = UserRepository(session)
     user, changed = await repo.get_or_create_from_telegram(user_payload)
     if changed:
         await session.commit()
+    await cache.set(cache_key, CachedIdentity(user.id, current_hash))
     return user
 
 
@@ -86,5 +139,6 @@ async def get_admin_user(user: User = Depends(get_current_user)) -> User:
     return user
 
 
-def get_rq_queue():
-    return get_queue()
+def get_rq_queues():
+    """Factory for RQ queues by name, so each job can be routed to its class."""
+    return get_queue
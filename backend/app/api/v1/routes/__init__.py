@@ -1,3 +1,3 @@
-from app.api.v1.routes import admin, billing, credits, files, health, jobs, presets
+from app.api.v1.routes import admin, auth, billing, credits, files, health, jobs, presets, providers
 
-__all__ = ["admin", "billing", "credits", "files", "health", "jobs", "presets"]
+__all__ = ["admin", "auth", "billing", "credits", "files", "health", "jobs", "presets", "providers"]
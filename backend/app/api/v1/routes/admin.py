@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, Header, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.deps import get_admin_user
+from app.auth.identity_cache import get_telegram_identity_cache
 from app.core.repositories.credits import CreditRepository
 from app.core.repositories.users import UserRepository
 from app.core.schemas.credits import (
@@ -33,6 +34,7 @@ async def add_credits(
     credits = CreditRepository(session)
     await credits.create_tx(user.id, delta=payload.amount, reason="admin_topup")
     await session.commit()
+    await get_telegram_identity_cache().invalidate(str(payload.platform_user_id))
     balance = await credits.get_balance(user.id)
     return AdminCreditAddResponse(platform_user_id=payload.platform_user_id, balance=balance)
 
@@ -61,6 +63,7 @@ async def admin_topup(
     credits = CreditRepository(session)
     tx = await credits.create_tx(user.id, delta=payload.amount, reason=payload.reason)
     await session.commit()
+    await get_telegram_identity_cache().invalidate(platform_user_id)
     balance = await credits.get_balance(user.id)
     return AdminTopupResponse(
         ok=True, user_id=payload.user_id, new_balance=balance, ledger_id=tx.id
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.deps import get_telegram_user
+from app.auth.tokens import create_access_token, session_tokens_enabled
+from app.core.schemas import SessionTokenOut
+from app.core.settings import get_settings
+from app.db import get_session
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+
+
+@router.post("/telegram", response_model=SessionTokenOut)
+async def exchange_telegram_init_data(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+):
+    settings = get_settings()
+    if not session_tokens_enabled():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="session_tokens_disabled"
+        )
+    user = await get_telegram_user(request, session)
+    token = create_access_token(
+        {
+            "user_id": str(user.id),
+            "platform": user.platform,
+            "platform_user_id": user.platform_user_id,
+        }
+    )
+    return SessionTokenOut(
+        access_token=token,
+        expires_in=settings.jwt_exp_minutes * 60,
+        user_id=user.id,
+    )
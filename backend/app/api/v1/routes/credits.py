@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.deps import get_current_user
+from app.core.pagination import InvalidCursorError
 from app.core.repositories.credits import CreditRepository
 from app.core.schemas import CreditBalance, CreditLedgerList
 from app.db import get_session
@@ -22,21 +23,30 @@ async def get_balance(
 async def list_ledger(
     limit: int = 20,
     offset: int = 0,
+    cursor: str | None = None,
     user=Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
-    repo = CreditRepository(session)
-    items, total = await repo.list_tx(user.id, limit, offset)
-    return CreditLedgerList(items=items, total=total)
+    return await _list_ledger_page(session, user.id, limit, offset, cursor)
 
 
 @router.get("/tx", response_model=CreditLedgerList)
 async def list_transactions(
     limit: int = 20,
     offset: int = 0,
+    cursor: str | None = None,
     user=Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
+    return await _list_ledger_page(session, user.id, limit, offset, cursor)
+
+
+async def _list_ledger_page(
+    session: AsyncSession, user_id, limit: int, offset: int, cursor: str | None
+) -> CreditLedgerList:
     repo = CreditRepository(session)
-    items, total = await repo.list_tx(user.id, limit, offset)
-    return CreditLedgerList(items=items, total=total)
+    try:
+        items, total, next_cursor = await repo.list_tx(user_id, limit, offset, cursor=cursor)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return CreditLedgerList(items=items, total=total, next_cursor=next_cursor)
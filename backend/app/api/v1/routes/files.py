@@ -1,7 +1,11 @@
+import mimetypes
+import os
 import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.deps import get_current_user
@@ -11,11 +15,16 @@ from app.db import get_session
 
 router = APIRouter(prefix="/files", tags=["files"])
 
+# Stored filenames are random or content hashes and are never rewritten.
+CACHE_CONTROL = "private, max-age=31536000, immutable"
+RANGE_CHUNK_SIZE = 64 * 1024
+
 
 @router.get("/{job_id}/{filename}")
 async def get_job_file(
     job_id: uuid.UUID,
     filename: str,
+    request: Request,
     user=Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
@@ -23,9 +32,17 @@ async def get_job_file(
     job = await repo.get_job(job_id)
     if not job or job.user_id != user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="job_not_found")
+    stored_file = None
     if job.result_files:
-        allowed = {item.get("filename") for item in job.result_files if isinstance(item, dict)}
-        if filename not in allowed:
+        stored_file = next(
+            (
+                item
+                for item in job.result_files
+                if isinstance(item, dict) and item.get("filename") == filename
+            ),
+            None,
+        )
+        if stored_file is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="file_not_found")
 
     file_path = resolve_job_file_path(str(job_id), filename)
@@ -38,4 +55,97 @@ async def get_job_file(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="file_not_found")
     if not resolved_path.exists() or not resolved_path.is_file():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="file_not_found")
-    return FileResponse(resolved_path)
+
+    stat = resolved_path.stat()
+    sha256 = stored_file.get("sha256") if stored_file else None
+    etag = f'"{sha256}"' if sha256 else f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    if _is_not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    if range_header and (not if_range or if_range == etag):
+        byte_range = _parse_range(range_header, stat.st_size)
+        if byte_range is False:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "Content-Range": f"bytes */{stat.st_size}"},
+            )
+        if byte_range is not None:
+            start, end = byte_range
+            return StreamingResponse(
+                _iter_file_range(resolved_path, start, end),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type=_media_type(resolved_path),
+                headers={
+                    **headers,
+                    "Content-Range": f"bytes {start}-{end}/{stat.st_size}",
+                    "Content-Length": str(end - start + 1),
+                },
+            )
+    return FileResponse(resolved_path, headers=headers, stat_result=stat)
+
+
+def _is_not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("If-Modified-Since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return int(mtime) <= since.timestamp()
+    return False
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None | bool:
+    """Parse a single ``bytes=`` range.
+
+    Returns ``(start, end)`` inclusive, ``None`` when the header should be
+    ignored (malformed or multi-range, answered with the whole file) and
+    ``False`` when the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_value, sep, end_value = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not start_value:
+            suffix_length = int(end_value)
+            if suffix_length <= 0:
+                return False
+            return max(size - suffix_length, 0), size - 1
+        start = int(start_value)
+        end = int(end_value) if end_value else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def _iter_file_range(path: Path, start: int, end: int):
+    with path.open("rb") as handle:
+        handle.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = handle.read(min(RANGE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _media_type(path: Path) -> str:
+    return mimetypes.guess_type(os.fspath(path))[0] or "application/octet-stream"
@@ -1,34 +1,88 @@
 import datetime as dt
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
+from types import SimpleNamespace
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.v1.deps import get_current_user, get_rq_queue
+from app.api.v1.deps import get_current_user, get_rq_queues
+from app.core.job_events import (
+    TERMINAL_STATUSES,
+    JobEventSubscription,
+    build_job_event,
+    format_sse,
+    get_cached_job_status,
+    job_channel,
+    publish_job_cancel,
+    publish_job_event,
+    user_channel,
+    wait_for_terminal_job,
+)
+from app.core.pagination import InvalidCursorError
 from app.core.repositories.credits import CreditRepository
 from app.core.repositories.jobs import JobRepository
-from app.core.schemas import JobCreate, JobDetailOut, JobList, JobResultOut, JobSummaryOut
+from app.core.schemas import (
+    JobCreate,
+    JobDetailOut,
+    JobList,
+    JobResultOut,
+    JobStatusList,
+    JobStatusOut,
+    JobSummaryOut,
+)
 from app.core.services.jobs import InsufficientCreditsError, JobService
-from app.db import get_session
-from app.workers.tasks import run_job
+from app.core.settings import get_settings
+from app.db import async_session, get_session
+from app.providers.genapi.breaker import get_genapi_breaker
+from app.workers.tasks import (
+    cancel_provider_request,
+    dispatch_user_backlog,
+    enqueue_job,
+    expected_job_seconds,
+    release_cancelled_job,
+    resolve_network_id,
+)
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
 
-async def _ensure_job_owner(job_id: uuid.UUID, user_id: uuid.UUID, session: AsyncSession) -> None:
-    repo = JobRepository(session)
-    job = await repo.get_job(job_id)
+async def _load_owned_job(session: AsyncSession, job_id: uuid.UUID, user_id: uuid.UUID):
+    job = await JobRepository(session).get_job(job_id)
     if not job or job.user_id != user_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="job_not_found")
+    return job
 
 
 @router.post("", response_model=JobDetailOut, status_code=status.HTTP_201_CREATED)
 async def create_job(
     payload: JobCreate,
+    response: Response,
     user=Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
-    queue=Depends(get_rq_queue),
+    get_queue=Depends(get_rq_queues),
 ):
+    open_for_s = await get_genapi_breaker().open_for(
+        resolve_network_id(payload.type, payload.payload)
+    )
+    if open_for_s > 0:
+        retry_after = str(max(1, round(open_for_s)))
+        if get_settings().genapi_breaker_reject_jobs:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="provider_unavailable",
+                headers={"Retry-After": retry_after},
+            )
+        response.headers["Warning"] = '199 - "provider_unavailable"'
+        response.headers["Retry-After"] = retry_after
     service = JobService(session)
     try:
         job = await service.create_job_with_charge(user.id, payload.type, payload.payload)
@@ -37,8 +91,109 @@ async def create_job(
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
-    queue.enqueue(run_job, str(job.id), result_ttl=86400)
-    return JobDetailOut.model_validate(job, from_attributes=True)
+    await enqueue_job(get_queue, session, job)
+    await publish_job_event(job)
+    created = JobDetailOut.model_validate(job, from_attributes=True)
+    created.eta_seconds = await _eta_seconds(job.type, job.payload)
+    if job.status == "queued":
+        created.own_jobs_ahead = await JobRepository(session).own_jobs_ahead(job)
+    return created
+
+
+@router.get("/status", response_model=JobStatusList)
+async def get_job_statuses(
+    ids: str = Query(..., description="Comma-separated job ids"),
+    since: dt.datetime | None = None,
+    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Statuses of several jobs at once; with ``since`` only jobs updated after it."""
+    try:
+        job_ids = list(
+            dict.fromkeys(uuid.UUID(value.strip()) for value in ids.split(",") if value.strip())
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_job_id") from exc
+    if len(job_ids) > get_settings().jobs_status_max_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="too_many_ids")
+    server_time = dt.datetime.utcnow()
+    jobs = await JobRepository(session).list_statuses(user.id, job_ids, since) if job_ids else []
+    return JobStatusList(
+        items=[
+            JobStatusOut(
+                id=job.id,
+                status=job.status,
+                updated_at=job.updated_at,
+                error=job.error,
+                result_summary=_summarize_result(job.result) if job.status == "done" else None,
+            )
+            for job in jobs
+        ],
+        server_time=server_time,
+    )
+
+
+def _summarize_result(result: dict | None) -> dict | None:
+    if not result:
+        return None
+    items = [item for item in result.get("items") or [] if isinstance(item, dict)]
+    first_file = next((item for item in items if item.get("kind") == "file"), None)
+    return {
+        "type": result.get("type"),
+        "items": len(items),
+        "preview_url": first_file.get("url") if first_file else None,
+    }
+
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+@router.get("/events")
+async def stream_user_job_events(request: Request):
+    """Server-Sent Events for every job of the caller, as their status changes."""
+    # Authenticate with a short-lived session so the stream never pins a DB connection.
+    async with async_session() as session:
+        user = await get_current_user(request, session)
+
+    async def events():
+        async with JobEventSubscription(
+            [user_channel(user.id)], get_settings().jobs_events_heartbeat_seconds
+        ) as subscription:
+            yield format_sse(None)
+            async for event in subscription:
+                if await request.is_disconnected():
+                    return
+                yield format_sse(event)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(job_id: uuid.UUID, request: Request):
+    """Server-Sent Events for one job; the stream ends after its terminal event."""
+    async with async_session() as session:
+        user = await get_current_user(request, session)
+        await _load_owned_job(session, job_id, user.id)
+
+    async def events():
+        async with JobEventSubscription(
+            [job_channel(job_id)], get_settings().jobs_events_heartbeat_seconds
+        ) as subscription:
+            # Subscribe before reading the snapshot so no transition falls in between.
+            async with async_session() as session:
+                job = await JobRepository(session).get_job(job_id)
+            snapshot = build_job_event(job)
+            yield format_sse(snapshot)
+            if snapshot["status"] in TERMINAL_STATUSES:
+                return
+            async for event in subscription:
+                if await request.is_disconnected():
+                    return
+                yield format_sse(event)
+                if event and event.get("status") in TERMINAL_STATUSES:
+                    return
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 
 @router.get("/{job_id}", response_model=JobDetailOut)
@@ -47,6 +202,18 @@ async def get_job(
     user=Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
+    cached = await _cached_active_status(job_id, user.id)
+    # Queued jobs go to the DB, which knows their queue position.
+    if cached is not None and cached["status"] != "queued":
+        return JobDetailOut(
+            id=job_id,
+            kind=cached["kind"],
+            status=cached["status"],
+            created_at=cached["created_at"],
+            params=cached.get("params") or {},
+            error=cached.get("error"),
+            eta_seconds=await _eta_seconds(cached["kind"], cached.get("params") or {}),
+        )
     repo = JobRepository(session)
     job = await repo.get_job(job_id)
     if not job or job.user_id != user.id:
@@ -55,20 +222,65 @@ async def get_job(
     if payload.status != "done":
         payload.result = None
         payload.result_files = None
+    if payload.status not in TERMINAL_STATUSES:
+        payload.eta_seconds = await _eta_seconds(job.type, job.payload)
+    if payload.status == "queued":
+        payload.own_jobs_ahead = await repo.own_jobs_ahead(job)
     return payload
 
 
 @router.get("/{job_id}/result", response_model=JobResultOut)
 async def get_job_result(
     job_id: uuid.UUID,
-    user=Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    request: Request,
+    wait: float = Query(default=0, ge=0),
 ):
-    await _ensure_job_owner(job_id, user.id, session)
-    repo = JobRepository(session)
-    job = await repo.get_job(job_id)
-    if not job:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="job_not_found")
+    """Return the job result, optionally long-polling up to ``wait`` seconds for it.
+
+    While parked the request holds no DB session: it only listens for the
+    job's terminal event and re-reads the row once that arrives or ``wait``
+    runs out.
+    """
+    async with async_session() as session:
+        user = await get_current_user(request, session)
+        cached = await _cached_active_status(job_id, user.id)
+        if cached is not None:
+            job = SimpleNamespace(status=cached["status"], error=cached.get("error"))
+        else:
+            job = await _load_owned_job(session, job_id, user.id)
+    wait = min(wait, get_settings().jobs_result_max_wait_seconds)
+    if job.status in TERMINAL_STATUSES or wait <= 0:
+        return _job_result_response(job)
+
+    async def reload_job():
+        async with async_session() as session:
+            return await JobRepository(session).get_job(job_id)
+
+    job = await wait_for_terminal_job(job_id, wait, reload_job) or job
+    return _job_result_response(job)
+
+
+async def _eta_seconds(job_type: str, params: dict) -> int | None:
+    eta_s = await expected_job_seconds(job_type, params)
+    return round(eta_s) if eta_s else None
+
+
+async def _cached_active_status(job_id: uuid.UUID, user_id: uuid.UUID) -> dict | None:
+    """The hot status record of an unfinished job owned by ``user_id``, if cached.
+
+    Terminal jobs always go to Postgres, which holds their result.
+    """
+    cached = await get_cached_job_status(job_id)
+    if (
+        cached is None
+        or cached.get("user_id") != str(user_id)
+        or cached.get("status") in TERMINAL_STATUSES
+    ):
+        return None
+    return cached
+
+
+def _job_result_response(job):
     if job.status == "error":
         return JobResultOut(status="error", error=job.error)
     if job.status != "done":
@@ -84,20 +296,26 @@ async def list_jobs(
     mine: bool = True,
     limit: int = 20,
     offset: int = 0,
+    cursor: str | None = None,
     user=Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
     repo = JobRepository(session)
-    items, total = await repo.list_jobs(user.id, limit, offset)
+    try:
+        items, total, next_cursor = await repo.list_jobs(user.id, limit, offset, cursor=cursor)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     summaries = [JobSummaryOut.model_validate(item, from_attributes=True) for item in items]
-    return JobList(items=summaries, total=total)
+    return JobList(items=summaries, total=total, next_cursor=next_cursor)
 
 
 @router.post("/{job_id}/cancel", response_model=JobDetailOut)
 async def cancel_job(
     job_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
     user=Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
+    get_queue=Depends(get_rq_queues),
 ):
     repo = JobRepository(session)
     job = await repo.get_job(job_id)
@@ -105,14 +323,19 @@ async def cancel_job(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="job_not_found")
     if job.status not in {"queued", "processing"}:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="cannot_cancel")
-    job.status = "error"
-    job.error = "Canceled"
-    job.finished_at = dt.datetime.utcnow()
-    await session.commit()
+    if not await repo.mark_cancelled(job, dt.datetime.utcnow()):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="cannot_cancel")
+    await publish_job_event(job)
+    await publish_job_cancel(job.id)
     if job.cost:
         credits = CreditRepository(session)
         refunded = await credits.has_job_reason(job.id, "job_refund")
         if not refunded:
             await credits.create_tx(user.id, delta=job.cost, reason="job_refund", job_id=job.id)
             await session.commit()
+    timeout_s = get_settings().jobs_enqueue_timeout_seconds
+    await release_cancelled_job(get_queue, job, timeout_s=timeout_s)
+    # A worker running the job asks too; this covers jobs waiting on a callback.
+    background_tasks.add_task(cancel_provider_request, job.provider_request_id)
+    await dispatch_user_backlog(session, user.id, get_queue, timeout_s=timeout_s)
     return JobDetailOut.model_validate(job, from_attributes=True)
@@ -2,10 +2,18 @@ from fastapi import APIRouter
 
 from app.core.presets import list_presets
 from app.core.schemas import PresetList
+from app.workers.tasks import expected_job_seconds
 
 router = APIRouter(prefix="/presets", tags=["presets"])
 
 
 @router.get("", response_model=PresetList)
 async def get_presets():
-    return PresetList(items=list_presets())
+    """Presets with ``eta_seconds`` replaced by the duration learned for their network."""
+    items = list_presets()
+    for item in items:
+        payload = {"network_id": item["network_id"]}
+        eta_s = await expected_job_seconds(item["job_type"], payload)
+        if eta_s:
+            item["eta_seconds"] = round(eta_s)
+    return PresetList(items=items)
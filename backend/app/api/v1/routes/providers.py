@@ -0,0 +1,62 @@
+import logging
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.job_files import ResultDownloadError
+from app.core.repositories.jobs import JobRepository
+from app.db import get_session
+from app.providers.genapi.callbacks import verify_callback_token
+from app.providers.genapi.client import is_terminal_status
+from app.workers.tasks import complete_job, fail_job
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/providers", tags=["providers"])
+
+
+@router.post("/genapi/callback/{job_id}")
+async def genapi_callback(
+    job_id: uuid.UUID,
+    request: Request,
+    token: str | None = None,
+    session: AsyncSession = Depends(get_session),
+):
+    if not verify_callback_token(str(job_id), token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
+    try:
+        payload = await request.json()
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_payload") from exc
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_payload")
+
+    repo = JobRepository(session)
+    job = await repo.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="job_not_found")
+    request_id = payload.get("request_id") or payload.get("id")
+    # The token only proves the URL came from us; the payload must also be
+    # about the request this job is waiting on.
+    if request_id is None or str(request_id) != job.provider_request_id:
+        logger.warning(
+            "GenAPI callback job=%s request_id=%s does not match %s",
+            job_id,
+            request_id,
+            job.provider_request_id,
+        )
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="request_mismatch")
+    if job.status in {"done", "error"} or not is_terminal_status(payload):
+        return {"ok": True, "status": job.status}
+
+    logger.info("GenAPI callback job=%s request_id=%s status=%s", job_id, request_id, payload.get("status"))
+    try:
+        await complete_job(session, job, payload)
+    except ResultDownloadError as exc:
+        # The job stays processing; its safety poll fetches the result again.
+        logger.warning("Job %s result download failed: %s", job_id, exc)
+    except Exception as exc:
+        logger.exception("Job %s failed", job_id, exc_info=exc)
+        await fail_job(session, job, exc)
+    return {"ok": True, "status": job.status}
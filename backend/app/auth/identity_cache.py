@@ -0,0 +1,124 @@
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.core.redis import get_async_redis
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "pelicanone:identity"
+
+
+@dataclass(frozen=True)
+class CachedIdentity:
+    user_id: uuid.UUID
+    profile_hash: str
+
+
+def profile_hash(user_payload: dict) -> str:
+    profile = [user_payload.get(key) for key in ("username", "first_name", "last_name")]
+    return hashlib.sha256(json.dumps(profile).encode()).hexdigest()
+
+
+class UserIdentityCache:
+    """Two-tier cache from a platform user id to the user's UUID and profile hash.
+
+    Lookups hit a bounded in-process LRU first and Redis second. Invalidation
+    clears this process and Redis; other processes drop their local copy when
+    its (short) TTL runs out. Only identity is cached, never the balance.
+    """
+
+    def __init__(
+        self,
+        platform: str,
+        max_size: int,
+        local_ttl_s: float,
+        redis_ttl_s: int,
+        redis_factory=get_async_redis,
+    ) -> None:
+        self.platform = platform
+        self.max_size = max(1, max_size)
+        self.local_ttl_s = local_ttl_s
+        self.redis_ttl_s = redis_ttl_s
+        self._redis_factory = redis_factory
+        self._local: OrderedDict[str, tuple[float, CachedIdentity]] = OrderedDict()
+
+    async def get(self, platform_user_id: str) -> CachedIdentity | None:
+        entry = self._get_local(platform_user_id)
+        if entry is not None:
+            return entry
+        try:
+            raw = await self._redis_factory().get(self._redis_key(platform_user_id))
+        except Exception as exc:
+            logger.warning("identity cache: redis get failed: %s", exc)
+            return None
+        if not raw:
+            return None
+        try:
+            data = json.loads(raw)
+            entry = CachedIdentity(uuid.UUID(data["user_id"]), data["profile_hash"])
+        except (ValueError, KeyError, TypeError):
+            return None
+        self._set_local(platform_user_id, entry)
+        return entry
+
+    async def set(self, platform_user_id: str, entry: CachedIdentity) -> None:
+        self._set_local(platform_user_id, entry)
+        value = json.dumps({"user_id": str(entry.user_id), "profile_hash": entry.profile_hash})
+        try:
+            await self._redis_factory().set(
+                self._redis_key(platform_user_id), value, ex=self.redis_ttl_s
+            )
+        except Exception as exc:
+            logger.warning("identity cache: redis set failed: %s", exc)
+
+    async def invalidate(self, platform_user_id: str) -> None:
+        self._local.pop(platform_user_id, None)
+        try:
+            await self._redis_factory().delete(self._redis_key(platform_user_id))
+        except Exception as exc:
+            logger.warning("identity cache: redis delete failed: %s", exc)
+
+    def clear_local(self) -> None:
+        self._local.clear()
+
+    def _get_local(self, platform_user_id: str) -> CachedIdentity | None:
+        cached = self._local.get(platform_user_id)
+        if cached is None:
+            return None
+        expires_at, entry = cached
+        if expires_at < time.monotonic():
+            del self._local[platform_user_id]
+            return None
+        self._local.move_to_end(platform_user_id)
+        return entry
+
+    def _set_local(self, platform_user_id: str, entry: CachedIdentity) -> None:
+        self._local[platform_user_id] = (time.monotonic() + self.local_ttl_s, entry)
+        self._local.move_to_end(platform_user_id)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    def _redis_key(self, platform_user_id: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:{self.platform}:{platform_user_id}"
+
+
+_telegram_identity_cache: UserIdentityCache | None = None
+
+
+def get_telegram_identity_cache() -> UserIdentityCache:
+    global _telegram_identity_cache
+    if _telegram_identity_cache is None:
+        settings = get_settings()
+        _telegram_identity_cache = UserIdentityCache(
+            "telegram",
+            max_size=settings.user_cache_max_size,
+            local_ttl_s=settings.user_cache_local_ttl_seconds,
+            redis_ttl_s=settings.user_cache_redis_ttl_seconds,
+        )
+    return _telegram_identity_cache
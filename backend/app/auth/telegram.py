@@ -2,6 +2,7 @@ import hashlib
 import hmac
 import json
 import time
+from functools import lru_cache
 from urllib.parse import parse_qsl
 
 from app.core.settings import get_settings
@@ -15,6 +16,11 @@ class TelegramInitDataError(ValueError):
         self.reason = reason
 
 
+@lru_cache(maxsize=4)
+def _webapp_secret_key(bot_token: str) -> bytes:
+    return hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+
+
 def verify_init_data(init_data: str) -> dict:
     data = dict(parse_qsl(init_data, keep_blank_values=True))
     received_hash = data.pop("hash", None)
@@ -28,9 +34,7 @@ def verify_init_data(init_data: str) -> dict:
     data_check_arr = [f"{k}={v}" for k, v in sorted(data.items())]
     data_check_string = "\n".join(data_check_arr)
 
-    secret_key = hmac.new(
-        b"WebAppData", settings.telegram_bot_token.encode(), hashlib.sha256
-    ).digest()
+    secret_key = _webapp_secret_key(settings.telegram_bot_token)
     calculated_hash = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
 
     if not hmac.compare_digest(calculated_hash, received_hash):
@@ -2,10 +2,18 @@ import datetime as dt
 from typing import Any
 import jwt
 
-from app.core.settings import get_settings
+from app.core.settings import get_settings, is_real_secret
 
 settings = get_settings()
 
+# HS256 keys shorter than the hash output can be brute-forced offline.
+MIN_SECRET_LENGTH = 32
+
+
+def session_tokens_enabled() -> bool:
+    """Session tokens are only issued and accepted with a real ``JWT_SECRET``."""
+    return is_real_secret(settings.jwt_secret, MIN_SECRET_LENGTH)
+
 
 def create_access_token(subject: dict[str, Any]) -> str:
     payload = subject.copy()
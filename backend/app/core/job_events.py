@@ -0,0 +1,341 @@
+import asyncio
+import contextlib
+import json
+import logging
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+from app.core.models.job import Job
+from app.core.redis import get_async_redis
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "pelicanone:jobs"
+CANCEL_CHANNEL = f"{CHANNEL_PREFIX}:cancel"
+TERMINAL_STATUSES = {"done", "error"}
+# Events buffered per stream before the oldest are dropped.
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def status_key(job_id) -> str:
+    return f"{CHANNEL_PREFIX}:status:{job_id}"
+
+
+def final_status_key(job_id) -> str:
+    return f"{CHANNEL_PREFIX}:final:{job_id}"
+
+
+def cancel_key(job_id) -> str:
+    return f"{CHANNEL_PREFIX}:cancelled:{job_id}"
+
+
+def job_channel(job_id) -> str:
+    return f"{CHANNEL_PREFIX}:job:{job_id}"
+
+
+def user_channel(user_id) -> str:
+    return f"{CHANNEL_PREFIX}:user:{user_id}"
+
+
+def build_job_event(job: Job) -> dict[str, Any]:
+    updated_at = job.finished_at or job.started_at or job.created_at
+    event: dict[str, Any] = {
+        "id": str(job.id),
+        "status": job.status,
+        "error": job.error,
+        "updated_at": updated_at.isoformat() if updated_at else None,
+    }
+    if job.status == "done":
+        event["result"] = job.result
+        event["result_files"] = job.result_files
+    return event
+
+
+def build_status_record(job: Job) -> dict[str, Any]:
+    """Compact hot-status record: enough to answer job reads for unfinished jobs."""
+    updated_at = job.finished_at or job.started_at or job.created_at
+    return {
+        "id": str(job.id),
+        "user_id": str(job.user_id),
+        "kind": job.type,
+        "status": job.status,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": updated_at.isoformat() if updated_at else None,
+        "params": job.payload,
+        "error": job.error,
+        "has_result": job.status == "done",
+    }
+
+
+async def get_cached_job_status(job_id) -> dict[str, Any] | None:
+    """The job's cached status record; a terminal record always wins.
+
+    Terminal records live under ``final_status_key``, where a late publish of
+    an earlier status cannot overwrite them, so the cache never moves a job
+    backwards.
+    """
+    try:
+        async with get_async_redis().pipeline(transaction=False) as pipe:
+            pipe.get(final_status_key(job_id))
+            pipe.get(status_key(job_id))
+            final_raw, raw = await pipe.execute()
+    except Exception as exc:
+        logger.warning("job events: status read failed job=%s: %s", job_id, exc)
+        return None
+    raw = final_raw or raw
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except (TypeError, ValueError):
+        return None
+
+
+async def _store_status_record(redis, job: Job) -> None:
+    record = json.dumps(build_status_record(job), default=str)
+    ttl_s = get_settings().jobs_status_cache_ttl_seconds
+    async with redis.pipeline(transaction=True) as pipe:
+        if job.status in TERMINAL_STATUSES:
+            pipe.set(final_status_key(job.id), record, ex=ttl_s)
+            pipe.delete(status_key(job.id))
+        else:
+            pipe.set(status_key(job.id), record, ex=ttl_s)
+        await pipe.execute()
+
+
+async def _drop_status_record(redis, job_id) -> None:
+    """Forget a record that could not be updated, so readers go to the DB."""
+    try:
+        await redis.delete(status_key(job_id))
+    except Exception as exc:
+        logger.warning("job events: stale status left job=%s: %s", job_id, exc)
+
+
+async def publish_job_event(job: Job) -> None:
+    """Record a status transition in the hot status cache and announce it.
+
+    The record is written with a TTL and the event goes to the job's and its
+    owner's channels. Best effort: when the record cannot be written the old
+    one is dropped, so readers fall back to the DB instead of a stale status,
+    and subscribers that miss a message still see the state there.
+    """
+    message = json.dumps(build_job_event(job), default=str)
+    try:
+        redis = get_async_redis()
+    except Exception as exc:
+        logger.warning("job events: publish failed job=%s: %s", job.id, exc)
+        return
+    try:
+        await _store_status_record(redis, job)
+    except Exception as exc:
+        logger.warning("job events: status write failed job=%s: %s", job.id, exc)
+        await _drop_status_record(redis, job.id)
+    try:
+        await redis.publish(job_channel(job.id), message)
+        await redis.publish(user_channel(job.user_id), message)
+    except Exception as exc:
+        logger.warning("job events: publish failed job=%s: %s", job.id, exc)
+
+
+async def publish_job_cancel(job_id) -> None:
+    """Tell the worker running ``job_id`` to abort it.
+
+    The flag key covers a worker that subscribes to ``CANCEL_CHANNEL`` only
+    after the message went out. Best effort: a job that misses both still
+    cannot overwrite its cancelled status.
+    """
+    try:
+        redis = get_async_redis()
+        await redis.set(cancel_key(job_id), "1", ex=get_settings().jobs_status_cache_ttl_seconds)
+        await redis.publish(CANCEL_CHANNEL, str(job_id))
+    except Exception as exc:
+        logger.warning("job events: cancel publish failed job=%s: %s", job_id, exc)
+
+
+async def is_job_cancel_requested(job_id) -> bool:
+    try:
+        return bool(await get_async_redis().get(cancel_key(job_id)))
+    except Exception as exc:
+        logger.warning("job events: cancel read failed job=%s: %s", job_id, exc)
+        return False
+
+
+class JobEventHub:
+    """Fans one Redis pub/sub connection per process out to in-process subscribers.
+
+    SSE streams and long-polls each register a bounded queue here instead of
+    holding a pub/sub connection of their own, so open streams never drain the
+    shared Redis pool. Channels are subscribed while at least one queue wants
+    them; a subscriber that falls behind loses its oldest events, not new ones.
+    """
+
+    def __init__(
+        self,
+        redis_factory: Callable | None = None,
+        listen_timeout_s: float = 1.0,
+        queue_size: int = SUBSCRIBER_QUEUE_SIZE,
+    ) -> None:
+        self._redis_factory = redis_factory
+        self.listen_timeout_s = listen_timeout_s
+        self.queue_size = queue_size
+        self._queues: dict[str, set[asyncio.Queue]] = {}
+        self._pubsub = None
+        self._lock = asyncio.Lock()
+        self._listener: asyncio.Task | None = None
+
+    async def subscribe(self, channels: list[str]) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        async with self._lock:
+            fresh = [channel for channel in channels if channel not in self._queues]
+            for channel in channels:
+                self._queues.setdefault(channel, set()).add(queue)
+            try:
+                if self._pubsub is None:
+                    self._pubsub = (self._redis_factory or get_async_redis)().pubsub()
+                if fresh:
+                    await self._pubsub.subscribe(*fresh)
+            except Exception:
+                self._discard(queue, channels)
+                raise
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return queue
+
+    async def unsubscribe(self, queue: asyncio.Queue, channels: list[str]) -> None:
+        async with self._lock:
+            idle = self._discard(queue, channels)
+            if idle and self._pubsub is not None:
+                try:
+                    await self._pubsub.unsubscribe(*idle)
+                except Exception as exc:  # pragma: no cover - connection already gone
+                    logger.debug("job events: unsubscribe failed: %s", exc)
+
+    def _discard(self, queue: asyncio.Queue, channels: list[str]) -> list[str]:
+        idle = []
+        for channel in channels:
+            queues = self._queues.get(channel)
+            if queues is None:
+                continue
+            queues.discard(queue)
+            if not queues:
+                del self._queues[channel]
+                idle.append(channel)
+        return idle
+
+    def _dispatch(self, channel: str, data) -> None:
+        for queue in self._queues.get(channel, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(data)
+
+    async def _listen(self) -> None:
+        while self._queues:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=self.listen_timeout_s
+                )
+            except Exception as exc:
+                logger.warning("job events: subscription failed: %r", exc)
+                await asyncio.sleep(self.listen_timeout_s)
+                await self._resubscribe()
+                continue
+            if message is None or message.get("type") != "message":
+                continue
+            channel = message.get("channel")
+            self._dispatch(channel.decode() if isinstance(channel, bytes) else channel, message["data"])
+
+    async def _resubscribe(self) -> None:
+        async with self._lock:
+            pubsub, self._pubsub = self._pubsub, None
+            if pubsub is not None:
+                with contextlib.suppress(Exception):
+                    await pubsub.aclose()
+            if not self._queues:
+                return
+            try:
+                self._pubsub = (self._redis_factory or get_async_redis)().pubsub()
+                await self._pubsub.subscribe(*self._queues)
+            except Exception as exc:
+                logger.warning("job events: resubscribe failed: %r", exc)
+
+
+_shared_hub: JobEventHub | None = None
+_shared_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_job_event_hub() -> JobEventHub:
+    global _shared_hub, _shared_loop
+    loop = asyncio.get_running_loop()
+    if _shared_hub is None or _shared_loop is not loop:
+        _shared_hub = JobEventHub()
+        _shared_loop = loop
+    return _shared_hub
+
+
+class JobEventSubscription:
+    """Async iterator over job events from Redis pub/sub, with idle heartbeats.
+
+    Yields decoded event dicts, or ``None`` after ``heartbeat_s`` of silence so
+    the caller can write a keepalive and notice disconnected clients. Events
+    arrive through the process-wide ``JobEventHub``.
+    """
+
+    def __init__(self, channels: list[str], heartbeat_s: float) -> None:
+        self.channels = channels
+        self.heartbeat_s = heartbeat_s
+        self._hub: JobEventHub | None = None
+        self._queue: asyncio.Queue | None = None
+
+    async def __aenter__(self) -> "JobEventSubscription":
+        self._hub = get_job_event_hub()
+        self._queue = await self._hub.subscribe(self.channels)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._queue is not None:
+            await self._hub.unsubscribe(self._queue, self.channels)
+
+    def __aiter__(self) -> AsyncIterator[dict[str, Any] | None]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[dict[str, Any] | None]:
+        while True:
+            try:
+                data = await asyncio.wait_for(self._queue.get(), self.heartbeat_s)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            try:
+                yield json.loads(data)
+            except (TypeError, ValueError):
+                continue
+
+
+async def wait_for_terminal_job(job_id, timeout_s: float, reload_job):
+    """Park until ``job_id`` reaches a terminal status or ``timeout_s`` elapses.
+
+    ``reload_job`` is an async callable returning the current job row; it is
+    called once after subscribing (to close the race with a transition that
+    just happened) and once more when the wait ends. Returns that last row.
+    """
+    try:
+        async with JobEventSubscription([job_channel(job_id)], timeout_s) as subscription:
+            job = await reload_job()
+            if job is None or job.status in TERMINAL_STATUSES:
+                return job
+            async with asyncio.timeout(timeout_s):
+                async for event in subscription:
+                    if event and event.get("status") in TERMINAL_STATUSES:
+                        break
+    except TimeoutError:
+        pass
+    except Exception as exc:
+        logger.warning("job events: wait failed job=%s: %s", job_id, exc)
+    return await reload_job()
+
+
+def format_sse(event: dict[str, Any] | None, event_name: str = "job") -> str:
+    if event is None:
+        return ": keepalive\n\n"
+    return f"event: {event_name}\ndata: {json.dumps(event, default=str)}\n\n"
@@ -1,6 +1,10 @@
 import asyncio
+import hashlib
+import json
 import logging
 import mimetypes
+import os
+import time
 import uuid
 from pathlib import Path
 from typing import Any
@@ -13,7 +17,58 @@ from app.core.settings import get_settings
 logger = logging.getLogger(__name__)
 
 DEFAULT_DOWNLOAD_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
-RETRY_DELAYS = [0, 2, 5]
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+BLOBS_DIRNAME = "blobs"
+# Files already fetched for an unfinished job, kept across its retries.
+DOWNLOADED_DIRNAME = ".downloaded"
+
+
+class DownloadTooLargeError(ValueError):
+    pass
+
+
+class ResultDownloadError(RuntimeError):
+    """A result file could not be fetched; the caller decides when to try again."""
+
+
+_download_client: httpx.AsyncClient | None = None
+_download_loop: asyncio.AbstractEventLoop | None = None
+_download_slots: asyncio.Semaphore | None = None
+_download_slots_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_download_client() -> httpx.AsyncClient:
+    """Return the process-wide result download client, recreating it if the event loop changed."""
+    global _download_client, _download_loop
+    loop = asyncio.get_running_loop()
+    if _download_client is None or _download_client.is_closed or _download_loop is not loop:
+        settings = get_settings()
+        _download_client = httpx.AsyncClient(
+            timeout=DEFAULT_DOWNLOAD_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.files_download_concurrency,
+                max_keepalive_connections=settings.files_download_concurrency,
+            ),
+        )
+        _download_loop = loop
+    return _download_client
+
+
+def _get_download_slots() -> asyncio.Semaphore:
+    """Process-wide cap on concurrent result downloads across all jobs."""
+    global _download_slots, _download_slots_loop
+    loop = asyncio.get_running_loop()
+    if _download_slots is None or _download_slots_loop is not loop:
+        _download_slots = asyncio.Semaphore(max(1, get_settings().files_download_concurrency))
+        _download_slots_loop = loop
+    return _download_slots
+
+
+async def close_download_client() -> None:
+    global _download_client, _download_loop
+    client, _download_client, _download_loop = _download_client, None, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
 
 
 def storage_root() -> Path:
@@ -30,6 +85,87 @@ def ensure_job_dir(job_id: str) -> Path:
     return job_dir
 
 
+def create_staging_dir(job_id: str) -> Path:
+    """Private directory one completion attempt downloads into before publishing."""
+    staging_dir = ensure_job_dir(job_id) / f".staging-{uuid.uuid4().hex}"
+    staging_dir.mkdir()
+    return staging_dir
+
+
+def publish_staged_files(staging_dir: Path) -> None:
+    """Move the files of a completion that won its job into the job directory."""
+    for path in staging_dir.iterdir():
+        if not path.name.startswith("."):
+            os.replace(path, staging_dir.parent / path.name)
+
+
+def discard_staged_files(staging_dir: Path) -> None:
+    """Drop whatever a completion attempt left behind, releasing its blob links.
+
+    Only the attempt's own links are removed, so files another completion
+    already published for the same job are never touched.
+    """
+    if not staging_dir.exists():
+        return
+    for path in staging_dir.iterdir():
+        path.unlink(missing_ok=True)
+        if not path.name.startswith("."):
+            release_blob(path.stem, path.suffix)
+    staging_dir.rmdir()
+
+
+def _downloaded_dir(job_id: str) -> Path:
+    return storage_root() / "jobs" / job_id / DOWNLOADED_DIRNAME
+
+
+def _downloaded_key(source_url: str) -> str:
+    return hashlib.sha256(source_url.encode()).hexdigest()
+
+
+def remember_downloaded_file(
+    job_id: str, source_url: str, file_path: Path, stored: dict[str, Any]
+) -> None:
+    """Keep a link to a fetched file so a retry of the job does not download it again.
+
+    The link holds a blob reference, so the file survives the attempt's
+    staging directory being discarded.
+    """
+    cache_dir = _downloaded_dir(job_id)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    link_tmp = cache_dir / f".{file_path.name}.{uuid.uuid4().hex}.link"
+    os.link(file_path, link_tmp)
+    os.replace(link_tmp, cache_dir / file_path.name)
+    key = _downloaded_key(source_url)
+    manifest_tmp = cache_dir / f".{key}.{uuid.uuid4().hex}.json"
+    manifest_tmp.write_text(json.dumps(stored))
+    os.replace(manifest_tmp, cache_dir / f"{key}.json")
+
+
+def reuse_downloaded_file(job_id: str, source_url: str, target_dir: Path) -> dict[str, Any] | None:
+    """Link a file an earlier attempt already fetched into ``target_dir``, if there is one."""
+    cache_dir = _downloaded_dir(job_id)
+    try:
+        stored = json.loads((cache_dir / f"{_downloaded_key(source_url)}.json").read_text())
+        target = target_dir / stored["filename"]
+        if not target.exists():
+            os.link(cache_dir / stored["filename"], target)
+    except (OSError, ValueError, KeyError):
+        return None
+    return stored
+
+
+def discard_downloaded_files(job_id: str) -> None:
+    """Drop the retry cache of a job that reached a terminal state, releasing its blob links."""
+    cache_dir = _downloaded_dir(job_id)
+    if not cache_dir.exists():
+        return
+    for path in cache_dir.iterdir():
+        path.unlink(missing_ok=True)
+        if path.suffix != ".json" and not path.name.startswith("."):
+            release_blob(path.stem, path.suffix)
+    cache_dir.rmdir()
+
+
 def build_file_url(job_id: str, filename: str) -> str:
     settings = get_settings()
     return f"{settings.api_prefix}/files/{job_id}/{filename}"
@@ -40,6 +176,72 @@ def resolve_job_file_path(job_id: str, filename: str) -> Path:
     return job_dir / filename
 
 
+def blob_path(sha256: str, suffix: str) -> Path:
+    return storage_root() / BLOBS_DIRNAME / sha256[:2] / f"{sha256}{suffix}"
+
+
+def store_content_addressed(file_path: Path, sha256: str) -> str:
+    """Rename ``file_path`` to ``<sha256><ext>`` and hard-link it to the shared blob store.
+
+    The blob's link count is its reference count: when identical bytes were
+    already stored, the fresh copy is dropped and the job file becomes another
+    link to the existing blob. Returns the new filename inside the same directory.
+    """
+    suffix = file_path.suffix
+    target = file_path.with_name(f"{sha256}{suffix}")
+    blob = blob_path(sha256, suffix)
+    blob.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(file_path, blob)
+    except FileExistsError:
+        link_tmp = file_path.with_name(f".{target.name}.link")
+        try:
+            os.link(blob, link_tmp)
+        except FileNotFoundError:
+            # The blob was released between the two calls; keep our own copy.
+            return store_content_addressed(file_path, sha256)
+        os.replace(link_tmp, target)
+        file_path.unlink(missing_ok=True)
+        return target.name
+    except OSError as exc:
+        logger.warning("Hard links unavailable for %s, storing without dedupe: %s", file_path, exc)
+    os.replace(file_path, target)
+    return target.name
+
+
+def release_blob(sha256: str, suffix: str) -> int:
+    """Drop the blob once no job file links to it any more; returns the bytes freed."""
+    blob = blob_path(sha256, suffix)
+    try:
+        stat = blob.stat()
+        if stat.st_nlink > 1:
+            return 0
+        blob.unlink()
+    except FileNotFoundError:
+        return 0
+    return stat.st_size
+
+
+def sweep_orphan_blobs() -> tuple[int, int]:
+    """Remove blobs that lost all job references, e.g. after a job row was deleted."""
+    blobs_dir = storage_root() / BLOBS_DIRNAME
+    if not blobs_dir.exists():
+        return 0, 0
+    removed = 0
+    freed_bytes = 0
+    for blob in blobs_dir.glob("*/*"):
+        try:
+            stat = blob.stat()
+            if not blob.is_file() or stat.st_nlink > 1:
+                continue
+            blob.unlink()
+        except FileNotFoundError:
+            continue
+        removed += 1
+        freed_bytes += stat.st_size
+    return removed, freed_bytes
+
+
 def _guess_extension(content_type: str | None, source_url: str) -> str:
     if content_type:
         extension = mimetypes.guess_extension(content_type.split(";")[0].strip())
@@ -59,32 +261,118 @@ def _is_local_file_url(url: str) -> bool:
     return path.startswith(f"{settings.api_prefix}/files/")
 
 
-async def _download_file(client: httpx.AsyncClient, source_url: str, job_dir: Path) -> dict[str, str]:
-    last_exc: Exception | None = None
-    for delay in RETRY_DELAYS:
-        if delay:
-            await asyncio.sleep(delay)
+async def stream_download(
+    client: httpx.AsyncClient, source_url: str, target_dir: Path, max_bytes: int | None = None
+) -> dict[str, Any]:
+    """Stream ``source_url`` into ``target_dir`` through a temp file and rename it in place.
+
+    The body is never held in memory: it is hashed and size-checked chunk by
+    chunk, and the download is aborted once it exceeds ``max_bytes``.
+    """
+    if max_bytes is None:
+        max_bytes = get_settings().files_max_download_bytes
+    async with client.stream("GET", source_url) as response:
+        response.raise_for_status()
+        declared_size = response.headers.get("Content-Length")
+        if max_bytes and declared_size and declared_size.isdigit() and int(declared_size) > max_bytes:
+            raise DownloadTooLargeError("file_too_large")
+        content_type = response.headers.get("Content-Type", "application/octet-stream")
+        extension = _guess_extension(content_type, source_url)
+        filename = f"{uuid.uuid4().hex}{extension}"
+        file_path = target_dir / filename
+        tmp_path = target_dir / f".{filename}.part"
+        digest = hashlib.sha256()
+        size = 0
         try:
-            response = await client.get(source_url)
-            response.raise_for_status()
-            content_type = response.headers.get("Content-Type", "application/octet-stream")
-            extension = _guess_extension(content_type, source_url)
-            filename = f"{uuid.uuid4().hex}{extension}"
-            file_path = job_dir / filename
-            file_path.write_bytes(response.content)
-            return {
-                "filename": filename,
-                "content_type": content_type.split(";")[0].strip(),
-            }
-        except Exception as exc:
-            last_exc = exc
-            logger.warning("Failed to download %s: %s", source_url, exc)
-    raise last_exc or RuntimeError("download_failed")
+            with tmp_path.open("wb") as handle:
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if max_bytes and size > max_bytes:
+                        raise DownloadTooLargeError("file_too_large")
+                    digest.update(chunk)
+                    # Disk writes stay off the event loop the other jobs run on.
+                    await asyncio.to_thread(handle.write, chunk)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    return {
+        "filename": filename,
+        "content_type": content_type.split(";")[0].strip(),
+        "sha256": digest.hexdigest(),
+        "size_bytes": size,
+    }
+
+
+async def _download_file(
+    client: httpx.AsyncClient, source_url: str, job_dir: Path, job_slots: asyncio.Semaphore
+) -> dict[str, Any]:
+    """Download one result file in a single attempt.
+
+    Failures surface as ``ResultDownloadError`` so the worker can schedule a
+    later retry instead of holding its slot through a backoff.
+    """
+    try:
+        async with job_slots, _get_download_slots():
+            return await stream_download(client, source_url, job_dir)
+    except DownloadTooLargeError:
+        logger.warning("Refusing to download %s: larger than the configured limit", source_url)
+        raise
+    except Exception as exc:
+        logger.warning("Failed to download %s: %s", source_url, exc)
+        raise ResultDownloadError("download_failed") from exc
+
+
+async def _download_item(
+    client: httpx.AsyncClient, job_id: str, item: dict[str, Any], job_dir: Path, job_slots: asyncio.Semaphore
+) -> dict[str, Any]:
+    source_url = str(item.get("url"))
+    stored = await asyncio.to_thread(reuse_downloaded_file, job_id, source_url, job_dir)
+    if stored is not None:
+        logger.info("job_files: reused job=%s file=%s", job_id, stored["filename"])
+    else:
+        started = time.monotonic()
+        stored = await _download_file(client, source_url, job_dir, job_slots)
+        stored["filename"] = store_content_addressed(job_dir / stored["filename"], stored["sha256"])
+        stored["download_ms"] = int((time.monotonic() - started) * 1000)
+        logger.info(
+            "job_files: downloaded job=%s file=%s size_bytes=%s download_ms=%s",
+            job_id,
+            stored["filename"],
+            stored["size_bytes"],
+            stored["download_ms"],
+        )
+        await asyncio.to_thread(
+            remember_downloaded_file, job_id, source_url, job_dir / stored["filename"], stored
+        )
+    item["filename"] = stored["filename"]
+    item["content_type"] = stored["content_type"]
+    item["url"] = build_file_url(job_id, stored["filename"])
+    return stored
+
+
+async def _gather_downloads(tasks: dict[int, asyncio.Task]) -> dict[int, dict[str, Any]]:
+    """Wait for all downloads; on the first failure cancel the rest and re-raise it."""
+    try:
+        results = await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    return dict(zip(tasks.keys(), results))
 
 
 async def persist_result_files(
-    job_id: str, result: dict[str, Any]
+    job_id: str, result: dict[str, Any], staging_dir: Path | None = None
 ) -> tuple[dict[str, Any], list[dict[str, Any]] | None]:
+    """Download the result's files and describe them as stored under the job directory.
+
+    With ``staging_dir`` the downloads land there instead, and the caller
+    publishes them with ``publish_staged_files`` once the result is recorded.
+    Files an earlier attempt of the job already fetched are linked from its
+    retry cache rather than downloaded again.
+    """
     items = result.get("items") or []
     file_items = [
         item for item in items if isinstance(item, dict) and item.get("kind") == "file" and item.get("url")
@@ -92,24 +380,25 @@ async def persist_result_files(
     if not file_items:
         return result, None
 
-    job_dir = ensure_job_dir(job_id)
+    job_dir = staging_dir or ensure_job_dir(job_id)
     stored_files: list[dict[str, Any]] = []
-    async with httpx.AsyncClient(timeout=DEFAULT_DOWNLOAD_TIMEOUT) as client:
-        for item in file_items:
-            source_url = str(item.get("url"))
-            if _is_local_file_url(source_url):
-                filename = item.get("filename") or Path(urlparse(source_url).path).name
-                if filename:
-                    item["filename"] = filename
-                continue
-            stored = await _download_file(client, source_url, job_dir)
-            item.update(stored)
-            item["url"] = build_file_url(job_id, stored["filename"])
+    client = get_download_client()
+    job_slots = asyncio.Semaphore(max(1, get_settings().files_download_concurrency_per_job))
+    tasks: dict[int, asyncio.Task] = {}
+    for index, item in enumerate(file_items):
+        source_url = str(item.get("url"))
+        if _is_local_file_url(source_url):
+            filename = item.get("filename") or Path(urlparse(source_url).path).name
+            if filename:
+                item["filename"] = filename
+            continue
+        tasks[index] = asyncio.create_task(_download_item(client, job_id, item, job_dir, job_slots))
+    downloads = await _gather_downloads(tasks) if tasks else {}
 
     settings = get_settings()
     root = Path(settings.files_storage_path)
     file_type = result.get("type") or "file"
-    for item in file_items:
+    for index, item in enumerate(file_items):
         filename = item.get("filename")
         if not filename:
             continue
@@ -118,13 +407,16 @@ async def persist_result_files(
             relative_path = file_path.relative_to(root)
         except ValueError:
             relative_path = file_path
-        stored_files.append(
-            {
-                "type": file_type,
-                "path": str(relative_path),
-                "url": item.get("url"),
-                "filename": filename,
-            }
-        )
+        stored_file = {
+            "type": file_type,
+            "path": str(relative_path),
+            "url": item.get("url"),
+            "filename": filename,
+        }
+        if index in downloads:
+            stored_file["sha256"] = downloads[index]["sha256"]
+            stored_file["size_bytes"] = downloads[index]["size_bytes"]
+            stored_file["download_ms"] = downloads[index]["download_ms"]
+        stored_files.append(stored_file)
 
     return result, stored_files or None
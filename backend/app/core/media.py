@@ -1,14 +1,13 @@
 import logging
-import mimetypes
 import asyncio
 import time
-import uuid
 from pathlib import Path
 from typing import Any
 from urllib.parse import urlparse
 
 import httpx
 
+from app.core.job_files import DownloadTooLargeError, stream_download
 from app.core.settings import get_settings
 
 logger = logging.getLogger(__name__)
@@ -30,37 +29,20 @@ def _build_public_url(filename: str) -> str:
     return f"{base}/{filename}"
 
 
-def _guess_extension(content_type: str | None, source_url: str) -> str:
-    if content_type:
-        extension = mimetypes.guess_extension(content_type.split(";")[0].strip())
-        if extension:
-            return extension
-    parsed = urlparse(source_url)
-    suffix = Path(parsed.path).suffix
-    if suffix:
-        return suffix
-    return ".bin"
-
-
 async def download_to_media(client: httpx.AsyncClient, source_url: str) -> dict[str, str]:
     last_exc: Exception | None = None
     for delay in RETRY_DELAYS:
         if delay:
             await asyncio.sleep(delay)
         try:
-            response = await client.get(source_url)
-            response.raise_for_status()
-            content_type = response.headers.get("Content-Type", "application/octet-stream")
-            extension = _guess_extension(content_type, source_url)
-            filename = f"{uuid.uuid4().hex}{extension}"
-            media_dir = ensure_media_dir()
-            file_path = media_dir / filename
-            file_path.write_bytes(response.content)
+            stored = await stream_download(client, source_url, ensure_media_dir())
             return {
-                "url": _build_public_url(filename),
-                "filename": filename,
-                "content_type": content_type.split(";")[0].strip(),
+                "url": _build_public_url(stored["filename"]),
+                "filename": stored["filename"],
+                "content_type": stored["content_type"],
             }
+        except DownloadTooLargeError:
+            raise
         except Exception as exc:
             last_exc = exc
             logger.warning("Failed to download %s: %s", source_url, exc)
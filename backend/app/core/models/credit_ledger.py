@@ -1,6 +1,6 @@
 import datetime as dt
 import uuid
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, text
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -22,3 +22,12 @@ class CreditLedger(Base):
         server_default=text("now()"),
         nullable=False,
     )
+
+
+Index(
+    "ix_credit_ledger_user_id_created_at",
+    CreditLedger.user_id,
+    CreditLedger.created_at.desc(),
+    CreditLedger.id.desc(),
+)
+Index("ix_credit_ledger_job_id_reason", CreditLedger.job_id, CreditLedger.reason)
@@ -1,6 +1,6 @@
 import datetime as dt
 import uuid
-from sqlalchemy import DateTime, ForeignKey, Integer, String, text
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -30,14 +30,24 @@ class Job(Base):
     result_files: Mapped[list[dict] | None] = mapped_column(JSONB, nullable=True)
     error: Mapped[str | None] = mapped_column(String, nullable=True)
     cost: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default=text("0"))
+    attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
     created_at: Mapped[dt.datetime] = mapped_column(
         DateTime(timezone=True),
         default=dt.datetime.utcnow,
         server_default=text("now()"),
         nullable=False,
     )
+    dispatched_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     started_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     finished_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    heartbeat_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    provider_request_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    provider_submitted_at: Mapped[dt.datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    provider_status: Mapped[str | None] = mapped_column(String(32), nullable=True)
     updated_at: Mapped[dt.datetime] = mapped_column(
         DateTime(timezone=True),
         default=dt.datetime.utcnow,
@@ -53,3 +63,31 @@ class Job(Base):
     @property
     def params(self) -> dict:
         return self.payload
+
+
+Index("ix_jobs_user_id_created_at", Job.user_id, Job.created_at.desc(), Job.id.desc())
+Index(
+    "ix_jobs_active_user_id_created_at",
+    Job.user_id,
+    Job.created_at,
+    postgresql_where=Job.status.in_(["queued", "processing"]),
+    sqlite_where=Job.status.in_(["queued", "processing"]),
+)
+Index(
+    "ix_jobs_undispatched_created_at",
+    Job.created_at,
+    postgresql_where=Job.dispatched_at.is_(None),
+    sqlite_where=Job.dispatched_at.is_(None),
+)
+Index(
+    "ix_jobs_processing_heartbeat_at",
+    Job.heartbeat_at,
+    postgresql_where=Job.status == "processing",
+    sqlite_where=Job.status == "processing",
+)
+Index(
+    "ix_jobs_done_updated_at",
+    Job.updated_at,
+    postgresql_where=Job.status == "done",
+    sqlite_where=Job.status == "done",
+)
@@ -0,0 +1,70 @@
+import asyncio
+
+from redis import ConnectionPool, Redis
+from redis.asyncio import Redis as AsyncRedis
+
+from app.core.settings import get_settings
+
+_redis_pool: ConnectionPool | None = None
+_shared_redis: AsyncRedis | None = None
+_shared_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_redis_pool() -> ConnectionPool:
+    """Return the process-wide pool shared by every synchronous Redis/RQ client."""
+    global _redis_pool
+    if _redis_pool is None:
+        settings = get_settings()
+        _redis_pool = ConnectionPool.from_url(
+            settings.redis_url,
+            max_connections=settings.redis_max_connections,
+            socket_connect_timeout=settings.redis_socket_timeout_seconds,
+            socket_timeout=settings.redis_socket_timeout_seconds,
+        )
+    return _redis_pool
+
+
+def get_redis() -> Redis:
+    return Redis(connection_pool=get_redis_pool())
+
+
+def get_blocking_redis() -> Redis:
+    """Return a dedicated client for the worker's blocking dequeue.
+
+    BLPOP keeps the socket silent for the whole dequeue timeout, so this
+    client gets its own connection with a read timeout that outlasts it
+    instead of the shared pool's short one.
+    """
+    settings = get_settings()
+    return Redis.from_url(
+        settings.redis_url,
+        socket_connect_timeout=settings.redis_socket_timeout_seconds,
+        socket_timeout=settings.worker_redis_socket_timeout_seconds,
+    )
+
+
+def close_redis_pool() -> None:
+    global _redis_pool
+    pool, _redis_pool = _redis_pool, None
+    if pool is not None:
+        pool.disconnect()
+
+
+def get_async_redis() -> AsyncRedis:
+    """Return the process-wide asyncio Redis client, recreating it if the event loop changed."""
+    global _shared_redis, _shared_loop
+    loop = asyncio.get_running_loop()
+    if _shared_redis is None or _shared_loop is not loop:
+        settings = get_settings()
+        _shared_redis = AsyncRedis.from_url(
+            settings.redis_url, max_connections=settings.redis_max_connections
+        )
+        _shared_loop = loop
+    return _shared_redis
+
+
+async def close_async_redis() -> None:
+    global _shared_redis, _shared_loop
+    client, _shared_redis, _shared_loop = _shared_redis, None, None
+    if client is not None:
+        await client.aclose()
@@ -1,8 +1,9 @@
-from sqlalchemy import func, select
+from sqlalchemy import func, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.models.credit_ledger import CreditLedger
 from app.core.models.user import User
+from app.core.pagination import decode_cursor, encode_cursor
 
 
 class CreditRepository:
@@ -20,18 +21,29 @@ class CreditRepository:
         result = await self.session.execute(stmt)
         return result.scalar_one()
 
-    async def list_tx(self, user_id, limit: int, offset: int):
+    async def list_tx(self, user_id, limit: int, offset: int = 0, cursor: str | None = None):
+        """Return a page of ledger rows, newest first, plus the row total and the next cursor."""
         stmt = (
             select(CreditLedger)
             .where(CreditLedger.user_id == user_id)
-            .order_by(CreditLedger.created_at.desc())
-            .limit(limit)
-            .offset(offset)
+            .order_by(CreditLedger.created_at.desc(), CreditLedger.id.desc())
+            .limit(limit + 1)
         )
-        items = (await self.session.execute(stmt)).scalars().all()
-        total_stmt = select(func.count()).where(CreditLedger.user_id == user_id)
-        total = (await self.session.execute(total_stmt)).scalar_one()
-        return items, int(total)
+        if cursor:
+            created_at, tx_id = decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(CreditLedger.created_at, CreditLedger.id) < tuple_(created_at, tx_id)
+            )
+        elif offset:
+            stmt = stmt.offset(offset)
+        items = list((await self.session.execute(stmt)).scalars().all())
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+        total_stmt = select(User.ledger_count).where(User.id == user_id)
+        total = (await self.session.execute(total_stmt)).scalar_one_or_none()
+        return items, int(total or 0), next_cursor
 
     async def create_tx_for_user(
         self, user: User, delta: int, reason: str, job_id=None
@@ -40,6 +52,9 @@ class CreditRepository:
         tx = CreditLedger(user_id=user.id, delta=delta, reason=reason, job_id=job_id)
         self.session.add(tx)
         await self.session.flush()
+        await self.session.execute(
+            update(User).where(User.id == user.id).values(ledger_count=User.ledger_count + 1)
+        )
         return tx
 
     async def create_tx(self, user_id, delta: int, reason: str, job_id=None) -> CreditLedger:
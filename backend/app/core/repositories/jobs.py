@@ -1,7 +1,17 @@
-from sqlalchemy import func, select
+from sqlalchemy import func, literal, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.models.job import Job
+from app.core.models.user import User
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+ACTIVE_STATUSES = ("queued", "processing")
+
+
+def _status_is(*statuses: str):
+    # Inlined so the partial index on active jobs matches generic prepared plans.
+    return Job.status.in_([literal(value, literal_execute=True) for value in statuses])
 
 
 class JobRepository:
@@ -26,6 +36,9 @@ class JobRepository:
         )
         self.session.add(job)
         await self.session.flush()
+        await self.session.execute(
+            update(User).where(User.id == user_id).values(jobs_count=User.jobs_count + 1)
+        )
         return job
 
     async def get_job(self, job_id):
@@ -33,15 +46,109 @@ class JobRepository:
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def list_jobs(self, user_id, limit: int, offset: int):
+    async def list_jobs(self, user_id, limit: int, offset: int = 0, cursor: str | None = None):
+        """Return a page of jobs, newest first, plus the user's job total and the next cursor.
+
+        With ``cursor`` the page is selected by keyset on ``(created_at, id)`` and
+        ``offset`` is ignored; the total comes from ``users.jobs_count``.
+        """
         stmt = (
             select(Job)
             .where(Job.user_id == user_id)
-            .order_by(Job.created_at.desc())
+            .order_by(Job.created_at.desc(), Job.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            created_at, job_id = decode_cursor(cursor)
+            stmt = stmt.where(tuple_(Job.created_at, Job.id) < tuple_(created_at, job_id))
+        elif offset:
+            stmt = stmt.offset(offset)
+        items = list((await self.session.execute(stmt)).scalars().all())
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+        total_stmt = select(User.jobs_count).where(User.id == user_id)
+        total = (await self.session.execute(total_stmt)).scalar_one_or_none()
+        return items, int(total or 0), next_cursor
+
+    async def list_statuses(self, user_id, job_ids: list, since=None):
+        """Fetch the status fields of the caller's jobs among ``job_ids`` in one query.
+
+        Ownership is part of the WHERE clause, so foreign ids are simply absent.
+        """
+        stmt = select(Job).where(Job.user_id == user_id, Job.id.in_(job_ids))
+        if since is not None:
+            stmt = stmt.where(Job.updated_at > since)
+        return (await self.session.execute(stmt)).scalars().all()
+
+    async def count_dispatched_active(self, user_id) -> int:
+        """Jobs of the user handed to a worker queue and not finished yet."""
+        stmt = select(func.count()).select_from(Job).where(
+            Job.user_id == user_id,
+            _status_is(*ACTIVE_STATUSES),
+            Job.dispatched_at.is_not(None),
+        )
+        return int((await self.session.execute(stmt)).scalar_one())
+
+    async def list_waiting(self, user_id, limit: int) -> list[Job]:
+        """The user's oldest queued jobs that have not been dispatched yet."""
+        stmt = (
+            select(Job)
+            .where(Job.user_id == user_id, _status_is("queued"), Job.dispatched_at.is_(None))
+            .order_by(Job.created_at)
+            .limit(limit)
+        )
+        return list((await self.session.execute(stmt)).scalars().all())
+
+    async def users_with_waiting_jobs(self, created_before, limit: int) -> list:
+        """Users with undispatched jobs, the one waiting longest first."""
+        stmt = (
+            select(Job.user_id)
+            .where(
+                Job.dispatched_at.is_(None),
+                _status_is("queued"),
+                Job.created_at < created_before,
+            )
+            .group_by(Job.user_id)
+            .order_by(func.min(Job.created_at))
             .limit(limit)
-            .offset(offset)
         )
-        items = (await self.session.execute(stmt)).scalars().all()
-        total_stmt = select(func.count()).where(Job.user_id == user_id)
-        total = (await self.session.execute(total_stmt)).scalar_one()
-        return items, int(total)
+        return list((await self.session.execute(stmt)).scalars().all())
+
+    async def mark_cancelled(self, job: Job, finished_at) -> bool:
+        """Cancel ``job`` unless a worker finished it first."""
+        cancelled = await self.session.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.status.in_(ACTIVE_STATUSES))
+            .values(status="error", error="Canceled", finished_at=finished_at)
+        )
+        await self.session.commit()
+        await self.session.refresh(job)
+        return cancelled.rowcount == 1
+
+    async def own_jobs_ahead(self, job: Job) -> int:
+        """How many of the owner's own queued jobs will start before ``job``.
+
+        Not a global queue position: other users' jobs are dispatched by
+        per-user fairness and are not counted.
+        """
+        stmt = select(func.count()).select_from(Job).where(
+            Job.user_id == job.user_id,
+            _status_is("queued"),
+            Job.created_at < job.created_at,
+        )
+        return int((await self.session.execute(stmt)).scalar_one())
+
+    async def list_stalled(
+        self, heartbeat_before, limit: int, include_submitted: bool = True
+    ) -> list[Job]:
+        """Processing jobs whose worker stopped sending heartbeats."""
+        stmt = select(Job).where(
+            Job.status == literal("processing", literal_execute=True),
+            Job.heartbeat_at < heartbeat_before,
+        )
+        if not include_submitted:
+            stmt = stmt.where(Job.provider_request_id.is_(None))
+        stmt = stmt.order_by(Job.heartbeat_at).limit(limit)
+        return list((await self.session.execute(stmt)).scalars().all())
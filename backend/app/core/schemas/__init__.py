@@ -1,6 +1,15 @@
+from app.core.schemas.auth import SessionTokenOut
 from app.core.schemas.billing import TopUpRequest
 from app.core.schemas.credits import CreditBalance, CreditLedgerList, CreditLedgerOut
-from app.core.schemas.job import JobCreate, JobDetailOut, JobList, JobResultOut, JobSummaryOut
+from app.core.schemas.job import (
+    JobCreate,
+    JobDetailOut,
+    JobList,
+    JobResultOut,
+    JobStatusList,
+    JobStatusOut,
+    JobSummaryOut,
+)
 from app.core.schemas.presets import PresetList
 
 __all__ = [
@@ -11,7 +20,10 @@ __all__ = [
     "JobList",
     "JobDetailOut",
     "JobResultOut",
+    "JobStatusList",
+    "JobStatusOut",
     "JobSummaryOut",
     "PresetList",
+    "SessionTokenOut",
     "TopUpRequest",
 ]
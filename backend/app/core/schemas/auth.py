@@ -0,0 +1,10 @@
+import uuid
+
+from pydantic import BaseModel
+
+
+class SessionTokenOut(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+    user_id: uuid.UUID
@@ -20,6 +20,7 @@ class CreditBalance(BaseModel):
 class CreditLedgerList(BaseModel):
     items: list[CreditLedgerOut]
     total: int
+    next_cursor: str | None = None
 
 
 class AdminCreditAddRequest(BaseModel):
@@ -30,6 +30,11 @@ class JobDetailOut(BaseModel):
     result: dict[str, Any] | None = None
     result_files: list[dict[str, Any]] | None = None
     error: str | None = None
+    # Owner's own queued jobs that start before this one (not a global
+    # position); only set while queued.
+    own_jobs_ahead: int | None = None
+    # Expected generation time learned for the network; only set while unfinished.
+    eta_seconds: int | None = None
 
     class Config:
         from_attributes = True
@@ -38,6 +43,20 @@ class JobDetailOut(BaseModel):
 class JobList(BaseModel):
     items: list[JobSummaryOut]
     total: int
+    next_cursor: str | None = None
+
+
+class JobStatusOut(BaseModel):
+    id: uuid.UUID
+    status: str
+    updated_at: dt.datetime
+    error: str | None = None
+    result_summary: dict[str, Any] | None = None
+
+
+class JobStatusList(BaseModel):
+    items: list[JobStatusOut]
+    server_time: dt.datetime
 
 
 class JobStatusUpdate(BaseModel):
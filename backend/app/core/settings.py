@@ -1,7 +1,10 @@
 from functools import lru_cache
-from pydantic import Field
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Sample values that must never sign anything, e.g. from an old copy of .env.example.
+PLACEHOLDER_SECRETS = {"change-me", "changeme", "secret"}
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
@@ -16,11 +19,66 @@ class Settings(BaseSettings):
         validation_alias="DATABASE_URL",
     )
     redis_url: str = Field(default="redis://redis:6379/0", validation_alias="REDIS_URL")
+    redis_max_connections: int = Field(default=50, validation_alias="REDIS_MAX_CONNECTIONS")
+    redis_socket_timeout_seconds: float = Field(
+        default=5.0, validation_alias="REDIS_SOCKET_TIMEOUT_SECONDS"
+    )
+    jobs_enqueue_timeout_seconds: float = Field(
+        default=0.5, validation_alias="JOBS_ENQUEUE_TIMEOUT_SECONDS"
+    )
+    jobs_outbox_interval_seconds: int = Field(
+        default=30, validation_alias="JOBS_OUTBOX_INTERVAL_SECONDS"
+    )
+    jobs_events_heartbeat_seconds: float = Field(
+        default=15.0, validation_alias="JOBS_EVENTS_HEARTBEAT_SECONDS"
+    )
+    jobs_result_max_wait_seconds: float = Field(
+        default=30.0, validation_alias="JOBS_RESULT_MAX_WAIT_SECONDS"
+    )
+    jobs_status_cache_ttl_seconds: int = Field(
+        default=2 * 60 * 60, validation_alias="JOBS_STATUS_CACHE_TTL_SECONDS"
+    )
+    jobs_status_max_ids: int = Field(default=100, validation_alias="JOBS_STATUS_MAX_IDS")
+    jobs_max_active_per_user: int = Field(default=3, validation_alias="JOBS_MAX_ACTIVE_PER_USER")
+    jobs_outbox_grace_seconds: int = Field(default=30, validation_alias="JOBS_OUTBOX_GRACE_SECONDS")
+    jobs_heartbeat_seconds: float = Field(default=30.0, validation_alias="JOBS_HEARTBEAT_SECONDS")
+    jobs_stalled_after_seconds: int = Field(
+        default=180, validation_alias="JOBS_STALLED_AFTER_SECONDS"
+    )
+    jobs_resume_interval_seconds: int = Field(
+        default=60, validation_alias="JOBS_RESUME_INTERVAL_SECONDS"
+    )
+    jobs_retry_max_attempts: int = Field(default=4, validation_alias="JOBS_RETRY_MAX_ATTEMPTS")
+    jobs_retry_base_seconds: float = Field(
+        default=2.0, validation_alias="JOBS_RETRY_BASE_SECONDS"
+    )
+    jobs_retry_max_seconds: float = Field(default=60.0, validation_alias="JOBS_RETRY_MAX_SECONDS")
+    worker_concurrency: int = Field(default=1, validation_alias="WORKER_CONCURRENCY")
+    worker_queues: str = Field(
+        default="fast=4,media=2,long=1,default=1", validation_alias="WORKER_QUEUES"
+    )
+    worker_dequeue_timeout_seconds: int = Field(
+        default=5, validation_alias="WORKER_DEQUEUE_TIMEOUT_SECONDS"
+    )
+    # Read timeout of the worker's blocking dequeue connection; must outlast the BLPOP.
+    worker_redis_socket_timeout_seconds: float = Field(
+        default=15.0, validation_alias="WORKER_REDIS_SOCKET_TIMEOUT_SECONDS"
+    )
 
     telegram_bot_token: str = Field(default="", validation_alias="TELEGRAM_BOT_TOKEN")
     telegram_initdata_ttl_seconds: int = Field(
         default=60 * 60 * 24, validation_alias="TELEGRAM_INITDATA_TTL_SECONDS"
     )
+    jwt_secret: str = Field(default="", validation_alias="JWT_SECRET")
+    jwt_algorithm: str = Field(default="HS256", validation_alias="JWT_ALGORITHM")
+    jwt_exp_minutes: int = Field(default=60, validation_alias="JWT_EXP_MINUTES")
+    user_cache_max_size: int = Field(default=10_000, validation_alias="USER_CACHE_MAX_SIZE")
+    user_cache_local_ttl_seconds: float = Field(
+        default=60.0, validation_alias="USER_CACHE_LOCAL_TTL_SECONDS"
+    )
+    user_cache_redis_ttl_seconds: int = Field(
+        default=60 * 60, validation_alias="USER_CACHE_REDIS_TTL_SECONDS"
+    )
     admin_tg_ids: str = Field(default="", validation_alias="ADMIN_TG_IDS")
     admin_api_key: str = Field(default="", validation_alias="ADMIN_API_KEY")
 
@@ -29,12 +87,65 @@ class Settings(BaseSettings):
     )
     genapi_api_key: str = Field(default="", validation_alias="GENAPI_API_KEY")
     text_model: str = Field(default="gpt-5-2", validation_alias="TEXT_MODEL")
+    genapi_timeout_seconds: float = Field(default=30.0, validation_alias="GENAPI_TIMEOUT_SECONDS")
+    # e.g. "/request/cancel/{request_id}"; empty when the provider cannot cancel requests.
+    genapi_cancel_path: str = Field(default="", validation_alias="GENAPI_CANCEL_PATH")
+    genapi_max_connections: int = Field(default=100, validation_alias="GENAPI_MAX_CONNECTIONS")
+    genapi_max_keepalive_connections: int = Field(
+        default=20, validation_alias="GENAPI_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    genapi_keepalive_expiry_seconds: float = Field(
+        default=30.0, validation_alias="GENAPI_KEEPALIVE_EXPIRY_SECONDS"
+    )
+    genapi_poll_tick_seconds: float = Field(default=1.0, validation_alias="GENAPI_POLL_TICK_SECONDS")
+    genapi_poll_max_rps: float = Field(default=20.0, validation_alias="GENAPI_POLL_MAX_RPS")
+    genapi_poll_max_errors: int = Field(default=5, validation_alias="GENAPI_POLL_MAX_ERRORS")
+    genapi_eta_prior_weight: int = Field(default=5, validation_alias="GENAPI_ETA_PRIOR_WEIGHT")
+    genapi_eta_max_samples: int = Field(default=500, validation_alias="GENAPI_ETA_MAX_SAMPLES")
+    genapi_network_max_concurrency: int = Field(
+        default=8, validation_alias="GENAPI_NETWORK_MAX_CONCURRENCY"
+    )
+    genapi_network_max_rps: int = Field(default=5, validation_alias="GENAPI_NETWORK_MAX_RPS")
+    # Per-network overrides as "network=concurrency/rps", e.g. "veo-3.1=2/1,suno=4/2".
+    genapi_network_limits: str = Field(default="", validation_alias="GENAPI_NETWORK_LIMITS")
+    genapi_limiter_lease_seconds: int = Field(
+        default=2400, validation_alias="GENAPI_LIMITER_LEASE_SECONDS"
+    )
+    genapi_rate_limited_retry_seconds: float = Field(
+        default=5.0, validation_alias="GENAPI_RATE_LIMITED_RETRY_SECONDS"
+    )
+    genapi_breaker_window_seconds: int = Field(
+        default=60, validation_alias="GENAPI_BREAKER_WINDOW_SECONDS"
+    )
+    genapi_breaker_min_requests: int = Field(default=10, validation_alias="GENAPI_BREAKER_MIN_REQUESTS")
+    genapi_breaker_failure_ratio: float = Field(
+        default=0.5, validation_alias="GENAPI_BREAKER_FAILURE_RATIO"
+    )
+    genapi_breaker_open_seconds: int = Field(default=30, validation_alias="GENAPI_BREAKER_OPEN_SECONDS")
+    genapi_breaker_max_hold_seconds: int = Field(
+        default=15 * 60, validation_alias="GENAPI_BREAKER_MAX_HOLD_SECONDS"
+    )
+    genapi_breaker_reject_jobs: bool = Field(default=True, validation_alias="GENAPI_BREAKER_REJECT_JOBS")
+    genapi_callback_base_url: str = Field(default="", validation_alias="GENAPI_CALLBACK_BASE_URL")
+    genapi_callback_secret: str = Field(default="", validation_alias="GENAPI_CALLBACK_SECRET")
+    genapi_callback_safety_poll_seconds: int = Field(
+        default=300, validation_alias="GENAPI_CALLBACK_SAFETY_POLL_SECONDS"
+    )
 
     files_storage_path: str = Field(default="/app/media", validation_alias="FILES_STORAGE_PATH")
     files_ttl_hours: int = Field(default=24, validation_alias="FILES_TTL_HOURS")
     files_cleanup_interval_seconds: int = Field(
         default=60 * 60 * 24, validation_alias="FILES_CLEANUP_INTERVAL_SECONDS"
     )
+    files_max_download_bytes: int = Field(
+        default=2 * 1024 * 1024 * 1024, validation_alias="FILES_MAX_DOWNLOAD_BYTES"
+    )
+    files_download_concurrency: int = Field(
+        default=16, validation_alias="FILES_DOWNLOAD_CONCURRENCY"
+    )
+    files_download_concurrency_per_job: int = Field(
+        default=4, validation_alias="FILES_DOWNLOAD_CONCURRENCY_PER_JOB"
+    )
     upload_url_ttl_hours: int = Field(
         default=48, validation_alias="UPLOAD_URL_TTL_HOURS"
     )
@@ -57,15 +168,44 @@ class Settings(BaseSettings):
 
     credit_topup_packages: list[int] = [100, 300, 500]
 
+    @model_validator(mode="after")
+    def _check_worker_timeouts(self) -> "Settings":
+        # A socket that times out with the BLPOP can drop the job id Redis pops for it.
+        if self.worker_redis_socket_timeout_seconds <= self.worker_dequeue_timeout_seconds:
+            raise ValueError(
+                "WORKER_REDIS_SOCKET_TIMEOUT_SECONDS must be greater than "
+                "WORKER_DEQUEUE_TIMEOUT_SECONDS"
+            )
+        return self
+
     def parsed_admin_tg_ids(self) -> set[str]:
         return {item.strip() for item in self.admin_tg_ids.split(",") if item.strip()}
 
+    def parsed_genapi_network_limits(self) -> dict[str, tuple[int, int]]:
+        limits: dict[str, tuple[int, int]] = {}
+        for item in self.genapi_network_limits.split(","):
+            network_id, _, budget = item.strip().partition("=")
+            if not network_id or not budget:
+                continue
+            concurrency, _, rps = budget.partition("/")
+            limits[network_id.strip()] = (
+                int(concurrency or self.genapi_network_max_concurrency),
+                int(rps or self.genapi_network_max_rps),
+            )
+        return limits
+
 
 @lru_cache
 def get_settings() -> Settings:
     return Settings()
 
 
+def is_real_secret(secret: str, min_length: int = 1) -> bool:
+    """False for empty, placeholder or too short secrets."""
+    value = secret.strip()
+    return len(value) >= min_length and value.lower() not in PLACEHOLDER_SECRETS
+
+
 def build_cost_table(settings: Settings) -> dict[str, int]:
     return {
         "text": settings.price_text_rub,
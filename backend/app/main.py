@@ -1,16 +1,30 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from app.api.v1.routes import admin, billing, credits, files, health, jobs, presets
+from app.api.v1.routes import admin, auth, billing, credits, files, health, jobs, presets, providers
+from app.core.redis import close_async_redis, close_redis_pool, get_redis_pool
 from app.core.settings import get_settings
 
 settings = get_settings()
 
-app = FastAPI(title=settings.app_name)
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    get_redis_pool()
+    yield
+    await close_async_redis()
+    close_redis_pool()
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 app.include_router(health.router, prefix=settings.api_prefix)
+app.include_router(auth.router, prefix=settings.api_prefix)
 app.include_router(credits.router, prefix=settings.api_prefix)
 app.include_router(billing.router, prefix=settings.api_prefix)
 app.include_router(jobs.router, prefix=settings.api_prefix)
 app.include_router(files.router, prefix=settings.api_prefix)
 app.include_router(presets.router, prefix=settings.api_prefix)
 app.include_router(admin.router, prefix=settings.api_prefix)
+app.include_router(providers.router, prefix=settings.api_prefix)
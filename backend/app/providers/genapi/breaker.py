@@ -0,0 +1,136 @@
+import logging
+import time
+
+from app.core.redis import get_async_redis
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "pelicanone:genapi:breaker"
+GLOBAL_SCOPE = "*"
+TRIPPED_TTL_S = 24 * 60 * 60
+
+
+class GenApiCircuitBreaker:
+    """Circuit breaker for GenAPI, shared by every process through Redis.
+
+    Outcomes are counted per network and globally in fixed windows. Once a
+    scope sees ``min_requests`` with at least ``failure_ratio`` failures it
+    opens for ``open_s``; after that it is half-open and lets a single probe
+    through, which either closes it or opens it again. Like the limiter it
+    stays out of the way when Redis is unavailable.
+    """
+
+    def __init__(
+        self,
+        window_s: int = 60,
+        min_requests: int = 10,
+        failure_ratio: float = 0.5,
+        open_s: int = 30,
+        redis_factory=get_async_redis,
+    ) -> None:
+        self.window_s = max(1, window_s)
+        self.min_requests = max(1, min_requests)
+        self.failure_ratio = failure_ratio
+        self.open_s = max(1, open_s)
+        self._redis_factory = redis_factory
+
+    async def open_for(self, network_id: str) -> float:
+        """Seconds until ``network_id`` (or GenAPI as a whole) may be probed; 0 if not open."""
+        try:
+            redis = self._redis_factory()
+            waits = [await redis.pttl(self._key(scope, "open")) for scope in self._scopes(network_id)]
+        except Exception as exc:
+            logger.warning("genapi breaker: state unavailable: %s", exc)
+            return 0.0
+        return max([wait / 1000 for wait in waits if wait and wait > 0], default=0.0)
+
+    async def retry_in(self, network_id: str) -> float:
+        """Admission check before a request: 0 to go ahead, otherwise seconds to hold off.
+
+        In the half-open state only the caller that wins the probe gets 0.
+        """
+        try:
+            redis = self._redis_factory()
+            for scope in self._scopes(network_id):
+                wait_s = await self._admit(redis, scope)
+                if wait_s > 0:
+                    return wait_s
+        except Exception as exc:
+            logger.warning("genapi breaker: admitting %s without redis: %s", network_id, exc)
+        return 0.0
+
+    async def record(self, network_id: str, ok: bool) -> None:
+        try:
+            redis = self._redis_factory()
+            for scope in self._scopes(network_id):
+                await self._record(redis, scope, ok)
+        except Exception as exc:
+            logger.warning("genapi breaker: record failed network=%s: %s", network_id, exc)
+
+    async def _admit(self, redis, scope: str) -> float:
+        open_ms = await redis.pttl(self._key(scope, "open"))
+        if open_ms and open_ms > 0:
+            return open_ms / 1000
+        if await redis.get(self._key(scope, "tripped")) is None:
+            return 0.0
+        if await redis.set(self._key(scope, "probe"), "1", nx=True, ex=self.open_s):
+            logger.info("genapi breaker: probing scope=%s", scope)
+            return 0.0
+        return float(self.open_s)
+
+    async def _record(self, redis, scope: str, ok: bool) -> None:
+        tripped = await redis.get(self._key(scope, "tripped")) is not None
+        if tripped:
+            if ok:
+                logger.info("genapi breaker: closed scope=%s", scope)
+                await redis.delete(self._key(scope, "tripped"), self._key(scope, "probe"))
+            else:
+                await self._open(redis, scope)
+            return
+        window = int(time.time() // self.window_s)
+        total_key = self._key(scope, f"total:{window}")
+        failed_key = self._key(scope, f"failed:{window}")
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.incr(total_key)
+            pipe.expire(total_key, self.window_s * 2)
+            if not ok:
+                pipe.incr(failed_key)
+                pipe.expire(failed_key, self.window_s * 2)
+            results = await pipe.execute()
+        if ok:
+            return
+        total, failed = results[0], results[2]
+        if total >= self.min_requests and failed / total >= self.failure_ratio:
+            logger.warning("genapi breaker: opened scope=%s failed=%s/%s", scope, failed, total)
+            await redis.delete(total_key, failed_key)
+            await self._open(redis, scope)
+
+    async def _open(self, redis, scope: str) -> None:
+        await redis.set(self._key(scope, "open"), "1", ex=self.open_s)
+        await redis.set(self._key(scope, "tripped"), "1", ex=TRIPPED_TTL_S)
+        await redis.delete(self._key(scope, "probe"))
+
+    @staticmethod
+    def _scopes(network_id: str) -> tuple[str, str]:
+        return GLOBAL_SCOPE, network_id
+
+    @staticmethod
+    def _key(scope: str, suffix: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:{scope}:{suffix}"
+
+
+_breaker: GenApiCircuitBreaker | None = None
+
+
+def get_genapi_breaker() -> GenApiCircuitBreaker:
+    global _breaker
+    if _breaker is None:
+        settings = get_settings()
+        _breaker = GenApiCircuitBreaker(
+            window_s=settings.genapi_breaker_window_seconds,
+            min_requests=settings.genapi_breaker_min_requests,
+            failure_ratio=settings.genapi_breaker_failure_ratio,
+            open_s=settings.genapi_breaker_open_seconds,
+        )
+    return _breaker
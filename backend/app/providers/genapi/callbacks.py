@@ -0,0 +1,35 @@
+import hashlib
+import hmac
+
+from app.core.settings import get_settings, is_real_secret
+
+
+def _callback_secret() -> str:
+    """The configured callback secret, or "" when it is unset or a placeholder."""
+    secret = get_settings().genapi_callback_secret
+    return secret if is_real_secret(secret) else ""
+
+
+def callback_token(job_id: str) -> str:
+    return hmac.new(_callback_secret().encode(), job_id.encode(), hashlib.sha256).hexdigest()
+
+
+def build_callback_url(job_id: str) -> str | None:
+    """Return the provider callback URL for a job, or None when callbacks are off.
+
+    Callbacks stay off until a real ``GENAPI_CALLBACK_SECRET`` is configured.
+    """
+    settings = get_settings()
+    if not settings.genapi_callback_base_url or not _callback_secret():
+        return None
+    base = settings.genapi_callback_base_url.rstrip("/")
+    return (
+        f"{base}{settings.api_prefix}/providers/genapi/callback/{job_id}"
+        f"?token={callback_token(job_id)}"
+    )
+
+
+def verify_callback_token(job_id: str, token: str | None) -> bool:
+    if not _callback_secret() or not token:
+        return False
+    return hmac.compare_digest(callback_token(job_id), token)
@@ -1,63 +1,163 @@
+import asyncio
+import logging
 import time
+from email.utils import parsedate_to_datetime
 from typing import Any
 
 import httpx
 
 from app.core.settings import get_settings
-from app.providers.genapi.errors import GenApiRetryableError
+from app.providers.genapi.errors import GenApiRateLimitedError, GenApiRetryableError
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503}
+SUCCESS_STATUSES = {"done", "success", "succeeded", "completed"}
+ERROR_STATUSES = {"error", "failed", "canceled", "cancelled"}
+
+
+def is_terminal_status(data: dict) -> bool:
+    status = str(data.get("status", "")).lower()
+    return status in SUCCESS_STATUSES or status in ERROR_STATUSES
+
+
+def next_poll_interval(interval_s: float, attempts: int) -> float:
+    return min(interval_s * (1 + attempts * 0.1), interval_s * 5)
+
+
+def eta_poll_delay(elapsed_s: float, eta_s: float, interval_s: float) -> float:
+    """Delay before the next poll of a request expected to take ``eta_s``.
+
+    Before the ETA each poll halves the remaining time (the first one comes
+    at half the ETA), so polls get denser as completion approaches; past it
+    the gap grows with the overrun up to the usual cap.
+    """
+    remaining_s = eta_s - elapsed_s
+    if remaining_s > 0:
+        return max(remaining_s / 2, interval_s)
+    return min(interval_s * (1 - remaining_s / eta_s), interval_s * 5)
 
-class GenApiClient:
-    def __init__(self) -> None:
-        self._client = httpx.Client(
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def raise_for_retryable(response: httpx.Response) -> None:
+    if response.status_code == 429:
+        raise GenApiRateLimitedError(parse_retry_after(response.headers.get("Retry-After")))
+    if response.status_code in RETRYABLE_STATUS_CODES:
+        raise GenApiRetryableError("retryable_status")
+
+
+class AsyncGenApiClient:
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        self._client = httpx.AsyncClient(
             base_url=settings.genapi_base_url,
             headers={"Authorization": f"Bearer {settings.genapi_api_key}"},
-            timeout=httpx.Timeout(30.0),
+            timeout=httpx.Timeout(settings.genapi_timeout_seconds),
+            limits=httpx.Limits(
+                max_connections=settings.genapi_max_connections,
+                max_keepalive_connections=settings.genapi_max_keepalive_connections,
+                keepalive_expiry=settings.genapi_keepalive_expiry_seconds,
+            ),
+            transport=transport,
         )
 
-    def submit_network(self, network_id: str, params: dict, files: dict | None = None) -> dict:
-        return self._post(f"/networks/{network_id}", params, files)
+    @property
+    def is_closed(self) -> bool:
+        return self._client.is_closed
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def submit_network(
+        self, network_id: str, params: dict, files: dict | None = None
+    ) -> dict:
+        return await self._post(f"/networks/{network_id}", params, files)
 
-    def submit_function(
+    async def submit_function(
         self, function_id: str, implementation: str, params: dict, files: dict | None = None
     ) -> dict:
         payload = {"implementation": implementation, "params": params}
-        return self._post(f"/functions/{function_id}", payload, files)
+        return await self._post(f"/functions/{function_id}", payload, files)
 
-    def poll(self, request_id: str) -> dict:
+    async def poll(self, request_id: str) -> dict:
         try:
-            response = self._client.get(f"/request/get/{request_id}")
+            response = await self._client.get(f"/request/get/{request_id}")
         except httpx.HTTPError as exc:
             raise GenApiRetryableError("network_error") from exc
-        if response.status_code in {429, 500, 502, 503}:
-            raise GenApiRetryableError("retryable_status")
-        response.raise_for_status()
-        return response.json()
+        return self._handle_response(response)
+
+    async def cancel(self, request_id: str) -> dict:
+        return await self._post(settings.genapi_cancel_path.format(request_id=request_id), {})
 
-    def _post(self, path: str, payload: dict, files: dict | None = None) -> dict:
+    async def _post(self, path: str, payload: dict, files: dict | None = None) -> dict:
         try:
-            response = self._client.post(path, json=payload, files=files)
+            response = await self._client.post(path, json=payload, files=files)
         except httpx.HTTPError as exc:
             raise GenApiRetryableError("network_error") from exc
-        if response.status_code in {429, 500, 502, 503}:
-            raise GenApiRetryableError("retryable_status")
+        return self._handle_response(response)
+
+    def _handle_response(self, response: httpx.Response) -> dict:
+        raise_for_retryable(response)
         response.raise_for_status()
         return response.json()
 
-    def poll_until_done(self, request_id: str, timeout_s: int = 120, interval_s: float = 2.0) -> dict:
-        started = time.monotonic()
-        attempts = 0
-        success_statuses = {"done", "success", "succeeded", "completed"}
-        error_statuses = {"error", "failed", "canceled", "cancelled"}
-        while True:
-            if time.monotonic() - started > timeout_s:
-                raise GenApiRetryableError("genapi_timeout")
-            data = self.poll(request_id)
-            status = str(data.get("status", "")).lower()
-            if status in success_statuses or status in error_statuses:
-                return data
-            sleep_interval = min(interval_s * (1 + attempts * 0.1), interval_s * 5)
-            attempts += 1
-            time.sleep(sleep_interval)
+
+_shared_client: AsyncGenApiClient | None = None
+_shared_loop: asyncio.AbstractEventLoop | None = None
+_closing: set[asyncio.Future] = set()
+
+
+def get_genapi_client() -> AsyncGenApiClient:
+    """Return the process-wide client, recreating it if the event loop changed."""
+    global _shared_client, _shared_loop
+    loop = asyncio.get_running_loop()
+    if _shared_client is None or _shared_client.is_closed or _shared_loop is not loop:
+        if _shared_client is not None and not _shared_client.is_closed:
+            _close_stale_client(_shared_client, _shared_loop)
+        _shared_client = AsyncGenApiClient()
+        _shared_loop = loop
+    return _shared_client
+
+
+def _close_stale_client(
+    client: AsyncGenApiClient, loop: asyncio.AbstractEventLoop | None
+) -> None:
+    """Close a client left from another event loop so its pooled connections are released.
+
+    A loop still running elsewhere closes it itself; otherwise the close runs
+    on the current loop in the background.
+    """
+    if loop is not None and loop.is_running():
+        future = asyncio.run_coroutine_threadsafe(_aclose_quietly(client), loop)
+    else:
+        future = asyncio.get_running_loop().create_task(_aclose_quietly(client))
+    _closing.add(future)
+    future.add_done_callback(_closing.discard)
+
+
+async def _aclose_quietly(client: AsyncGenApiClient) -> None:
+    try:
+        await client.aclose()
+    except Exception as exc:  # pragma: no cover - transports of a closed loop
+        logger.debug("GenAPI client close failed: %r", exc)
+
+
+async def close_genapi_client() -> None:
+    global _shared_client, _shared_loop
+    client, _shared_client, _shared_loop = _shared_client, None, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
@@ -0,0 +1,93 @@
+import logging
+
+from app.core.redis import get_async_redis
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "pelicanone:genapi:durations"
+# Upper bounds (seconds) of the histogram buckets; slower completions land in the last one.
+BUCKETS_S = (
+    5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 240, 300, 420, 600, 900, 1200, 1800, 2700, 3600
+)
+
+
+def bucket_for(duration_s: float) -> int:
+    return next((bound for bound in BUCKETS_S if duration_s <= bound), BUCKETS_S[-1])
+
+
+class NetworkDurationStats:
+    """Per-network histograms of how long GenAPI generations really take.
+
+    Completions are counted into log-spaced buckets in a Redis hash. The
+    expected duration is the median of that histogram with the preset's
+    static ``eta_seconds`` mixed in as ``prior_weight`` pseudo-observations,
+    so a network starts at its preset ETA and drifts towards what it does.
+    Counts are halved once they pass ``max_samples`` to follow recent behaviour.
+    """
+
+    def __init__(
+        self,
+        prior_weight: int = 5,
+        max_samples: int = 500,
+        redis_factory=get_async_redis,
+    ) -> None:
+        self.prior_weight = prior_weight
+        self.max_samples = max_samples
+        self._redis_factory = redis_factory
+
+    async def record(self, network_id: str, duration_s: float) -> None:
+        key = self._key(network_id)
+        try:
+            redis = self._redis_factory()
+            await redis.hincrby(key, str(bucket_for(duration_s)), 1)
+            counts = await redis.hgetall(key)
+            if sum(int(value) for value in counts.values()) > self.max_samples:
+                halved = {field: int(value) // 2 for field, value in counts.items()}
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.delete(key)
+                    pipe.hset(key, mapping={k: v for k, v in halved.items() if v})
+                    await pipe.execute()
+        except Exception as exc:
+            logger.warning("genapi durations: record failed network=%s: %s", network_id, exc)
+
+    async def expected_seconds(self, network_id: str, prior_s: float | None) -> float | None:
+        """Median duration for ``network_id``; ``prior_s`` alone while nothing is recorded."""
+        try:
+            counts = await self._redis_factory().hgetall(self._key(network_id))
+        except Exception as exc:
+            logger.warning("genapi durations: read failed network=%s: %s", network_id, exc)
+            counts = {}
+        histogram: dict[float, int] = {}
+        for field, value in counts.items():
+            bound = float(field.decode() if isinstance(field, bytes) else field)
+            histogram[bound] = histogram.get(bound, 0) + int(value)
+        if prior_s:
+            histogram[float(prior_s)] = histogram.get(float(prior_s), 0) + self.prior_weight
+        total = sum(histogram.values())
+        if not total:
+            return None
+        seen = 0
+        for bound in sorted(histogram):
+            seen += histogram[bound]
+            if seen * 2 >= total:
+                return bound
+        return None
+
+    @staticmethod
+    def _key(network_id: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:{network_id}"
+
+
+_stats: NetworkDurationStats | None = None
+
+
+def get_duration_stats() -> NetworkDurationStats:
+    global _stats
+    if _stats is None:
+        settings = get_settings()
+        _stats = NetworkDurationStats(
+            prior_weight=settings.genapi_eta_prior_weight,
+            max_samples=settings.genapi_eta_max_samples,
+        )
+    return _stats
@@ -4,3 +4,26 @@ class GenApiError(Exception):
 
 class GenApiRetryableError(GenApiError):
     pass
+
+
+class GenApiTimeoutError(GenApiRetryableError):
+    """The request did not finish within its polling window; the job is not retried."""
+
+    def __init__(self) -> None:
+        super().__init__("genapi_timeout")
+
+
+class GenApiRateLimitedError(GenApiRetryableError):
+    """The provider answered 429; ``retry_after_s`` comes from its Retry-After header."""
+
+    def __init__(self, retry_after_s: float | None = None) -> None:
+        super().__init__("rate_limited")
+        self.retry_after_s = retry_after_s
+
+
+class GenApiUnavailableError(GenApiRetryableError):
+    """The circuit breaker is open; retry after ``retry_after_s``."""
+
+    def __init__(self, retry_after_s: float | None = None) -> None:
+        super().__init__("genapi_unavailable")
+        self.retry_after_s = retry_after_s
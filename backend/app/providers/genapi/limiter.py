@@ -0,0 +1,127 @@
+import logging
+import time
+from dataclasses import dataclass
+
+from app.core.redis import get_async_redis
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "pelicanone:genapi"
+
+
+@dataclass(frozen=True)
+class NetworkBudget:
+    max_concurrency: int
+    max_rps: int
+
+
+class GenApiLimiter:
+    """Cluster-wide admission control for GenAPI submissions, keyed by network id.
+
+    A network has a budget of concurrent requests (slots held from submit
+    until the job finishes, as leases so a crashed worker cannot leak them)
+    and of submissions per second (a one-second window counter). A 429 with
+    ``Retry-After`` blocks the whole network for that long. ``acquire``
+    returns how long the caller should wait; callers reschedule the job
+    instead of sleeping on a worker. If Redis is unavailable the limiter
+    admits everything rather than stall generation.
+    """
+
+    def __init__(
+        self,
+        default_budget: NetworkBudget,
+        budgets: dict[str, NetworkBudget] | None = None,
+        lease_s: float = 2400.0,
+        retry_s: float = 5.0,
+        redis_factory=get_async_redis,
+    ) -> None:
+        self.default_budget = default_budget
+        self.budgets = budgets or {}
+        self.lease_s = lease_s
+        self.retry_s = retry_s
+        self._redis_factory = redis_factory
+
+    def budget(self, network_id: str) -> NetworkBudget:
+        return self.budgets.get(network_id, self.default_budget)
+
+    async def acquire(self, network_id: str, holder: str) -> float:
+        """Take a slot for ``holder``; 0 on success, otherwise seconds to wait."""
+        budget = self.budget(network_id)
+        try:
+            redis = self._redis_factory()
+            blocked_ms = await redis.pttl(self._key(network_id, "blocked"))
+            if blocked_ms and blocked_ms > 0:
+                return blocked_ms / 1000
+            now = time.time()
+            if budget.max_concurrency > 0 and not await self._take_slot(
+                redis, network_id, holder, budget.max_concurrency, now
+            ):
+                return self.retry_s
+            if budget.max_rps > 0:
+                window = int(now)
+                rate_key = self._key(network_id, f"rate:{window}")
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.incr(rate_key)
+                    pipe.expire(rate_key, 2)
+                    count, _ = await pipe.execute()
+                if count > budget.max_rps:
+                    await self.release(network_id, holder)
+                    return max(window + 1 - now, 0.01)
+        except Exception as exc:
+            logger.warning("genapi limiter: admitting %s without redis: %s", network_id, exc)
+        return 0.0
+
+    async def release(self, network_id: str, holder: str) -> None:
+        try:
+            await self._redis_factory().zrem(self._key(network_id, "slots"), holder)
+        except Exception as exc:
+            logger.warning("genapi limiter: release failed network=%s: %s", network_id, exc)
+
+    async def block(self, network_id: str, retry_after_s: float | None) -> None:
+        """Hold back every submission to ``network_id`` for ``retry_after_s``."""
+        delay_ms = int((retry_after_s or self.retry_s) * 1000)
+        try:
+            await self._redis_factory().set(self._key(network_id, "blocked"), "1", px=delay_ms)
+        except Exception as exc:
+            logger.warning("genapi limiter: block failed network=%s: %s", network_id, exc)
+
+    async def _take_slot(self, redis, network_id: str, holder: str, limit: int, now: float) -> bool:
+        # Holders are ranked by when they asked, so of two racing requests
+        # for the last slot the later one sees itself past the limit.
+        slots_key = self._key(network_id, "slots")
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(slots_key, "-inf", now - self.lease_s)
+            pipe.zadd(slots_key, {holder: now}, nx=True)
+            pipe.zrank(slots_key, holder)
+            pipe.expire(slots_key, int(self.lease_s))
+            _, _, rank, _ = await pipe.execute()
+        if rank is not None and rank < limit:
+            return True
+        await redis.zrem(slots_key, holder)
+        return False
+
+    @staticmethod
+    def _key(network_id: str, suffix: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:{network_id}:{suffix}"
+
+
+_limiter: GenApiLimiter | None = None
+
+
+def get_genapi_limiter() -> GenApiLimiter:
+    global _limiter
+    if _limiter is None:
+        settings = get_settings()
+        _limiter = GenApiLimiter(
+            NetworkBudget(
+                settings.genapi_network_max_concurrency, settings.genapi_network_max_rps
+            ),
+            {
+                network_id: NetworkBudget(*limits)
+                for network_id, limits in settings.parsed_genapi_network_limits().items()
+            },
+            lease_s=settings.genapi_limiter_lease_seconds,
+            retry_s=settings.genapi_rate_limited_retry_seconds,
+        )
+    return _limiter
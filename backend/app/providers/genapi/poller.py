@@ -0,0 +1,190 @@
+import asyncio
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from app.core.settings import get_settings
+from app.providers.genapi.client import (
+    AsyncGenApiClient,
+    eta_poll_delay,
+    get_genapi_client,
+    is_terminal_status,
+    next_poll_interval,
+)
+from app.providers.genapi.errors import GenApiTimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingRequest:
+    request_id: str
+    future: asyncio.Future
+    deadline: float
+    interval_s: float
+    next_poll_at: float
+    started_at: float
+    eta_s: float | None = None
+    attempts: int = 0
+    errors: int = 0
+    waiters: int = 1
+    last_status: str | None = field(default=None)
+
+
+class GenApiPoller:
+    """Single polling loop shared by every in-flight GenAPI request of the process.
+
+    Jobs register their ``request_id`` and await the terminal payload instead
+    of running their own poll loops. Polls are issued on one schedule and are
+    capped at ``max_rps`` requests per second across all registered ids. A
+    request registered with its expected duration is first polled halfway
+    through it and then more often as it nears completion.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], AsyncGenApiClient] = get_genapi_client,
+        tick_s: float | None = None,
+        max_rps: float | None = None,
+        max_errors: int | None = None,
+    ) -> None:
+        settings = get_settings()
+        self._client_factory = client_factory
+        self.tick_s = tick_s if tick_s is not None else settings.genapi_poll_tick_seconds
+        self.max_rps = max_rps if max_rps is not None else settings.genapi_poll_max_rps
+        self.max_errors = (
+            max_errors if max_errors is not None else settings.genapi_poll_max_errors
+        )
+        self._pending: dict[str, _PendingRequest] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def last_status(self, request_id: str) -> str | None:
+        entry = self._pending.get(request_id)
+        return entry.last_status if entry else None
+
+    async def wait(
+        self,
+        request_id: str,
+        timeout_s: float,
+        interval_s: float,
+        eta_s: float | None = None,
+        elapsed_s: float = 0.0,
+    ) -> dict:
+        """Await the terminal payload of ``request_id``.
+
+        ``elapsed_s`` is how long ago the request was submitted, so a request
+        resumed after a worker restart keeps its original deadline and ETA; it
+        is polled right away since it may have finished while unwatched.
+        """
+        loop = asyncio.get_running_loop()
+        entry = self._pending.get(request_id)
+        if entry is None:
+            now = loop.time()
+            started_at = now - elapsed_s
+            entry = _PendingRequest(
+                request_id=request_id,
+                future=loop.create_future(),
+                deadline=started_at + timeout_s,
+                interval_s=interval_s,
+                next_poll_at=(
+                    now + eta_poll_delay(0, eta_s, interval_s) if eta_s and not elapsed_s else now
+                ),
+                started_at=started_at,
+                eta_s=eta_s,
+            )
+            self._pending[request_id] = entry
+        else:
+            entry.waiters += 1
+        self._ensure_running()
+        try:
+            return await asyncio.shield(entry.future)
+        finally:
+            entry.waiters -= 1
+            if entry.waiters <= 0 and self._pending.get(request_id) is entry:
+                self._pending.pop(request_id, None)
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            now = loop.time()
+            for entry in list(self._pending.values()):
+                if now > entry.deadline:
+                    self._reject(entry, GenApiTimeoutError())
+            budget = max(1, int(self.max_rps * self.tick_s))
+            due = sorted(
+                (entry for entry in self._pending.values() if entry.next_poll_at <= now),
+                key=lambda entry: entry.next_poll_at,
+            )[:budget]
+            if due:
+                client = self._client_factory()
+                await asyncio.gather(*(self._poll_one(client, entry) for entry in due))
+            if not self._pending:
+                break
+            if due:
+                delay = self.tick_s
+            else:
+                next_due = min(entry.next_poll_at for entry in self._pending.values())
+                delay = min(next_due - loop.time(), self.tick_s)
+            await asyncio.sleep(max(delay, 0.01))
+
+    async def _poll_one(self, client: AsyncGenApiClient, entry: _PendingRequest) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            data = await client.poll(entry.request_id)
+        except Exception as exc:
+            entry.errors += 1
+            logger.warning(
+                "GenAPI poll failed request_id=%s errors=%s: %s",
+                entry.request_id,
+                entry.errors,
+                exc,
+            )
+            if entry.errors >= self.max_errors:
+                self._reject(entry, exc)
+                return
+            entry.next_poll_at = loop.time() + next_poll_interval(entry.interval_s, entry.attempts)
+            return
+        entry.errors = 0
+        entry.last_status = str(data.get("status", "")).lower()
+        if is_terminal_status(data):
+            self._resolve(entry, data)
+            return
+        entry.next_poll_at = loop.time() + self._next_delay(entry, loop.time())
+        entry.attempts += 1
+
+    @staticmethod
+    def _next_delay(entry: _PendingRequest, now: float) -> float:
+        if entry.eta_s:
+            return eta_poll_delay(now - entry.started_at, entry.eta_s, entry.interval_s)
+        return next_poll_interval(entry.interval_s, entry.attempts)
+
+    def _resolve(self, entry: _PendingRequest, data: dict) -> None:
+        self._pending.pop(entry.request_id, None)
+        if not entry.future.done():
+            entry.future.set_result(data)
+
+    def _reject(self, entry: _PendingRequest, exc: Exception) -> None:
+        self._pending.pop(entry.request_id, None)
+        if not entry.future.done():
+            entry.future.set_exception(exc)
+
+
+_shared_poller: GenApiPoller | None = None
+_shared_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_genapi_poller() -> GenApiPoller:
+    global _shared_poller, _shared_loop
+    loop = asyncio.get_running_loop()
+    if _shared_poller is None or _shared_loop is not loop:
+        _shared_poller = GenApiPoller()
+        _shared_loop = loop
+    return _shared_poller
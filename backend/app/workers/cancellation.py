@@ -0,0 +1,112 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable
+
+from app.core.job_events import CANCEL_CHANNEL, is_job_cancel_requested
+from app.core.redis import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelWatcher:
+    """Aborts the coroutines of jobs their owner cancelled.
+
+    One pub/sub subscription per worker process listens on ``CANCEL_CHANNEL``
+    and cancels the task running the named job, so a cancelled generation
+    stops polling or downloading at its next await and frees its slot.
+    """
+
+    def __init__(
+        self,
+        redis_factory: Callable | None = None,
+        listen_timeout_s: float = 1.0,
+    ) -> None:
+        self._redis_factory = redis_factory
+        self.listen_timeout_s = listen_timeout_s
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._cancelled: set[str] = set()
+        self._subscribed = asyncio.Event()
+        self._listener: asyncio.Task | None = None
+
+    @contextlib.asynccontextmanager
+    async def watch(self, job_id):
+        key = str(job_id)
+        self._tasks[key] = asyncio.current_task()
+        try:
+            await self._ensure_listening()
+            # A cancel sent before the subscription was up only left its flag.
+            if await is_job_cancel_requested(key):
+                self._cancel(key)
+            yield
+        finally:
+            self._tasks.pop(key, None)
+            if not self._tasks and self._listener is not None:
+                self._listener.cancel()
+
+    def consume(self, job_id) -> bool:
+        """True once if ``job_id`` was aborted by this watcher (not by shutdown)."""
+        key = str(job_id)
+        if key not in self._cancelled:
+            return False
+        self._cancelled.discard(key)
+        task = asyncio.current_task()
+        if task is not None:
+            task.uncancel()
+        return True
+
+    def _cancel(self, key: str) -> None:
+        task = self._tasks.get(key)
+        if task is None or task.done():
+            return
+        logger.info("job %s cancelled by its owner, aborting", key)
+        self._cancelled.add(key)
+        task.cancel()
+
+    async def _ensure_listening(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._subscribed.clear()
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), self.listen_timeout_s)
+        except asyncio.TimeoutError:
+            logger.warning("cancel watcher: subscription not ready, relying on the flag")
+
+    async def _listen(self) -> None:
+        while self._tasks:
+            pubsub = None
+            try:
+                pubsub = (self._redis_factory or get_async_redis)().pubsub()
+                await pubsub.subscribe(CANCEL_CHANNEL)
+                self._subscribed.set()
+                while self._tasks:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=self.listen_timeout_s
+                    )
+                    if message is None:
+                        continue
+                    data = message.get("data")
+                    self._cancel(data.decode() if isinstance(data, bytes) else str(data))
+            except Exception as exc:
+                logger.warning("cancel watcher: subscription failed: %r", exc)
+                self._subscribed.clear()
+                await asyncio.sleep(self.listen_timeout_s)
+            finally:
+                if pubsub is not None:
+                    with contextlib.suppress(Exception):
+                        await pubsub.unsubscribe()
+                        await pubsub.aclose()
+        self._subscribed.clear()
+
+
+_shared_watcher: JobCancelWatcher | None = None
+_shared_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_cancel_watcher() -> JobCancelWatcher:
+    global _shared_watcher, _shared_loop
+    loop = asyncio.get_running_loop()
+    if _shared_watcher is None or _shared_loop is not loop:
+        _shared_watcher = JobCancelWatcher()
+        _shared_loop = loop
+    return _shared_watcher
@@ -0,0 +1,231 @@
+import asyncio
+import logging
+import traceback
+
+from redis import Redis
+from rq import Queue
+from rq.exceptions import DequeueTimeout
+from rq.job import Job as RQJob
+from rq.job import JobStatus
+from rq.registry import StartedJobRegistry
+
+try:
+    from rq.executions import Execution
+except ImportError:  # rq < 2 tracks started jobs by id
+    Execution = None
+
+from app.core.job_files import close_download_client
+from app.core.redis import close_async_redis
+from app.db import engine
+from app.providers.genapi.client import close_genapi_client
+from app.workers.scheduling import enqueue_scheduled_jobs
+from app.workers.tasks import get_async_entrypoint
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULT_TTL = 500
+DEFAULT_JOB_TIMEOUT = 180
+DEFAULT_FAILURE_TTL = 60 * 60 * 24 * 7
+# Same grace RQ's Worker gives a started job before its registry entry expires.
+STARTED_TTL_MARGIN_S = 60
+
+
+class ConcurrentJobExecutor:
+    """Runs up to ``concurrency`` RQ jobs at once on a single event loop.
+
+    Jobs whose task has an async entrypoint are awaited directly, anything
+    else is performed in a thread. Each job is acknowledged or failed on its
+    own, so one slow or broken generation never holds back the others.
+
+    ``reserved_slots`` holds slots back for a queue (e.g. text jobs behind a
+    video backlog): the other queues are skipped when dequeuing once only the
+    reservation is left, and may otherwise borrow every idle slot.
+    """
+
+    def __init__(
+        self,
+        queues: list[Queue],
+        connection: Redis,
+        concurrency: int,
+        dequeue_timeout: int = 5,
+        scheduler=None,
+        scheduler_interval: float = 5.0,
+        reserved_slots: dict[str, int] | None = None,
+    ) -> None:
+        self.queues = queues
+        self.reserved_slots = reserved_slots or {}
+        self.connection = connection
+        self.concurrency = max(1, concurrency)
+        self.dequeue_timeout = dequeue_timeout
+        self.scheduler = scheduler
+        self.scheduler_interval = scheduler_interval
+        self._stopping = asyncio.Event()
+        self._tasks: set[asyncio.Task] = set()
+        self._in_flight: dict[str, int] = {}
+        self._slot_freed = asyncio.Event()
+        self._executions: dict[str, object] = {}
+
+    def request_stop(self) -> None:
+        logger.info("executor: stop requested, in_flight=%s", len(self._tasks))
+        self._stopping.set()
+
+    async def run(self) -> None:
+        slots = asyncio.Semaphore(self.concurrency)
+        logger.info(
+            "executor: start queues=%s concurrency=%s slots=%s",
+            [queue.name for queue in self.queues],
+            self.concurrency,
+            self.reserved_slots,
+        )
+        scheduler_task = None
+        if self.scheduler is not None:
+            scheduler_task = asyncio.create_task(self._run_scheduler())
+        try:
+            while not self._stopping.is_set():
+                await slots.acquire()
+                self._slot_freed.clear()
+                queues = self._open_queues()
+                if self.queues and not queues:
+                    slots.release()
+                    await self._wait_for_slot()
+                    continue
+                dequeued = await self._next_job(queues)
+                if dequeued is None:
+                    slots.release()
+                    continue
+                job, queue = dequeued
+                queue_name = getattr(queue, "name", None)
+                self._in_flight[queue_name] = self._in_flight.get(queue_name, 0) + 1
+                task = asyncio.create_task(self._perform(job, queue))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                task.add_done_callback(lambda _task, name=queue_name: self._release(name))
+                task.add_done_callback(lambda _task: slots.release())
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            if scheduler_task is not None:
+                scheduler_task.cancel()
+            await close_genapi_client()
+            await close_download_client()
+            await close_async_redis()
+            await engine.dispose()
+            logger.info("executor: stopped")
+
+    async def _run_scheduler(self) -> None:
+        """Move due rq-scheduler jobs (retries, safety polls, cleanup) onto their queues."""
+        while not self._stopping.is_set():
+            try:
+                await asyncio.to_thread(enqueue_scheduled_jobs, self.scheduler)
+            except Exception as exc:
+                logger.exception("executor: scheduler tick failed", exc_info=exc)
+            await asyncio.sleep(self.scheduler_interval)
+
+    def _open_queues(self) -> list[Queue]:
+        """Queues, in priority order, that may take a slot without eating another's reservation."""
+        free = self.concurrency - sum(self._in_flight.values())
+        return [queue for queue in self.queues if free > self._held_for_others(queue.name)]
+
+    def _held_for_others(self, queue_name: str) -> int:
+        """Reserved slots of the other queues that they are not using right now."""
+        return sum(
+            max(0, reserved - self._in_flight.get(name, 0))
+            for name, reserved in self.reserved_slots.items()
+            if name != queue_name
+        )
+
+    def _release(self, queue_name: str | None) -> None:
+        self._in_flight[queue_name] -= 1
+        self._slot_freed.set()
+
+    async def _wait_for_slot(self) -> None:
+        try:
+            await asyncio.wait_for(self._slot_freed.wait(), max(self.dequeue_timeout, 1))
+        except asyncio.TimeoutError:
+            pass
+
+    async def _next_job(self, queues: list[Queue]) -> tuple[RQJob, Queue] | None:
+        if self._stopping.is_set():
+            return None
+        try:
+            return await asyncio.to_thread(self._dequeue, queues)
+        except DequeueTimeout:
+            # An idle queue: dequeue_any raises this every dequeue_timeout.
+            return None
+        except Exception as exc:
+            logger.exception("executor: dequeue failed", exc_info=exc)
+            await asyncio.sleep(1)
+            return None
+
+    def _dequeue(self, queues: list[Queue]) -> tuple[RQJob, Queue] | None:
+        return Queue.dequeue_any(queues, self.dequeue_timeout, connection=self.connection)
+
+    async def _perform(self, job: RQJob, queue: Queue) -> None:
+        logger.info("executor: job start rq_job=%s func=%s", job.id, job.func_name)
+        try:
+            await asyncio.to_thread(self._mark_started, job)
+            await self._execute(job)
+        except Exception as exc:
+            logger.exception("executor: job failed rq_job=%s", job.id, exc_info=exc)
+            exc_string = "".join(traceback.format_exception(exc))
+            try:
+                await asyncio.to_thread(self._mark_failed, job, queue, exc_string)
+            except Exception as mark_exc:  # pragma: no cover - redis outage
+                logger.exception("executor: failed to mark job %s", job.id, exc_info=mark_exc)
+            return
+        try:
+            await asyncio.to_thread(self._mark_finished, job, queue)
+        except Exception as mark_exc:  # pragma: no cover - redis outage
+            logger.exception("executor: failed to ack job %s", job.id, exc_info=mark_exc)
+        logger.info("executor: job done rq_job=%s", job.id)
+
+    async def _execute(self, job: RQJob):
+        entrypoint = get_async_entrypoint(job.func_name)
+        timeout = job.timeout if job.timeout and job.timeout > 0 else None
+        if entrypoint is None:
+            return await asyncio.wait_for(asyncio.to_thread(job.perform), timeout)
+        return await asyncio.wait_for(entrypoint(*job.args, **job.kwargs), timeout)
+
+    def _mark_started(self, job: RQJob) -> None:
+        """Mark the job started and list it in ``StartedJobRegistry``, as ``Worker`` does.
+
+        The entry expires a little after the job's timeout, so RQ's registry
+        cleanup fails the job if this process dies while running it.
+        """
+        timeout = job.timeout if job.timeout and job.timeout > 0 else DEFAULT_JOB_TIMEOUT
+        ttl = timeout + STARTED_TTL_MARGIN_S
+        with self.connection.pipeline() as pipeline:
+            job.set_status(JobStatus.STARTED, pipeline=pipeline)
+            if Execution is not None:
+                self._executions[job.id] = Execution.create(job, ttl, pipeline=pipeline)
+            else:
+                StartedJobRegistry(job.origin, connection=self.connection).add(
+                    job, ttl, pipeline=pipeline
+                )
+            pipeline.execute()
+
+    def _leave_started_registry(self, job: RQJob) -> None:
+        execution = self._executions.pop(job.id, None)
+        with self.connection.pipeline() as pipeline:
+            if execution is not None:
+                execution.delete(job, pipeline=pipeline)
+            else:
+                StartedJobRegistry(job.origin, connection=self.connection).remove(
+                    job, pipeline=pipeline
+                )
+            pipeline.execute()
+
+    def _mark_finished(self, job: RQJob, queue: Queue) -> None:
+        self._leave_started_registry(job)
+        ttl = job.get_result_ttl(default_ttl=DEFAULT_RESULT_TTL)
+        if ttl == 0:
+            job.delete()
+            return
+        job.set_status(JobStatus.FINISHED)
+        queue.finished_job_registry.add(job, ttl)
+
+    def _mark_failed(self, job: RQJob, queue: Queue, exc_string: str) -> None:
+        self._leave_started_registry(job)
+        job.set_status(JobStatus.FAILED)
+        ttl = job.failure_ttl if job.failure_ttl is not None else DEFAULT_FAILURE_TTL
+        queue.failed_job_registry.add(job, ttl=ttl, exc_string=exc_string)
@@ -0,0 +1,105 @@
+import asyncio
+import contextlib
+import datetime as dt
+import logging
+import uuid
+from collections.abc import Callable
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.models.job import Job
+from app.core.settings import get_settings
+from app.providers.genapi.poller import get_genapi_poller
+
+logger = logging.getLogger(__name__)
+
+
+class JobHeartbeat:
+    """Marks the jobs a worker process is running as alive.
+
+    One loop per process stamps ``heartbeat_at`` on every tracked job in a
+    single UPDATE and records the provider status the poller last saw, so
+    ``resume_stalled_jobs`` can tell a slow job from one whose worker died.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        interval_s: float | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self.interval_s = (
+            interval_s if interval_s is not None else get_settings().jobs_heartbeat_seconds
+        )
+        self._jobs: dict[uuid.UUID, str | None] = {}
+        self._reported: dict[uuid.UUID, str] = {}
+        self._task: asyncio.Task | None = None
+
+    @contextlib.asynccontextmanager
+    async def track(self, job_id: uuid.UUID, request_id: str | None = None):
+        self._jobs[job_id] = request_id
+        self._ensure_running()
+        try:
+            yield
+        finally:
+            self._jobs.pop(job_id, None)
+            self._reported.pop(job_id, None)
+
+    def attach(self, job_id: uuid.UUID, request_id: str) -> None:
+        """Link a tracked job to its provider request once it is submitted."""
+        if job_id in self._jobs:
+            self._jobs[job_id] = request_id
+
+    async def beat(self) -> None:
+        jobs = dict(self._jobs)
+        if not jobs:
+            return
+        poller = get_genapi_poller()
+        statuses = {
+            job_id: status
+            for job_id, request_id in jobs.items()
+            if request_id
+            and (status := poller.last_status(request_id))
+            and status != self._reported.get(job_id)
+        }
+        async with self._session_factory() as session:
+            # Heartbeats are not changes clients care about; keep updated_at.
+            await session.execute(
+                update(Job)
+                .where(Job.id.in_(jobs), Job.status == "processing")
+                .values(heartbeat_at=dt.datetime.utcnow(), updated_at=Job.updated_at)
+            )
+            for job_id, status in statuses.items():
+                await session.execute(
+                    update(Job)
+                    .where(Job.id == job_id)
+                    .values(provider_status=status, updated_at=Job.updated_at)
+                )
+            await session.commit()
+        self._reported.update(statuses)
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while self._jobs:
+            await asyncio.sleep(self.interval_s)
+            try:
+                await self.beat()
+            except Exception as exc:
+                logger.warning("job heartbeat failed jobs=%s: %r", len(self._jobs), exc)
+
+
+_shared_heartbeat: JobHeartbeat | None = None
+_shared_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_job_heartbeat(session_factory: Callable[[], AsyncSession]) -> JobHeartbeat:
+    global _shared_heartbeat, _shared_loop
+    loop = asyncio.get_running_loop()
+    if _shared_heartbeat is None or _shared_loop is not loop:
+        _shared_heartbeat = JobHeartbeat(session_factory)
+        _shared_loop = loop
+    return _shared_heartbeat
@@ -1,10 +1,29 @@
+import argparse
+import asyncio
 import datetime as dt
 import logging
+import signal
+import threading
+import time
+
 from redis import Redis
 from rq import Queue, Worker
 
+from app.core.redis import get_blocking_redis, get_redis
 from app.core.settings import get_settings
-from app.workers.tasks import cleanup_storage
+from app.workers.executor import ConcurrentJobExecutor
+from app.workers.scheduling import (
+    QUEUE_NAME,
+    enqueue_scheduled_jobs,
+    get_scheduler,
+    job_queue_name,
+)
+from app.workers.tasks import (
+    cleanup_storage,
+    dispatch_pending_jobs,
+    resume_stalled_jobs,
+    run_in_worker_loop,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -12,28 +31,56 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
-def get_redis() -> Redis:
-    return Redis.from_url(settings.redis_url)
+def get_queue(name: str = QUEUE_NAME) -> Queue:
+    return Queue(name, connection=get_redis())
 
 
-def get_queue() -> Queue:
-    return Queue("pelicanone", connection=get_redis())
+def parse_queue_spec(spec: str) -> list[tuple[str, int]]:
+    """Parse ``fast=4,media=2,long=1,default`` into ``(queue name, weight)`` pairs.
 
+    Order is priority order; a missing weight means 1.
+    """
+    parsed: list[tuple[str, int]] = []
+    for item in spec.split(","):
+        name, _, weight = item.strip().partition("=")
+        if not name:
+            continue
+        parsed.append((job_queue_name(name.strip()), max(1, int(weight)) if weight else 1))
+    if not parsed:
+        raise ValueError(f"no queues in {spec!r}")
+    return parsed
 
-def _schedule_cleanup(queue: Queue, conn: Redis) -> None:
+
+# The only queue that keeps slots to itself; the others borrow whatever is idle.
+RESERVED_QUEUE = job_queue_name("fast")
+
+
+def queue_slot_reserves(queues: list[tuple[str, int]], concurrency: int) -> dict[str, int]:
+    """Slots held back for the fast queue: its weighted share of ``concurrency``.
+
+    At least one slot is always left for the other queues.
+    """
+    total = sum(weight for _, weight in queues)
+    reserves = {
+        name: min(concurrency - 1, max(1, concurrency * weight // total))
+        for name, weight in queues
+        if name == RESERVED_QUEUE
+    }
+    return {name: slots for name, slots in reserves.items() if slots > 0}
+
+
+def _schedule_periodic(queue: Queue, conn: Redis, job_id: str, func, interval_seconds: int) -> None:
     try:
         from rq_scheduler import Scheduler
     except Exception as exc:
-        logger.exception("cleanup scheduler disabled", exc_info=exc)
+        logger.exception("%s scheduler disabled", job_id, exc_info=exc)
         return
 
     scheduler = Scheduler(queue=queue, connection=conn)
-    interval_seconds = settings.files_cleanup_interval_seconds
     if interval_seconds <= 0:
-        logger.info("cleanup scheduler disabled: interval=%s", interval_seconds)
+        logger.info("%s scheduler disabled: interval=%s", job_id, interval_seconds)
         return
 
-    job_id = "cleanup_storage"
     try:
         existing_job = scheduler.get_job(job_id)
     except AttributeError:
@@ -44,7 +91,7 @@ def _schedule_cleanup(queue: Queue, conn: Redis) -> None:
 
     scheduler.schedule(
         scheduled_time=dt.datetime.utcnow() + dt.timedelta(seconds=interval_seconds),
-        func=cleanup_storage,
+        func=func,
         interval=interval_seconds,
         repeat=None,
         id=job_id,
@@ -52,14 +99,126 @@ def _schedule_cleanup(queue: Queue, conn: Redis) -> None:
     )
 
 
-def main() -> None:
+def _schedule_cleanup(queue: Queue, conn: Redis) -> None:
+    _schedule_periodic(
+        queue, conn, "cleanup_storage", cleanup_storage, settings.files_cleanup_interval_seconds
+    )
+
+
+def _schedule_outbox_dispatch(queue: Queue, conn: Redis) -> None:
+    _schedule_periodic(
+        queue,
+        conn,
+        "dispatch_pending_jobs",
+        dispatch_pending_jobs,
+        settings.jobs_outbox_interval_seconds,
+    )
+
+
+def _schedule_stalled_job_recovery(queue: Queue, conn: Redis) -> None:
+    _schedule_periodic(
+        queue,
+        conn,
+        "resume_stalled_jobs",
+        resume_stalled_jobs,
+        settings.jobs_resume_interval_seconds,
+    )
+
+
+def _build_scheduler(queue_name: str):
+    try:
+        return get_scheduler(queue_name)
+    except Exception as exc:
+        logger.exception("rq-scheduler unavailable, delayed jobs disabled", exc_info=exc)
+        return None
+
+
+def _start_scheduler_thread(scheduler, interval_s: float = 5.0) -> threading.Thread:
+    """Tick rq-scheduler next to a stock worker.
+
+    ``Worker.work(with_scheduler=True)`` only runs RQ's own scheduler, so
+    without this the retries, safety polls and periodic jobs queued through
+    rq-scheduler would never become due.
+    """
+
+    def _loop() -> None:
+        while True:
+            try:
+                enqueue_scheduled_jobs(scheduler)
+            except Exception as exc:
+                logger.exception("rq-scheduler tick failed", exc_info=exc)
+            time.sleep(interval_s)
+
+    thread = threading.Thread(target=_loop, name="rq-scheduler", daemon=True)
+    thread.start()
+    return thread
+
+
+def _run_concurrent(
+    queues: list[Queue], conn: Redis, concurrency: int, reserved_slots: dict[str, int]
+) -> None:
+    executor = ConcurrentJobExecutor(
+        queues,
+        connection=conn,
+        concurrency=concurrency,
+        dequeue_timeout=settings.worker_dequeue_timeout_seconds,
+        scheduler=_build_scheduler(QUEUE_NAME),
+        reserved_slots=reserved_slots,
+    )
+
+    async def _serve() -> None:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, executor.request_stop)
+        await executor.run()
+
+    run_in_worker_loop(_serve())
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="app.workers.rq")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.worker_concurrency,
+        help="Run up to N jobs concurrently on one event loop (1 = stock RQ worker)",
+    )
+    parser.add_argument(
+        "--queues",
+        default=settings.worker_queues,
+        help="Queues to consume in priority order with slot weights, e.g. fast=4,media=2,long=1",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
     conn = get_redis()
-    queue = Queue("pelicanone", connection=conn)
+    worker_conn = get_blocking_redis()
+    queue_spec = parse_queue_spec(args.queues)
+    queues = [Queue(name, connection=worker_conn) for name, _ in queue_spec]
+    queue = Queue(QUEUE_NAME, connection=conn)
     try:
         _schedule_cleanup(queue, conn)
     except Exception as exc:
         logger.exception("cleanup scheduler disabled", exc_info=exc)
-    worker = Worker([queue], connection=conn)
+    try:
+        _schedule_outbox_dispatch(queue, conn)
+    except Exception as exc:
+        logger.exception("outbox dispatch scheduler disabled", exc_info=exc)
+    try:
+        _schedule_stalled_job_recovery(queue, conn)
+    except Exception as exc:
+        logger.exception("stalled job recovery scheduler disabled", exc_info=exc)
+    if args.concurrency > 1:
+        _run_concurrent(
+            queues, worker_conn, args.concurrency, queue_slot_reserves(queue_spec, args.concurrency)
+        )
+        return
+    scheduler = _build_scheduler(QUEUE_NAME)
+    if scheduler is not None:
+        _start_scheduler_thread(scheduler)
+    worker = Worker(queues, connection=worker_conn)
     worker.work(with_scheduler=True)
 
 
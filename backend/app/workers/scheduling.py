@@ -0,0 +1,43 @@
+import datetime as dt
+import logging
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+QUEUE_NAME = "pelicanone"
+JOB_CLASSES = ("fast", "media", "long")
+
+
+def job_queue_name(job_class: str) -> str:
+    """RQ queue for a job class; ``default`` is the maintenance queue."""
+    if job_class == "default":
+        return QUEUE_NAME
+    return f"{QUEUE_NAME}-{job_class}"
+
+
+def get_scheduler(queue_name: str = QUEUE_NAME):
+    from rq_scheduler import Scheduler
+
+    return Scheduler(queue_name=queue_name, connection=get_redis())
+
+
+def enqueue_in(delay_s: float, func, *args, queue_name: str = QUEUE_NAME, **kwargs) -> bool:
+    """Schedule ``func`` on the RQ scheduler; returns False if Redis is unavailable."""
+    try:
+        scheduler = get_scheduler(queue_name)
+        scheduler.enqueue_in(dt.timedelta(seconds=delay_s), func, *args, **kwargs)
+    except Exception as exc:
+        logger.exception("failed to schedule %s", getattr(func, "__name__", func), exc_info=exc)
+        return False
+    return True
+
+
+def enqueue_scheduled_jobs(scheduler) -> None:
+    """Move due rq-scheduler jobs onto their queues, if no other worker holds the lock."""
+    if not scheduler.acquire_lock():
+        return
+    try:
+        scheduler.enqueue_jobs()
+    finally:
+        scheduler.remove_lock()
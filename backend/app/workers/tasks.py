@@ -1,24 +1,60 @@
 import asyncio
 import datetime as dt
 import logging
-import time
+import random
+import uuid
 from pathlib import Path
+from typing import Awaitable, Callable
 
 import httpx
-from sqlalchemy import select
+from rq import Queue
+from sqlalchemy import literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.models.job import Job
 from app.core.models.upload import Upload
-from app.core.job_files import persist_result_files
-from app.core.presets import get_preset_polling_settings
+from app.core.redis import get_redis
+from app.core.job_events import publish_job_event
+from app.core.job_files import (
+    DownloadTooLargeError,
+    ResultDownloadError,
+    create_staging_dir,
+    discard_downloaded_files,
+    discard_staged_files,
+    persist_result_files,
+    publish_staged_files,
+    release_blob,
+    sweep_orphan_blobs,
+)
+from app.core.presets import get_preset_eta_seconds, get_preset_polling_settings
 from app.core.repositories.credits import CreditRepository
+from app.core.repositories.jobs import ACTIVE_STATUSES, JobRepository
 from app.core.settings import get_settings
 from app.db import async_session
-from app.providers.genapi.client import GenApiClient
-from app.providers.genapi.errors import GenApiRetryableError
+from app.providers.genapi.callbacks import build_callback_url
+from app.providers.genapi.client import (
+    ERROR_STATUSES,
+    AsyncGenApiClient,
+    get_genapi_client,
+    is_terminal_status,
+)
+from app.providers.genapi.breaker import get_genapi_breaker
+from app.providers.genapi.durations import get_duration_stats
+from app.providers.genapi.errors import (
+    GenApiRateLimitedError,
+    GenApiRetryableError,
+    GenApiTimeoutError,
+    GenApiUnavailableError,
+)
 from app.providers.genapi.extractor import normalize_result
+from app.providers.genapi.limiter import get_genapi_limiter
+from app.providers.genapi.poller import get_genapi_poller
+from app.workers.cancellation import get_cancel_watcher
+from app.workers.heartbeat import get_job_heartbeat
+from app.workers.scheduling import enqueue_in, job_queue_name
 
-RETRY_DELAYS = [1, 3, 5]
+RUN_JOB_RESULT_TTL = 86400
+OUTBOX_BATCH_SIZE = 100
 DEFAULT_POLL_INTERVAL_S = 2.0
 DEFAULT_TIMEOUTS = {
     "text": 120,
@@ -28,111 +64,843 @@ DEFAULT_TIMEOUTS = {
     "video": 1800,
     "upscale": 900,
 }
+# Longest provider timeout each queue class accepts; anything slower is "long".
+JOB_CLASS_MAX_TIMEOUTS = [("fast", 300), ("media", 900)]
+# Headroom on top of the provider timeout for submit retries and downloads.
+JOB_TIMEOUT_MARGIN_S = 300
+# Columns reset when a claimed job goes back to the queue.
+_RELEASED_CLAIM = {
+    "started_at": None,
+    "heartbeat_at": None,
+    "provider_request_id": None,
+    "provider_submitted_at": None,
+    "provider_status": None,
+}
 
 logger = logging.getLogger(__name__)
 
+_worker_loop: asyncio.AbstractEventLoop | None = None
+
+
+def run_in_worker_loop(coro):
+    """Run a coroutine on the long-lived loop of this worker process.
+
+    Reusing one loop keeps the shared GenAPI client and the SQLAlchemy pool
+    usable across jobs executed by the same process.
+    """
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_worker_loop)
+    return _worker_loop.run_until_complete(coro)
+
 
 def run_job(job_id: str) -> dict:
-    return asyncio.run(_run_job_async(job_id))
+    return run_in_worker_loop(_run_job_async(job_id))
 
 
 async def _run_job_async(job_id: str) -> dict:
     async with async_session() as session:
-        job = await session.get(Job, job_id)
-        if not job or job.status in {"done", "error"}:
+        job = await session.get(Job, uuid.UUID(str(job_id)))
+        if not job or job.status != "queued":
             return _build_empty_result(job.type if job else "text")
-        job.status = "processing"
-        job.started_at = dt.datetime.utcnow()
-        await session.commit()
 
-        client = GenApiClient()
-        result_payload: dict | None = None
-        error: Exception | None = None
-        try:
-            result = await _execute_with_retry(client, job.type, job.payload)
-            job.status = "done"
-            result_payload = normalize_result(result, job.type)
-            result_payload, result_files = await persist_result_files(str(job.id), result_payload)
-            job.result = result_payload
-            job.result_files = result_files
-            job.error = None
-        except Exception as exc:  # pragma: no cover - fallback for unknown errors
-            logger.exception("Job %s failed", job_id, exc_info=exc)
-            job.status = "error"
-            job.error = _human_error_message(exc)
-            result_payload = None
-            job.result = None
-            job.result_files = None
-            error = exc
-        finally:
-            if job.status in {"done", "error"}:
-                job.finished_at = dt.datetime.utcnow()
-            await session.commit()
-            if job.status == "error" and job.cost:
-                credits = CreditRepository(session)
-                refunded = await credits.has_job_reason(job.id, "job_refund")
-                if not refunded:
-                    await credits.create_tx(
-                        job.user_id, delta=job.cost, reason="job_refund", job_id=job.id
-                    )
-                    await session.commit()
-        if error:
-            raise error
-        return result_payload or _build_empty_result(job.type)
-
-
-async def _execute_with_retry(client: GenApiClient, job_type: str, payload: dict):
-    last_error = None
-    for delay in [0, *RETRY_DELAYS]:
-        if delay:
-            time.sleep(delay)
+        network_id = resolve_network_id(job.type, job.payload)
+        breaker_wait_s = await get_genapi_breaker().retry_in(network_id)
+        if breaker_wait_s > 0:
+            if _held_too_long(job):
+                await fail_job(session, job, GenApiUnavailableError(breaker_wait_s))
+            else:
+                logger.info("Job %s held: network=%s unavailable", job_id, network_id)
+                await _defer_job(session, job, breaker_wait_s)
+            return _build_empty_result(job.type)
+        limiter = get_genapi_limiter()
+        wait_s = await limiter.acquire(network_id, str(job.id))
+        if wait_s > 0:
+            logger.info("Job %s waits %.1fs for network=%s", job_id, wait_s, network_id)
+            await _defer_job(session, job, wait_s)
+            return _build_empty_result(job.type)
+        if not await _claim_job(session, job):
+            await limiter.release(network_id, str(job.id))
+            return _build_empty_result(job.type)
+
+        watcher = get_cancel_watcher()
         try:
-            request = _submit_request(client, job_type, payload)
-            request_id = request.get("request_id") or request.get("id")
-            if not request_id:
-                raise ValueError("missing_request_id")
-            timeout_s, interval_s = _resolve_polling_settings(job_type, payload)
-            logger.info(
-                "GenAPI poll start request_id=%s timeout_s=%s interval_s=%s",
-                request_id,
-                timeout_s,
-                interval_s,
+            async with watcher.watch(job.id):
+                return await _process_claimed_job(session, job, network_id)
+        except asyncio.CancelledError:
+            if not watcher.consume(job.id):
+                raise
+            await _abort_cancelled_job(session, job)
+            return _build_empty_result(job.type)
+
+
+async def _process_claimed_job(session: AsyncSession, job: Job, network_id: str) -> dict:
+    limiter = get_genapi_limiter()
+    client = get_genapi_client()
+    callback_url = build_callback_url(str(job.id))
+    heartbeat = get_job_heartbeat(async_session)
+
+    async def record_submission(request_id: str) -> None:
+        await _record_submission(session, job, request_id)
+        heartbeat.attach(job.id, request_id)
+
+    try:
+        if callback_url:
+            request_id = await _submit_for_callback(
+                client, job.type, job.payload, callback_url=callback_url
             )
-            response = client.poll_until_done(request_id, timeout_s=timeout_s, interval_s=interval_s)
-            if response.get("status") == "error":
-                raise ValueError(response.get("error", "genapi_error"))
-            return response
-        except httpx.HTTPStatusError as exc:
-            response = exc.response
-            logger.error(
-                "GenAPI request failed status_code=%s response=%s",
-                getattr(response, "status_code", None),
-                getattr(response, "text", None),
+            await record_submission(request_id)
+            _schedule_safety_poll(job, request_id)
+            return _build_empty_result(job.type)
+        # Keep beating through the result download, which can outlast the stall window.
+        async with heartbeat.track(job.id):
+            result = await _execute_request(
+                client, job.type, job.payload, on_submit=record_submission
             )
+            return await complete_job(session, job, result)
+    except GenApiRateLimitedError as exc:
+        logger.warning("Job %s rate limited by network=%s", job.id, network_id)
+        await limiter.block(network_id, exc.retry_after_s)
+        if job.provider_request_id:
+            # Throttled while polling: requeueing would submit and pay again,
+            # so keep polling the request that already exists.
+            delay_s = exc.retry_after_s or 0
+            if await _retry_later(session, job, network_id, exc, min_delay_s=delay_s):
+                return _build_empty_result(job.type)
+            logger.exception("Job %s failed", job.id, exc_info=exc)
+            await fail_job(session, job, exc)
             raise
-        except GenApiRetryableError as exc:
-            last_error = exc
-            if str(exc) == "genapi_timeout":
-                break
-            continue
-    raise last_error or RuntimeError("genapi_failed")
+        await _hold_job(session, job, network_id, exc.retry_after_s or limiter.retry_s)
+        return _build_empty_result(job.type)
+    except (GenApiRetryableError, ResultDownloadError) as exc:
+        if await _retry_later(session, job, network_id, exc):
+            return _build_empty_result(job.type)
+        logger.exception("Job %s failed", job.id, exc_info=exc)
+        await fail_job(session, job, exc)
+        raise
+    except Exception as exc:  # pragma: no cover - fallback for unknown errors
+        logger.exception("Job %s failed", job.id, exc_info=exc)
+        await fail_job(session, job, exc)
+        raise
+
+
+async def _abort_cancelled_job(session: AsyncSession, job: Job) -> None:
+    """Stop a job its owner cancelled mid-run.
+
+    The API has already marked it cancelled, refunded it and released its
+    slots; what is left is asking the provider to drop the request.
+    """
+    request_id = job.provider_request_id
+    await asyncio.to_thread(discard_downloaded_files, str(job.id))
+    await session.rollback()
+    logger.info("Job %s aborted after cancel request_id=%s", job.id, request_id)
+    await cancel_provider_request(request_id)
+
+
+async def cancel_provider_request(request_id: str | None) -> None:
+    """Best effort: ask GenAPI to stop a request, where it exposes a cancel endpoint."""
+    if not request_id or not get_settings().genapi_cancel_path:
+        return
+    try:
+        await get_genapi_client().cancel(request_id)
+    except Exception as exc:
+        logger.warning("GenAPI cancel failed request_id=%s: %r", request_id, exc)
+        return
+    logger.info("GenAPI request cancelled request_id=%s", request_id)
+
+
+async def release_cancelled_job(
+    get_queue: Callable[[str], Queue], job: Job, timeout_s: float | None = None
+) -> None:
+    """Drop a cancelled job's waiting RQ entry and give back its provider slot.
+
+    An entry that cannot be removed in time stays harmless: ``run_job`` skips
+    jobs that are no longer queued.
+    """
+    try:
+        await asyncio.wait_for(
+            asyncio.to_thread(_remove_queued_run_job, get_queue, job), timeout_s
+        )
+    except Exception as exc:
+        logger.warning("cancel: queued entry kept job=%s: %r", job.id, exc)
+    await get_genapi_limiter().release(resolve_network_id(job.type, job.payload), str(job.id))
+
+
+def _remove_queued_run_job(get_queue: Callable[[str], Queue], job: Job) -> None:
+    queue_name, _ = resolve_job_queue(job.type, job.payload)
+    get_queue(queue_name).remove(run_job_rq_id(job.id))
+
+
+async def _claim_job(session: AsyncSession, job: Job) -> bool:
+    """Move a queued job to processing; False if another dispatch already took it.
+
+    The outbox may enqueue a job twice (a slow enqueue that succeeded after the
+    API gave up on it), so the transition is a conditional UPDATE.
+    """
+    started_at = dt.datetime.utcnow()
+    claimed = await session.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status == "queued")
+        .values(status="processing", started_at=started_at, heartbeat_at=started_at)
+    )
+    await session.commit()
+    if claimed.rowcount != 1:
+        logger.info("Job %s already claimed, skipping", job.id)
+        return False
+    await session.refresh(job)
+    await publish_job_event(job)
+    return True
+
+
+async def _record_submission(session: AsyncSession, job: Job, request_id: str) -> None:
+    """Persist the provider request so a restarted worker resumes it instead of paying twice."""
+    job.provider_request_id = request_id
+    job.provider_submitted_at = dt.datetime.utcnow()
+    job.provider_status = None
+    await session.commit()
+
+
+async def _retry_later(
+    session: AsyncSession, job: Job, network_id: str, exc: Exception, min_delay_s: float = 0
+) -> bool:
+    """Schedule the job's next attempt after a backoff instead of sleeping in the worker.
+
+    A job whose request already reached GenAPI polls that request again; one
+    that was never submitted goes back to the queue. False when the error is
+    final or ``jobs_retry_max_attempts`` is used up.
+    """
+    attempt = job.attempts + 1
+    if isinstance(exc, GenApiTimeoutError) or attempt >= get_settings().jobs_retry_max_attempts:
+        return False
+    delay_s = max(retry_backoff_seconds(attempt), min_delay_s)
+    logger.warning("Job %s attempt %s failed (%s), retry in %.1fs", job.id, attempt, exc, delay_s)
+    job.attempts = attempt
+    if not job.provider_request_id:
+        await session.commit()
+        await _hold_job(session, job, network_id, delay_s)
+        return True
+    # Keeps resume_stalled_jobs off the job until the scheduled resume is due.
+    job.heartbeat_at = dt.datetime.utcnow() + dt.timedelta(seconds=delay_s)
+    await session.commit()
+    if not _schedule_run_job(job, delay_s, task=resume_job):
+        logger.warning("Job %s resume left to the stalled job sweep", job.id)
+    return True
+
+
+def retry_backoff_seconds(attempt: int) -> float:
+    """Exponential backoff with jitter for the ``attempt``-th retry.
+
+    Half of the delay is fixed and half random, so jobs that failed together
+    during an outage do not all come back at the same moment.
+    """
+    settings = get_settings()
+    ceiling = min(
+        settings.jobs_retry_max_seconds, settings.jobs_retry_base_seconds * 2 ** (attempt - 1)
+    )
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def _held_too_long(job: Job) -> bool:
+    created_at = job.created_at.replace(tzinfo=None)
+    waited_s = (dt.datetime.utcnow() - created_at).total_seconds()
+    return waited_s > get_settings().genapi_breaker_max_hold_seconds
+
+
+async def _hold_job(session: AsyncSession, job: Job, network_id: str, delay_s: float) -> None:
+    """Give back the provider slot and the claim, and try the job again later."""
+    await get_genapi_limiter().release(network_id, str(job.id))
+    await _requeue_job(session, job)
+    await _defer_job(session, job, delay_s)
+
+
+async def _requeue_job(session: AsyncSession, job: Job) -> None:
+    """Hand a claimed job back to the queued state, e.g. after a provider 429."""
+    await session.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status == "processing")
+        .values(status="queued", **_RELEASED_CLAIM)
+    )
+    await session.commit()
+    await session.refresh(job)
+    await publish_job_event(job)
+
+
+async def _defer_job(session: AsyncSession, job: Job, delay_s: float) -> None:
+    """Run the job again after ``delay_s`` without holding a worker meanwhile.
+
+    If the scheduler is unreachable the job is marked undispatched so the
+    outbox sends it again.
+    """
+    if _schedule_run_job(job, delay_s):
+        return
+    job.dispatched_at = None
+    await session.commit()
+
+
+def _schedule_run_job(job: Job, delay_s: float, task: Callable | None = None) -> bool:
+    queue_name, job_timeout = resolve_job_queue(job.type, job.payload)
+    return enqueue_in(
+        delay_s,
+        task or run_job,
+        str(job.id),
+        queue_name=queue_name,
+        timeout=job_timeout,
+        job_result_ttl=RUN_JOB_RESULT_TTL,
+    )
+
+
+def resolve_job_queue(job_type: str, payload: dict) -> tuple[str, int]:
+    """Queue name and RQ ``job_timeout`` for a job.
+
+    Jobs are routed by the provider timeout of their preset, so a backlog of
+    long video or music generations never sits in front of text jobs.
+    """
+    timeout_s, _ = _resolve_polling_settings(job_type, payload)
+    job_class = next(
+        (name for name, max_timeout in JOB_CLASS_MAX_TIMEOUTS if timeout_s <= max_timeout),
+        "long",
+    )
+    return job_queue_name(job_class), timeout_s + JOB_TIMEOUT_MARGIN_S
+
+
+def run_job_rq_id(job_id) -> str:
+    """RQ id of a job's dispatch, so a cancel can take it off the queue."""
+    return f"run-job-{job_id}"
+
+
+def _enqueue_run_job(get_queue: Callable[[str], Queue], job: Job) -> None:
+    queue_name, job_timeout = resolve_job_queue(job.type, job.payload)
+    get_queue(queue_name).enqueue(
+        run_job,
+        str(job.id),
+        job_id=run_job_rq_id(job.id),
+        job_timeout=job_timeout,
+        result_ttl=RUN_JOB_RESULT_TTL,
+    )
+
+
+async def enqueue_job(
+    get_queue: Callable[[str], Queue], session: AsyncSession, job: Job
+) -> bool:
+    """Hand a committed job to its RQ queue without blocking the event loop.
+
+    A job over its owner's dispatch cap, or one whose enqueue fails because
+    Redis is slow or down, simply stays undispatched: a finishing job of the
+    same user or ``dispatch_pending_jobs`` picks it up later.
+    """
+    timeout_s = get_settings().jobs_enqueue_timeout_seconds
+    return await _dispatch_within_cap(get_queue, session, job, timeout_s)
+
+
+async def _dispatch_within_cap(
+    get_queue: Callable[[str], Queue],
+    session: AsyncSession,
+    job: Job,
+    timeout_s: float | None,
+) -> bool:
+    """Enqueue ``job`` unless its owner already has the maximum of jobs in flight.
+
+    The owner's row stays locked across the check and the enqueue, so two
+    dispatchers can neither take the user's last slot twice nor send the
+    same job twice.
+    """
+    await CreditRepository(session).lock_user(job.user_id)
+    await session.refresh(job, ["status", "dispatched_at"])
+    if job.status != "queued" or job.dispatched_at is not None:
+        await session.commit()
+        return False
+    cap = get_settings().jobs_max_active_per_user
+    if cap > 0 and await JobRepository(session).count_dispatched_active(job.user_id) >= cap:
+        await session.commit()
+        logger.info("dispatch held job=%s user=%s cap=%s", job.id, job.user_id, cap)
+        return False
+    try:
+        await asyncio.wait_for(asyncio.to_thread(_enqueue_run_job, get_queue, job), timeout_s)
+    except Exception as exc:
+        await session.commit()
+        logger.warning("enqueue deferred to outbox job=%s: %r", job.id, exc)
+        return False
+    job.dispatched_at = dt.datetime.utcnow()
+    await session.commit()
+    return True
+
+
+def _redis_queues() -> Callable[[str], Queue]:
+    connection = get_redis()
+
+    def get_queue(name: str) -> Queue:
+        return Queue(name, connection=connection)
+
+    return get_queue
+
+
+async def dispatch_user_backlog(
+    session: AsyncSession,
+    user_id,
+    get_queue: Callable[[str], Queue] | None = None,
+    timeout_s: float | None = None,
+) -> int:
+    """Dispatch the user's oldest waiting jobs until they reach their cap."""
+    get_queue = get_queue or _redis_queues()
+    cap = get_settings().jobs_max_active_per_user
+    waiting = await JobRepository(session).list_waiting(
+        user_id, limit=cap if cap > 0 else OUTBOX_BATCH_SIZE
+    )
+    dispatched = 0
+    for job in waiting:
+        if not await _dispatch_within_cap(get_queue, session, job, timeout_s):
+            break
+        dispatched += 1
+    return dispatched
+
+
+async def _release_dispatch_slot(session: AsyncSession, job: Job) -> None:
+    """A finished job frees its provider slot and starts the owner's next waiting job."""
+    await get_genapi_limiter().release(resolve_network_id(job.type, job.payload), str(job.id))
+    try:
+        await dispatch_user_backlog(
+            session, job.user_id, timeout_s=get_settings().jobs_enqueue_timeout_seconds
+        )
+    except Exception as exc:
+        logger.warning("backlog dispatch deferred to outbox user=%s: %r", job.user_id, exc)
+
+
+def dispatch_pending_jobs() -> dict[str, int]:
+    return run_in_worker_loop(_dispatch_pending_jobs_async())
+
+
+async def _dispatch_pending_jobs_async() -> dict[str, int]:
+    """Dispatch waiting jobs fairly: users take turns, longest waiting first.
+
+    Each user gets at most ``jobs_max_active_per_user`` jobs in the worker
+    queues, so one user's burst cannot sit in front of everybody else.
+    """
+    cutoff = dt.datetime.utcnow() - dt.timedelta(seconds=get_settings().jobs_outbox_grace_seconds)
+    get_queue = _redis_queues()
+    dispatched = 0
+    async with async_session() as session:
+        user_ids = await JobRepository(session).users_with_waiting_jobs(cutoff, OUTBOX_BATCH_SIZE)
+        for user_id in user_ids:
+            dispatched += await dispatch_user_backlog(session, user_id, get_queue)
+    if dispatched:
+        logger.info("outbox: dispatched=%s users=%s", dispatched, len(user_ids))
+    return {"dispatched": dispatched}
+
+
+def resume_stalled_jobs() -> dict[str, int]:
+    return run_in_worker_loop(_resume_stalled_jobs_async())
 
 
-def _submit_request(client: GenApiClient, job_type: str, payload: dict):
+async def _resume_stalled_jobs_async() -> dict[str, int]:
+    """Recover processing jobs whose worker stopped sending heartbeats.
+
+    A job with a provider request is handed to ``resume_job`` to keep polling
+    it; one that died before its submit was recorded goes back to the queue.
+    Jobs waiting on a provider callback have no heartbeat and are left to
+    their safety poll.
+    """
+    settings = get_settings()
+    stalled_before = dt.datetime.utcnow() - dt.timedelta(
+        seconds=settings.jobs_stalled_after_seconds
+    )
+    callbacks_on = bool(settings.genapi_callback_base_url and settings.genapi_callback_secret)
+    get_queue = _redis_queues()
+    resumed = requeued = 0
+    async with async_session() as session:
+        stalled = await JobRepository(session).list_stalled(
+            stalled_before, OUTBOX_BATCH_SIZE, include_submitted=not callbacks_on
+        )
+        for job in stalled:
+            if job.provider_request_id:
+                if not await _take_over_stalled(session, job, heartbeat_at=dt.datetime.utcnow()):
+                    continue
+                logger.warning(
+                    "Job %s stalled, resuming request_id=%s", job.id, job.provider_request_id
+                )
+                try:
+                    _enqueue_resume_job(get_queue, job)
+                except Exception as exc:
+                    # The refreshed heartbeat makes the next sweep after the stall window retry.
+                    logger.warning("resume deferred job=%s: %r", job.id, exc)
+                    continue
+                resumed += 1
+                continue
+            if not await _take_over_stalled(
+                session, job, status="queued", dispatched_at=None, **_RELEASED_CLAIM
+            ):
+                continue
+            logger.warning("Job %s stalled before submit, requeued", job.id)
+            await get_genapi_limiter().release(
+                resolve_network_id(job.type, job.payload), str(job.id)
+            )
+            await publish_job_event(job)
+            requeued += 1
+    if resumed or requeued:
+        logger.info("stalled jobs: resumed=%s requeued=%s", resumed, requeued)
+    return {"resumed": resumed, "requeued": requeued}
+
+
+async def _take_over_stalled(session: AsyncSession, job: Job, **values) -> bool:
+    """Apply ``values`` unless the job's worker came back or another sweep took it."""
+    taken = await session.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status == "processing", Job.heartbeat_at == job.heartbeat_at)
+        .values(**values)
+    )
+    await session.commit()
+    if taken.rowcount != 1:
+        return False
+    await session.refresh(job)
+    return True
+
+
+def _enqueue_resume_job(get_queue: Callable[[str], Queue], job: Job) -> None:
+    queue_name, job_timeout = resolve_job_queue(job.type, job.payload)
+    get_queue(queue_name).enqueue(
+        resume_job, str(job.id), job_timeout=job_timeout, result_ttl=RUN_JOB_RESULT_TTL
+    )
+
+
+def resume_job(job_id: str) -> dict:
+    return run_in_worker_loop(_resume_job_async(job_id))
+
+
+async def _resume_job_async(job_id: str) -> dict:
+    """Keep polling the provider request of a job whose worker went away."""
+    async with async_session() as session:
+        job = await session.get(Job, uuid.UUID(str(job_id)))
+        if not job or job.status != "processing" or not job.provider_request_id:
+            return _build_empty_result(job.type if job else "text")
+        request_id = job.provider_request_id
+        submitted_at = (job.provider_submitted_at or job.started_at).replace(tzinfo=None)
+        elapsed_s = max((dt.datetime.utcnow() - submitted_at).total_seconds(), 0.0)
+        logger.info("Job %s resumes request_id=%s after %.0fs", job_id, request_id, elapsed_s)
+        watcher = get_cancel_watcher()
+        try:
+            async with watcher.watch(job.id), get_job_heartbeat(async_session).track(
+                job.id, request_id
+            ):
+                response = await _fetch_finished_request(job, request_id)
+                if response is None:
+                    response = await _await_request(job.type, job.payload, request_id, elapsed_s)
+                if response.get("status") == "error":
+                    raise ValueError(response.get("error", "genapi_error"))
+                return await complete_job(session, job, response)
+        except asyncio.CancelledError:
+            if not watcher.consume(job.id):
+                raise
+            await _abort_cancelled_job(session, job)
+            return _build_empty_result(job.type)
+        except (GenApiRetryableError, ResultDownloadError) as exc:
+            network_id = resolve_network_id(job.type, job.payload)
+            if await _retry_later(session, job, network_id, exc):
+                return _build_empty_result(job.type)
+            logger.exception("Job %s failed", job_id, exc_info=exc)
+            await fail_job(session, job, exc)
+            raise
+        except Exception as exc:
+            logger.exception("Job %s failed", job_id, exc_info=exc)
+            await fail_job(session, job, exc)
+            raise
+
+
+async def _fetch_finished_request(job: Job, request_id: str) -> dict | None:
+    """The terminal response of a request the provider already finished, if it did.
+
+    A job retried because its download failed has no polling window left to
+    wait in; its result is fetched again with a single poll instead.
+    """
+    if not is_terminal_status({"status": job.provider_status or ""}):
+        return None
+    response = await get_genapi_client().poll(request_id)
+    return response if is_terminal_status(response) else None
+
+
+async def complete_job(session: AsyncSession, job: Job, response: dict) -> dict:
+    """Store a terminal GenAPI response on the job, or fail it on an error status.
+
+    A job cancelled or completed elsewhere while this ran keeps its row, and
+    the files downloaded here are dropped without touching the job's own.
+    """
+    status = str(response.get("status", "")).lower()
+    if status in ERROR_STATUSES:
+        await fail_job(session, job, ValueError(response.get("error") or "genapi_error"))
+        return _build_error_result(job.type, job.error or "")
+    # Saved with the retry if the download fails, so the resume skips the poll.
+    job.provider_status = status
+    # Time the provider spent on this request, without our own queueing and submit retries.
+    provider_s = None
+    if job.provider_submitted_at is not None:
+        submitted_at = job.provider_submitted_at.replace(tzinfo=None)
+        provider_s = (dt.datetime.utcnow() - submitted_at).total_seconds()
+    result_payload = normalize_result(response, job.type)
+    # Duplicate completions (callback vs. safety poll, a resume racing the
+    # original worker) each download into their own directory; only the one
+    # that records the result publishes its files.
+    staging_dir = await asyncio.to_thread(create_staging_dir, str(job.id))
+    try:
+        result_payload, result_files = await persist_result_files(
+            str(job.id), result_payload, staging_dir=staging_dir
+        )
+        finished = await _finish_job(
+            session, job, status="done", result=result_payload, result_files=result_files, error=None
+        )
+        if finished:
+            await asyncio.to_thread(publish_staged_files, staging_dir)
+    finally:
+        await asyncio.to_thread(discard_staged_files, staging_dir)
+    await asyncio.to_thread(discard_downloaded_files, str(job.id))
+    if not finished:
+        return _build_empty_result(job.type)
+    # Only the completion that recorded the result counts, so each job is one sample.
+    if provider_s is not None:
+        await get_duration_stats().record(resolve_network_id(job.type, job.payload), provider_s)
+    await publish_job_event(job)
+    await _release_dispatch_slot(session, job)
+    return result_payload
+
+
+async def fail_job(session: AsyncSession, job: Job, exc: Exception) -> None:
+    finished = await _finish_job(
+        session,
+        job,
+        status="error",
+        error=_human_error_message(exc),
+        result=None,
+        result_files=None,
+    )
+    if not finished:
+        return
+    await asyncio.to_thread(discard_downloaded_files, str(job.id))
+    await publish_job_event(job)
+    if job.cost:
+        credits = CreditRepository(session)
+        refunded = await credits.has_job_reason(job.id, "job_refund")
+        if not refunded:
+            await credits.create_tx(
+                job.user_id, delta=job.cost, reason="job_refund", job_id=job.id
+            )
+            await session.commit()
+    await _release_dispatch_slot(session, job)
+
+
+async def _finish_job(session: AsyncSession, job: Job, **values) -> bool:
+    """Move a still active job to its terminal state.
+
+    Conditional, so a worker that finishes late never overwrites a job its
+    owner cancelled (and refunded) in the meantime.
+    """
+    finished = await session.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status.in_(ACTIVE_STATUSES))
+        .values(finished_at=dt.datetime.utcnow(), **values)
+    )
+    await session.commit()
+    await session.refresh(job)
+    if finished.rowcount != 1:
+        logger.info("Job %s already %s, outcome dropped", job.id, job.status)
+        return False
+    return True
+
+
+async def _execute_request(
+    client: AsyncGenApiClient,
+    job_type: str,
+    payload: dict,
+    on_submit: Callable[[str], Awaitable[None]] | None = None,
+):
+    """Submit a job to GenAPI and wait for its terminal response, in one attempt.
+
+    Retryable failures propagate: the caller schedules the next attempt
+    through ``_retry_later`` instead of sleeping in the worker.
+    """
+    network_id = resolve_network_id(job_type, payload)
+    breaker = get_genapi_breaker()
+    try:
+        request_id = await _submit_once(client, job_type, payload)
+        if on_submit:
+            await on_submit(request_id)
+        response = await _await_request(job_type, payload, request_id)
+    except httpx.HTTPStatusError as exc:
+        _log_http_error(exc)
+        raise
+    except GenApiRateLimitedError:
+        raise
+    except GenApiRetryableError:
+        await breaker.record(network_id, ok=False)
+        raise
+    await breaker.record(network_id, ok=True)
+    if response.get("status") == "error":
+        raise ValueError(response.get("error", "genapi_error"))
+    return response
+
+
+async def _await_request(
+    job_type: str, payload: dict, request_id: str, elapsed_s: float = 0.0
+) -> dict:
+    timeout_s, interval_s = _resolve_polling_settings(job_type, payload)
+    eta_s = await expected_job_seconds(job_type, payload)
+    logger.info(
+        "GenAPI poll start request_id=%s timeout_s=%s interval_s=%s eta_s=%s elapsed_s=%.0f",
+        request_id,
+        timeout_s,
+        interval_s,
+        eta_s,
+        elapsed_s,
+    )
+    return await get_genapi_poller().wait(
+        request_id, timeout_s=timeout_s, interval_s=interval_s, eta_s=eta_s, elapsed_s=elapsed_s
+    )
+
+
+async def _submit_for_callback(
+    client: AsyncGenApiClient, job_type: str, payload: dict, callback_url: str
+) -> str:
+    network_id = resolve_network_id(job_type, payload)
+    breaker = get_genapi_breaker()
+    try:
+        request_id = await _submit_once(client, job_type, payload, callback_url=callback_url)
+    except httpx.HTTPStatusError as exc:
+        _log_http_error(exc)
+        raise
+    except GenApiRateLimitedError:
+        raise
+    except GenApiRetryableError:
+        await breaker.record(network_id, ok=False)
+        raise
+    await breaker.record(network_id, ok=True)
+    return request_id
+
+
+async def _submit_once(
+    client: AsyncGenApiClient, job_type: str, payload: dict, callback_url: str | None = None
+) -> str:
+    request = await _submit_request(client, job_type, payload, callback_url=callback_url)
+    request_id = request.get("request_id") or request.get("id")
+    if not request_id:
+        raise ValueError("missing_request_id")
+    return str(request_id)
+
+
+def _log_http_error(exc: httpx.HTTPStatusError) -> None:
+    response = exc.response
+    logger.error(
+        "GenAPI request failed status_code=%s response=%s",
+        getattr(response, "status_code", None),
+        getattr(response, "text", None),
+    )
+
+
+async def expected_job_seconds(job_type: str, payload: dict) -> float | None:
+    """Learned provider duration of the job's network, with the preset ETA as prior."""
+    return await get_duration_stats().expected_seconds(
+        resolve_network_id(job_type, payload), get_preset_eta_seconds(payload)
+    )
+
+
+def resolve_network_id(job_type: str, payload: dict) -> str:
+    """The GenAPI network or function a job is submitted to; the limiter key."""
     if "network_id" in payload:
-        network_id = payload["network_id"]
         if job_type == "text":
-            settings = get_settings()
-            network_id = settings.text_model
+            return get_settings().text_model
+        return payload["network_id"]
+    return payload.get("function_id", "")
+
+
+async def _submit_request(
+    client: AsyncGenApiClient, job_type: str, payload: dict, callback_url: str | None = None
+):
+    if "network_id" in payload:
+        network_id = resolve_network_id(job_type, payload)
         params = _prepare_network_params(job_type, payload)
-        return client.submit_network(network_id, params)
-    return client.submit_function(
+        if callback_url:
+            params = {**params, "callback_url": callback_url}
+        return await client.submit_network(network_id, params)
+    params = payload.get("params", {})
+    if callback_url:
+        params = {**params, "callback_url": callback_url}
+    return await client.submit_function(
         payload.get("function_id", ""),
         payload.get("implementation", ""),
-        payload.get("params", {}),
+        params,
+    )
+
+
+def _schedule_safety_poll(job: Job, request_id: str) -> None:
+    timeout_s, _ = _resolve_polling_settings(job.type, job.payload)
+    deadline = (dt.datetime.utcnow() + dt.timedelta(seconds=timeout_s)).timestamp()
+    _enqueue_safety_poll(str(job.id), job.type, job.payload, request_id, deadline)
+
+
+def _enqueue_safety_poll(
+    job_id: str, job_type: str, payload: dict, request_id: str, deadline: float
+) -> None:
+    # The poll may download the result, so it gets the job's own timeout.
+    _, job_timeout = resolve_job_queue(job_type, payload)
+    delay_s = get_settings().genapi_callback_safety_poll_seconds
+    enqueue_in(
+        delay_s, check_provider_request, job_id, request_id, deadline, timeout=job_timeout
     )
 
 
+def check_provider_request(job_id: str, request_id: str, deadline: float) -> dict:
+    return run_in_worker_loop(_check_provider_request_async(job_id, request_id, deadline))
+
+
+async def _check_provider_request_async(job_id: str, request_id: str, deadline: float) -> dict:
+    """Slow safety-net poll for jobs that are waiting on a provider callback.
+
+    Nothing else resumes a callback job, so until the job is settled every
+    run schedules the next one, whatever cut it short; past ``deadline`` the
+    job is failed and refunded.
+    """
+    async with async_session() as session:
+        job = await session.get(Job, uuid.UUID(str(job_id)))
+        if not job or job.status in {"done", "error"}:
+            return {"status": job.status if job else "missing"}
+        job_type, payload = job.type, job.payload
+        settled = False
+        try:
+            try:
+                settled = await _poll_for_callback(session, job, request_id)
+            except Exception as exc:
+                logger.exception(
+                    "safety poll failed job=%s request_id=%s", job_id, request_id, exc_info=exc
+                )
+                await session.rollback()
+                await session.refresh(job)
+            if not settled and dt.datetime.utcnow().timestamp() > deadline:
+                await fail_job(session, job, GenApiTimeoutError())
+                settled = True
+        finally:
+            if not settled:
+                _enqueue_safety_poll(job_id, job_type, payload, request_id, deadline)
+        return {"status": job.status if settled else "processing"}
+
+
+async def _poll_for_callback(session: AsyncSession, job: Job, request_id: str) -> bool:
+    """Poll once and store a terminal result; True once the job is settled."""
+    try:
+        response = await get_genapi_client().poll(request_id)
+    except GenApiRetryableError as exc:
+        logger.warning("safety poll failed job=%s request_id=%s: %s", job.id, request_id, exc)
+        return False
+    if not is_terminal_status(response):
+        return False
+    logger.info("safety poll completed job=%s request_id=%s", job.id, request_id)
+    try:
+        await complete_job(session, job, response)
+    except ResultDownloadError as exc:
+        # The next safety poll fetches the terminal payload and downloads again.
+        logger.warning("safety poll: result download failed job=%s: %s", job.id, exc)
+        return False
+    except DownloadTooLargeError as exc:
+        logger.exception("Job %s failed", job.id, exc_info=exc)
+        await fail_job(session, job, exc)
+    return True
+
+
 def _prepare_network_params(job_type: str, payload: dict) -> dict:
     params = payload.get("params") or {}
     if (
@@ -170,13 +938,26 @@ def _fallback_timeout(job_type: str, payload: dict) -> int:
 
 
 def cleanup_storage() -> dict[str, int]:
-    return asyncio.run(_cleanup_storage_async())
+    return run_in_worker_loop(_cleanup_storage_async())
 
 
 def cleanup_job_files() -> dict[str, int]:
     return cleanup_storage()
 
 
+def get_async_entrypoint(func_name: str):
+    """Map an RQ task name to the coroutine the concurrent executor awaits."""
+    return {
+        f"{__name__}.run_job": _run_job_async,
+        f"{__name__}.check_provider_request": _check_provider_request_async,
+        f"{__name__}.cleanup_storage": _cleanup_storage_async,
+        f"{__name__}.cleanup_job_files": _cleanup_storage_async,
+        f"{__name__}.dispatch_pending_jobs": _dispatch_pending_jobs_async,
+        f"{__name__}.resume_job": _resume_job_async,
+        f"{__name__}.resume_stalled_jobs": _resume_stalled_jobs_async,
+    }.get(func_name)
+
+
 async def _cleanup_storage_async() -> dict[str, int]:
     settings = get_settings()
     storage_root = Path(settings.files_storage_path)
@@ -188,9 +969,7 @@ async def _cleanup_storage_async() -> dict[str, int]:
     logger.info("cleanup: start")
 
     async with async_session() as session:
-        expired_uploads = (
-            await session.execute(select(Upload).where(Upload.expires_at < now))
-        ).scalars().all()
+        expired_uploads = (await session.execute(_expired_uploads_stmt(now))).scalars().all()
         for upload in expired_uploads:
             removed_uploads += 1
             removed, removed_size = _remove_file(
@@ -202,14 +981,7 @@ async def _cleanup_storage_async() -> dict[str, int]:
             await session.delete(upload)
 
         cutoff = now - dt.timedelta(days=settings.job_results_ttl_days)
-        expired_jobs = (
-            await session.execute(
-                select(Job).where(
-                    Job.status == "done",
-                    Job.updated_at < cutoff,
-                )
-            )
-        ).scalars().all()
+        expired_jobs = (await session.execute(_expired_jobs_stmt(cutoff))).scalars().all()
         for job in expired_jobs:
             removed, removed_size = _remove_job_files(storage_root, job.result_files or [])
             removed_job_files += removed
@@ -219,6 +991,8 @@ async def _cleanup_storage_async() -> dict[str, int]:
 
         await session.commit()
 
+    _, orphan_bytes = sweep_orphan_blobs()
+    freed_bytes += orphan_bytes
     freed_mb = round(freed_bytes / (1024 * 1024), 2)
     logger.info(
         "cleanup: removed_uploads=%s removed_job_files=%s freed_mb=%s",
@@ -233,6 +1007,19 @@ async def _cleanup_storage_async() -> dict[str, int]:
     }
 
 
+def _expired_uploads_stmt(now: dt.datetime):
+    return select(Upload).where(Upload.expires_at < now)
+
+
+def _expired_jobs_stmt(cutoff: dt.datetime):
+    # The status is rendered inline so the planner can match the partial
+    # ix_jobs_done_updated_at index even for generic prepared plans.
+    return select(Job).where(
+        Job.status == literal("done", literal_execute=True),
+        Job.updated_at < cutoff,
+    )
+
+
 def _resolve_storage_path(storage_root: Path, path_value: str | None) -> Path | None:
     if not path_value:
         return None
@@ -285,6 +1072,9 @@ def _remove_job_files(storage_root: Path, result_files: list[dict]) -> tuple[int
         path_value = item.get("path") or item.get("filename")
         file_path = _resolve_storage_path(storage_root, str(path_value) if path_value else None)
         file_removed, removed_size = _remove_file(file_path, storage_root)
+        if file_removed and file_path and item.get("sha256"):
+            # Content-addressed files only free space once the last link to the blob goes.
+            removed_size = release_blob(str(item["sha256"]), file_path.suffix)
         removed += file_removed
         removed_bytes += removed_size
     return removed, removed_bytes
@@ -316,13 +1106,17 @@ def _normalize_result_type(job_type: str) -> str:
 
 
 def _human_error_message(exc: Exception) -> str:
+    if isinstance(exc, GenApiTimeoutError):
+        return "Generation timed out."
     message = str(exc) if exc else ""
     if not message:
         return "Generation failed."
-    if message == "genapi_timeout":
-        return "Generation timed out."
     if message == "genapi_failed":
         return "Generation failed. Please try again."
     if message == "missing_request_id":
         return "Generation failed. Missing request id."
+    if message == "genapi_unavailable":
+        return "Generation service is unavailable. Please try again later."
+    if message == "download_failed":
+        return "Failed to save the result. Please try again."
     return message
@@ -1,10 +1,192 @@
+import asyncio
+import hashlib
+import hmac
+import json
 import os
+import time
+from urllib.parse import urlencode
+
 import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from app.auth import identity_cache
+from app.core import job_events
 from app.core.models import Base
+from app.core.settings import get_settings
 from app.main import app
+from app.providers.genapi import breaker as breaker_module
+from app.providers.genapi import durations as durations_module
+from app.providers.genapi import limiter as limiter_module
+from app.providers.genapi.breaker import GenApiCircuitBreaker
+from app.providers.genapi.durations import NetworkDurationStats
+from app.providers.genapi.limiter import GenApiLimiter, NetworkBudget
+from app.workers import cancellation
+
+TEST_BOT_TOKEN = "123:test-bot-token"
+
+
+class InMemoryPubSub:
+    def __init__(self, redis: "InMemoryRedis"):
+        self.redis = redis
+        self.channels: set[str] = set()
+        self.messages: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, *channels):
+        self.channels.update(channels)
+        if self not in self.redis.subscribers:
+            self.redis.subscribers.append(self)
+
+    async def unsubscribe(self, *channels):
+        self.channels.difference_update(channels or set(self.channels))
+
+    async def aclose(self):
+        if self in self.redis.subscribers:
+            self.redis.subscribers.remove(self)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        try:
+            return await asyncio.wait_for(self.messages.get(), max(timeout, 0.001))
+        except asyncio.TimeoutError:
+            return None
+
+
+class InMemoryRedis:
+    """Tiny asyncio Redis stand-in covering the commands the API uses."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+        self.sorted_sets: dict[str, dict[str, float]] = {}
+        self.hashes: dict[str, dict[str, int]] = {}
+        self.expires_at: dict[str, float] = {}
+        self.published: list[tuple[str, str]] = []
+        self.subscribers: list[InMemoryPubSub] = []
+
+    def pubsub(self):
+        return InMemoryPubSub(self)
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+        receivers = [sub for sub in self.subscribers if channel in sub.channels]
+        for subscriber in receivers:
+            subscriber.messages.put_nowait({"type": "message", "channel": channel, "data": message})
+        return len(receivers)
+
+    def pipeline(self, transaction=True):
+        return InMemoryPipeline(self)
+
+    def _expire_stale(self, key):
+        if key in self.expires_at and self.expires_at[key] <= time.monotonic():
+            self.expires_at.pop(key)
+            self.data.pop(key, None)
+            self.sorted_sets.pop(key, None)
+
+    async def get(self, key):
+        self._expire_stale(key)
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        self._expire_stale(key)
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        self.expires_at.pop(key, None)
+        if ex is not None or px is not None:
+            self.expires_at[key] = time.monotonic() + (ex if ex is not None else px / 1000)
+        return True
+
+    async def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            found = [store.pop(key, None) for store in (self.data, self.hashes, self.sorted_sets)]
+            removed += any(value is not None for value in found)
+        return removed
+
+    async def pttl(self, key):
+        self._expire_stale(key)
+        if key not in self.data and key not in self.sorted_sets:
+            return -2
+        if key not in self.expires_at:
+            return -1
+        return int((self.expires_at[key] - time.monotonic()) * 1000)
+
+    async def expire(self, key, seconds):
+        self.expires_at[key] = time.monotonic() + seconds
+        return True
+
+    async def incr(self, key):
+        self._expire_stale(key)
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+    async def hincrby(self, key, field, amount=1):
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = int(fields.get(field, 0)) + amount
+        return fields[field]
+
+    async def hgetall(self, key):
+        return {field.encode(): str(value).encode() for field, value in self.hashes.get(key, {}).items()}
+
+    async def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+        return len(mapping)
+
+    async def zadd(self, key, mapping, nx=False):
+        members = self.sorted_sets.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            if nx and member in members:
+                continue
+            added += member not in members
+            members[member] = score
+        return added
+
+    async def zrank(self, key, member):
+        members = self.sorted_sets.get(key, {})
+        if member not in members:
+            return None
+        return sorted(members, key=lambda item: (members[item], item)).index(member)
+
+    async def zrem(self, key, *members):
+        stored = self.sorted_sets.get(key, {})
+        return sum(1 for member in members if stored.pop(member, None) is not None)
+
+    async def zremrangebyscore(self, key, low, high):
+        stored = self.sorted_sets.get(key, {})
+        low = float(low)
+        stale = [member for member, score in stored.items() if low <= score <= float(high)]
+        for member in stale:
+            stored.pop(member)
+        return len(stale)
+
+
+class InMemoryPipeline:
+    """Queues commands and runs them back to back, like MULTI/EXEC."""
+
+    def __init__(self, redis: InMemoryRedis):
+        self.redis = redis
+        self.commands: list = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.commands.clear()
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, name)
+
+        def queue(*args, **kwargs):
+            self.commands.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        results = [await command(*args, **kwargs) for command, args, kwargs in self.commands]
+        self.commands.clear()
+        return results
 
 
 @pytest.fixture(scope="session")
@@ -46,3 +228,77 @@ async def client(db_session):
         yield ac
 
     app.dependency_overrides.clear()
+
+
+@pytest.fixture()
+def redis_stub():
+    return InMemoryRedis()
+
+
+@pytest.fixture(autouse=True)
+def identity_cache_stub(monkeypatch, redis_stub):
+    cache = identity_cache.UserIdentityCache(
+        "telegram", max_size=100, local_ttl_s=60, redis_ttl_s=60, redis_factory=lambda: redis_stub
+    )
+    monkeypatch.setattr(identity_cache, "_telegram_identity_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def job_events_stub(monkeypatch, redis_stub):
+    monkeypatch.setattr(job_events, "get_async_redis", lambda: redis_stub)
+    monkeypatch.setattr(job_events, "_shared_hub", None)
+    return redis_stub
+
+
+@pytest.fixture(autouse=True)
+def cancel_watcher_stub(monkeypatch, redis_stub):
+    monkeypatch.setattr(cancellation, "get_async_redis", lambda: redis_stub)
+    return redis_stub
+
+
+@pytest.fixture(autouse=True)
+def genapi_limiter_stub(monkeypatch, redis_stub):
+    limiter = GenApiLimiter(
+        NetworkBudget(max_concurrency=2, max_rps=100), retry_s=0.5, redis_factory=lambda: redis_stub
+    )
+    monkeypatch.setattr(limiter_module, "_limiter", limiter)
+    return limiter
+
+
+@pytest.fixture(autouse=True)
+def genapi_breaker_stub(monkeypatch, redis_stub):
+    breaker = GenApiCircuitBreaker(
+        window_s=60, min_requests=4, failure_ratio=0.5, open_s=30, redis_factory=lambda: redis_stub
+    )
+    monkeypatch.setattr(breaker_module, "_breaker", breaker)
+    return breaker
+
+
+@pytest.fixture(autouse=True)
+def duration_stats_stub(monkeypatch, redis_stub):
+    stats = NetworkDurationStats(prior_weight=5, max_samples=500, redis_factory=lambda: redis_stub)
+    monkeypatch.setattr(durations_module, "_stats", stats)
+    return stats
+
+
+@pytest.fixture()
+def auth_settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "telegram_bot_token", TEST_BOT_TOKEN)
+    monkeypatch.setattr(settings, "jwt_secret", "test-secret-with-enough-entropy-123")
+    return settings
+
+
+@pytest.fixture()
+def telegram_init_data():
+    """Build initData signed with the test bot token for the given Telegram user."""
+
+    def build(user: dict) -> str:
+        data = {"auth_date": str(int(time.time())), "user": json.dumps(user)}
+        check_string = "\n".join(f"{key}={value}" for key, value in sorted(data.items()))
+        secret_key = hmac.new(b"WebAppData", TEST_BOT_TOKEN.encode(), hashlib.sha256).digest()
+        data["hash"] = hmac.new(secret_key, check_string.encode(), hashlib.sha256).hexdigest()
+        return urlencode(data)
+
+    return build
@@ -0,0 +1,62 @@
+import datetime as dt
+import uuid
+
+import jwt
+import pytest
+
+from app.api.v1 import deps
+
+
+@pytest.mark.asyncio
+async def test_exchange_init_data_for_session_token(
+    client, auth_settings, telegram_init_data, monkeypatch
+):
+    response = await client.post(
+        "/api/v1/auth/telegram",
+        headers={"X-Telegram-Init-Data": telegram_init_data({"id": 4242, "username": "pelican"})},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["token_type"] == "bearer"
+    assert body["expires_in"] == auth_settings.jwt_exp_minutes * 60
+
+    def fail_verify(init_data):
+        raise AssertionError("session token requests must not re-verify initData")
+
+    monkeypatch.setattr(deps, "verify_init_data", fail_verify)
+    response = await client.get(
+        "/api/v1/credits/balance",
+        headers={"Authorization": f"Bearer {body['access_token']}"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"balance": 0}
+
+
+@pytest.mark.asyncio
+async def test_invalid_session_token_is_rejected(client, auth_settings):
+    response = await client.get(
+        "/api/v1/credits/balance", headers={"Authorization": "Bearer not-a-token"}
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_placeholder_jwt_secret_disables_session_tokens(
+    client, auth_settings, telegram_init_data, monkeypatch
+):
+    monkeypatch.setattr(auth_settings, "jwt_secret", "change-me")
+    forged = jwt.encode(
+        {"user_id": str(uuid.uuid4()), "exp": dt.datetime.utcnow() + dt.timedelta(minutes=5)},
+        "change-me",
+        algorithm=auth_settings.jwt_algorithm,
+    )
+
+    response = await client.get(
+        "/api/v1/credits/balance", headers={"Authorization": f"Bearer {forged}"}
+    )
+    assert response.status_code == 401
+
+    response = await client.post(
+        "/api/v1/auth/telegram", headers={"X-Telegram-Init-Data": telegram_init_data({"id": 4343})}
+    )
+    assert response.status_code == 503
@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+from rq.exceptions import DequeueTimeout
+
+from app.workers import executor as executor_module
+from app.workers.executor import ConcurrentJobExecutor
+
+
+class FakeRQJob:
+    def __init__(self, job_id: str, fail: bool = False):
+        self.id = job_id
+        self.func_name = "app.workers.tasks.run_job"
+        self.args = (job_id,)
+        self.kwargs = {}
+        self.timeout = None
+        self.fail = fail
+
+
+class FakeExecutor(ConcurrentJobExecutor):
+    def __init__(self, jobs, concurrency):
+        super().__init__([], connection=None, concurrency=concurrency, dequeue_timeout=0)
+        self.pending = list(jobs)
+        self.finished: list[str] = []
+        self.failed: list[str] = []
+
+    def _dequeue(self, queues):
+        if not self.pending:
+            self.request_stop()
+            return None
+        return self.pending.pop(0), None
+
+    def _mark_started(self, job):
+        return None
+
+    def _mark_finished(self, job, queue):
+        self.finished.append(job.id)
+
+    def _mark_failed(self, job, queue, exc_string):
+        self.failed.append(job.id)
+
+
+@pytest.mark.asyncio
+async def test_executor_runs_jobs_concurrently_and_acks_individually(monkeypatch):
+    running = 0
+    peak = 0
+
+    async def fake_run_job(job_id: str):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        if job_id == "bad":
+            raise RuntimeError("boom")
+        return {}
+
+    async def noop():
+        return None
+
+    monkeypatch.setattr(executor_module, "get_async_entrypoint", lambda name: fake_run_job)
+    monkeypatch.setattr(executor_module, "close_genapi_client", noop)
+
+    jobs = [FakeRQJob(f"job-{index}") for index in range(5)] + [FakeRQJob("bad")]
+    executor = FakeExecutor(jobs, concurrency=3)
+    await executor.run()
+
+    assert peak == 3
+    assert sorted(executor.finished) == [f"job-{index}" for index in range(5)]
+    assert executor.failed == ["bad"]
+
+
+class RecordingPipeline:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self):
+        self.calls.append("execute")
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.calls: list = []
+
+    def pipeline(self):
+        return RecordingPipeline(self.calls)
+
+
+class RecordingExecution:
+    def __init__(self, calls):
+        self.calls = calls
+
+    @classmethod
+    def create(cls, job, ttl, pipeline):
+        pipeline.calls.append(("registered", job.id, ttl))
+        return cls(pipeline.calls)
+
+    def delete(self, job, pipeline):
+        pipeline.calls.append(("unregistered", job.id))
+
+
+class StatusRQJob(FakeRQJob):
+    def set_status(self, status, pipeline=None):
+        pass
+
+
+def test_started_jobs_are_registered_until_they_finish(monkeypatch):
+    monkeypatch.setattr(executor_module, "Execution", RecordingExecution)
+    connection = RecordingConnection()
+    executor = ConcurrentJobExecutor([], connection=connection, concurrency=1)
+    job = StatusRQJob("job-1")
+    job.timeout = 600
+
+    executor._mark_started(job)
+    executor._leave_started_registry(job)
+
+    ttl = 600 + executor_module.STARTED_TTL_MARGIN_S
+    assert connection.calls == [
+        ("registered", "job-1", ttl),
+        "execute",
+        ("unregistered", "job-1"),
+        "execute",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_idle_dequeue_timeout_is_not_an_error(caplog):
+    class IdleExecutor(ConcurrentJobExecutor):
+        def _dequeue(self, queues):
+            raise DequeueTimeout(0)
+
+    executor = IdleExecutor([], connection=None, concurrency=1, dequeue_timeout=0)
+
+    started = asyncio.get_running_loop().time()
+    assert await executor._next_job([]) is None
+    assert asyncio.get_running_loop().time() - started < 0.5
+    assert not [record for record in caplog.records if record.levelname == "ERROR"]
@@ -0,0 +1,59 @@
+import pytest
+
+from app.api.v1.deps import get_current_user
+from app.core.job_files import ensure_job_dir
+from app.core.models.job import Job
+from app.core.repositories.users import UserRepository
+from app.core.settings import get_settings
+from app.main import app
+
+PAYLOAD = bytes(range(256)) * 40
+
+
+@pytest.fixture()
+async def stored_file(client, db_session, monkeypatch, tmp_path):
+    monkeypatch.setattr(get_settings(), "files_storage_path", str(tmp_path))
+    user, _ = await UserRepository(db_session).get_or_create_from_telegram({"id": "files-1"})
+    job = Job(user_id=user.id, type="video", status="done", payload={}, cost=0)
+    db_session.add(job)
+    await db_session.commit()
+    (ensure_job_dir(str(job.id)) / "clip.mp4").write_bytes(PAYLOAD)
+    job.result_files = [{"filename": "clip.mp4", "sha256": "abc123"}]
+    await db_session.commit()
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield f"/api/v1/files/{job.id}/clip.mp4"
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.asyncio
+async def test_file_has_cache_headers_and_conditional_get(client, stored_file):
+    response = await client.get(stored_file)
+    assert response.status_code == 200
+    assert response.content == PAYLOAD
+    assert response.headers["etag"] == '"abc123"'
+    assert "immutable" in response.headers["cache-control"]
+
+    response = await client.get(stored_file, headers={"If-None-Match": '"abc123"'})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = await client.get(
+        stored_file, headers={"If-Modified-Since": response.headers["last-modified"]}
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_file_range_requests(client, stored_file):
+    response = await client.get(stored_file, headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 100-199/{len(PAYLOAD)}"
+    assert response.content == PAYLOAD[100:200]
+
+    response = await client.get(stored_file, headers={"Range": "bytes=-10"})
+    assert response.status_code == 206
+    assert response.content == PAYLOAD[-10:]
+
+    response = await client.get(stored_file, headers={"Range": f"bytes={len(PAYLOAD)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(PAYLOAD)}"
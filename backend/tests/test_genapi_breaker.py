@@ -0,0 +1,102 @@
+import datetime as dt
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.models.job import Job
+from app.core.repositories.users import UserRepository
+from app.providers.genapi.breaker import GLOBAL_SCOPE
+from app.workers import tasks
+
+
+async def _trip(breaker, network_id: str) -> None:
+    for ok in (True, False, False, False):
+        await breaker.record(network_id, ok=ok)
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_then_probes_once_and_closes(genapi_breaker_stub, redis_stub):
+    breaker = genapi_breaker_stub
+    await breaker.record("veo", ok=False)
+    assert await breaker.retry_in("veo") == 0
+
+    await _trip(breaker, "veo")
+    assert 29 < await breaker.open_for("veo") <= 30
+    assert await breaker.retry_in("suno") > 0
+
+    for scope in (GLOBAL_SCOPE, "veo"):
+        await redis_stub.delete(breaker._key(scope, "open"))
+    assert await breaker.open_for("veo") == 0
+    assert await breaker.retry_in("veo") == 0
+    assert await breaker.retry_in("veo") == 30
+
+    await breaker.record("veo", ok=True)
+    assert await breaker.retry_in("veo") == 0
+    assert await breaker.retry_in("veo") == 0
+
+
+@pytest.mark.asyncio
+async def test_create_job_is_rejected_while_breaker_is_open(
+    client, genapi_breaker_stub, auth_settings, telegram_init_data
+):
+    await _trip(genapi_breaker_stub, "gpt-image-1-5")
+    headers = {"X-Telegram-Init-Data": telegram_init_data({"id": 4242})}
+
+    response = await client.post(
+        "/api/v1/jobs",
+        headers=headers,
+        json={"type": "image", "payload": {"network_id": "gpt-image-1-5", "params": {}}},
+    )
+
+    assert response.status_code == 503
+    assert response.json()["detail"] == "provider_unavailable"
+    assert int(response.headers["Retry-After"]) > 0
+
+
+@pytest.mark.asyncio
+async def test_worker_holds_jobs_while_open_and_fails_stale_ones(
+    db_session, test_engine, genapi_breaker_stub, monkeypatch
+):
+    await _trip(genapi_breaker_stub, "gpt-image-1-5")
+    user, _ = await UserRepository(db_session).get_or_create_from_telegram({"id": "breaker-1"})
+    fresh = Job(
+        user_id=user.id,
+        type="image",
+        status="queued",
+        payload={"network_id": "gpt-image-1-5", "params": {}},
+        cost=0,
+    )
+    stale = Job(
+        user_id=user.id,
+        type="image",
+        status="queued",
+        payload={"network_id": "gpt-image-1-5", "params": {}},
+        cost=0,
+        created_at=dt.datetime.utcnow() - dt.timedelta(hours=1),
+    )
+    db_session.add_all([fresh, stale])
+    await db_session.commit()
+    scheduled: list[tuple] = []
+
+    def no_client():
+        raise AssertionError("provider called while breaker is open")
+
+    monkeypatch.setattr(tasks, "get_genapi_client", no_client)
+    monkeypatch.setattr(
+        tasks,
+        "async_session",
+        async_sessionmaker(test_engine, expire_on_commit=False, class_=AsyncSession),
+    )
+    monkeypatch.setattr(
+        tasks, "enqueue_in", lambda delay, func, *args, **kwargs: scheduled.append(args)
+    )
+
+    await tasks._run_job_async(str(fresh.id))
+    await tasks._run_job_async(str(stale.id))
+
+    assert scheduled == [(str(fresh.id),)]
+    await db_session.refresh(fresh)
+    await db_session.refresh(stale)
+    assert fresh.status == "queued"
+    assert stale.status == "error"
+    assert stale.error == "Generation service is unavailable. Please try again later."
@@ -0,0 +1,169 @@
+import datetime as dt
+from urllib.parse import urlparse
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.models.job import Job
+from app.core.repositories.credits import CreditRepository
+from app.core.repositories.users import UserRepository
+from app.core.settings import get_settings
+from app.providers.genapi.callbacks import build_callback_url, verify_callback_token
+from app.workers import tasks
+
+
+class StandInGenApi:
+    """Local provider stand-in: accepts submissions and later fires their callbacks."""
+
+    def __init__(self):
+        self.submissions: list[dict] = []
+
+    async def submit_network(self, network_id: str, params: dict, files=None) -> dict:
+        self.submissions.append({"network_id": network_id, "params": params})
+        return {"request_id": len(self.submissions), "status": "processing"}
+
+    async def poll(self, request_id: str) -> dict:
+        raise AssertionError("callback mode must not poll")
+
+    async def fire(self, http_client, index: int, payload: dict):
+        callback_url = urlparse(self.submissions[index]["params"]["callback_url"])
+        return await http_client.post(f"{callback_url.path}?{callback_url.query}", json=payload)
+
+
+@pytest.fixture()
+def callback_mode(monkeypatch, test_engine):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "genapi_callback_base_url", "https://app.example")
+    monkeypatch.setattr(settings, "genapi_callback_secret", "callback-test-secret")
+    provider = StandInGenApi()
+    scheduled: list[tuple] = []
+    monkeypatch.setattr(tasks, "get_genapi_client", lambda: provider)
+    monkeypatch.setattr(
+        tasks,
+        "async_session",
+        async_sessionmaker(test_engine, expire_on_commit=False, class_=AsyncSession),
+    )
+    monkeypatch.setattr(
+        tasks, "enqueue_in", lambda delay, func, *args, **kwargs: scheduled.append(args)
+    )
+    return provider, scheduled
+
+
+async def _create_job(db_session, platform_user_id: str) -> Job:
+    user, _ = await UserRepository(db_session).get_or_create_from_telegram({"id": platform_user_id})
+    job = Job(
+        user_id=user.id,
+        type="text",
+        status="queued",
+        payload={"network_id": "gpt-5-2", "params": {"prompt": "Hi"}},
+        cost=0,
+    )
+    db_session.add(job)
+    await db_session.commit()
+    return job
+
+
+@pytest.mark.asyncio
+async def test_callback_completes_job_without_polling(client, db_session, callback_mode):
+    provider, scheduled = callback_mode
+    job = await _create_job(db_session, "cb-1")
+
+    await tasks._run_job_async(str(job.id))
+
+    assert provider.submissions[0]["params"]["callback_url"].startswith(
+        f"https://app.example/api/v1/providers/genapi/callback/{job.id}?token="
+    )
+    assert scheduled and scheduled[0][0] == str(job.id)
+    await db_session.refresh(job)
+    assert job.provider_request_id == "1"
+
+    response = await provider.fire(
+        client, 0, {"status": "success", "result": "Hello", "request_id": 1}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"ok": True, "status": "done"}
+
+    await db_session.refresh(job)
+    assert job.status == "done"
+    assert job.result["items"][0]["text"] == "Hello"
+
+
+@pytest.mark.asyncio
+async def test_callback_rejects_bad_token(client, db_session, callback_mode):
+    job = await _create_job(db_session, "cb-2")
+
+    response = await client.post(
+        f"/api/v1/providers/genapi/callback/{job.id}?token=nope",
+        json={"status": "success", "result": "Hello"},
+    )
+
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_callback_rejects_foreign_request_id(client, db_session, callback_mode):
+    provider, _ = callback_mode
+    job = await _create_job(db_session, "cb-3")
+    await tasks._run_job_async(str(job.id))
+
+    response = await provider.fire(
+        client, 0, {"status": "success", "result": "Spoofed", "request_id": "other"}
+    )
+
+    assert response.status_code == 409
+    await db_session.refresh(job)
+    assert job.status == "processing"
+
+
+def test_placeholder_secret_keeps_callbacks_off(callback_mode, monkeypatch):
+    monkeypatch.setattr(get_settings(), "genapi_callback_secret", "change-me")
+
+    assert build_callback_url("job-1") is None
+    assert not verify_callback_token("job-1", "anything")
+
+
+class BrokenPollGenApi(StandInGenApi):
+    async def poll(self, request_id: str) -> dict:
+        request = httpx.Request("GET", f"https://genapi.example/request/{request_id}")
+        raise httpx.HTTPStatusError("bad gateway", request=request, response=httpx.Response(400))
+
+
+@pytest.mark.asyncio
+async def test_safety_poll_chain_survives_errors_and_fails_at_deadline(
+    db_session, callback_mode, monkeypatch
+):
+    provider = BrokenPollGenApi()
+    monkeypatch.setattr(tasks, "get_genapi_client", lambda: provider)
+    scheduled: list[tuple] = []
+    monkeypatch.setattr(
+        tasks,
+        "enqueue_in",
+        lambda delay, func, *args, **kwargs: scheduled.append((func, args, kwargs)),
+    )
+    job = await _create_job(db_session, "cb-4")
+    job.cost = 5
+    await db_session.commit()
+    await tasks._run_job_async(str(job.id))
+    scheduled.clear()
+    future = dt.datetime.utcnow().timestamp() + 600
+
+    await tasks._check_provider_request_async(str(job.id), "1", future)
+
+    assert scheduled == [
+        (
+            tasks.check_provider_request,
+            (str(job.id), "1", future),
+            {"timeout": tasks.resolve_job_queue(job.type, job.payload)[1]},
+        )
+    ]
+    await db_session.refresh(job)
+    assert job.status == "processing"
+
+    scheduled.clear()
+    await tasks._check_provider_request_async(str(job.id), "1", future - 1200)
+
+    assert scheduled == []
+    await db_session.refresh(job)
+    assert job.status == "error"
+    assert await CreditRepository(db_session).has_job_reason(job.id, "job_refund")
@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+
+from app.providers.genapi import client as client_module
+from app.providers.genapi.client import AsyncGenApiClient, get_genapi_client
+
+
+@pytest.mark.asyncio
+async def test_shared_client_is_reused_within_loop():
+    first = get_genapi_client()
+    second = get_genapi_client()
+    assert first is second
+    await first.aclose()
+    assert get_genapi_client() is not first
+
+
+@pytest.mark.asyncio
+async def test_client_from_a_previous_loop_is_closed(monkeypatch):
+    previous_loop = asyncio.new_event_loop()
+    stale = AsyncGenApiClient()
+    monkeypatch.setattr(client_module, "_shared_client", stale)
+    monkeypatch.setattr(client_module, "_shared_loop", previous_loop)
+    try:
+        fresh = get_genapi_client()
+        await asyncio.sleep(0)
+    finally:
+        previous_loop.close()
+
+    assert fresh is not stale
+    assert stale.is_closed
+    await fresh.aclose()
@@ -0,0 +1,104 @@
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.models.job import Job
+from app.core.repositories.users import UserRepository
+from app.providers.genapi.client import AsyncGenApiClient
+from app.providers.genapi.errors import GenApiRateLimitedError
+from app.providers.genapi.limiter import GenApiLimiter, NetworkBudget
+from app.workers import tasks
+
+
+@pytest.mark.asyncio
+async def test_concurrency_budget_is_shared_and_released(redis_stub):
+    limiter = GenApiLimiter(
+        NetworkBudget(max_concurrency=2, max_rps=0), retry_s=4, redis_factory=lambda: redis_stub
+    )
+
+    assert await limiter.acquire("veo", "job-1") == 0
+    assert await limiter.acquire("veo", "job-2") == 0
+    assert await limiter.acquire("veo", "job-3") == 4
+    assert await limiter.acquire("suno", "job-3") == 0
+
+    await limiter.release("veo", "job-1")
+    assert await limiter.acquire("veo", "job-3") == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_budget_and_retry_after_block(redis_stub):
+    limiter = GenApiLimiter(
+        NetworkBudget(max_concurrency=0, max_rps=2),
+        {"veo": NetworkBudget(max_concurrency=0, max_rps=100)},
+        redis_factory=lambda: redis_stub,
+    )
+
+    waits = [await limiter.acquire("suno", f"job-{index}") for index in range(3)]
+    assert waits[:2] == [0, 0]
+    assert 0 < waits[2] <= 1
+
+    await limiter.block("veo", 30)
+    assert 29 < await limiter.acquire("veo", "job-9") <= 30
+
+
+@pytest.mark.asyncio
+async def test_client_reports_retry_after_on_429():
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(429, headers={"Retry-After": "7"})
+    )
+    client = AsyncGenApiClient(transport=transport)
+    try:
+        with pytest.raises(GenApiRateLimitedError) as exc_info:
+            await client.submit_network("veo", {})
+    finally:
+        await client.aclose()
+
+    assert exc_info.value.retry_after_s == 7
+
+
+class ThrottledGenApi:
+    def __init__(self):
+        self.submissions = 0
+
+    async def submit_network(self, network_id, params, files=None):
+        self.submissions += 1
+        raise GenApiRateLimitedError(12)
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_job_is_requeued_without_retrying(
+    db_session, test_engine, monkeypatch, genapi_limiter_stub
+):
+    user, _ = await UserRepository(db_session).get_or_create_from_telegram({"id": "limit-1"})
+    job = Job(
+        user_id=user.id,
+        type="image",
+        status="queued",
+        payload={"network_id": "gpt-image-1-5", "params": {"prompt": "Hi"}},
+        cost=0,
+    )
+    db_session.add(job)
+    await db_session.commit()
+    provider = ThrottledGenApi()
+    scheduled: list[tuple] = []
+    monkeypatch.setattr(tasks, "get_genapi_client", lambda: provider)
+    monkeypatch.setattr(
+        tasks,
+        "async_session",
+        async_sessionmaker(test_engine, expire_on_commit=False, class_=AsyncSession),
+    )
+    monkeypatch.setattr(
+        tasks, "enqueue_in", lambda delay, func, *args, **kwargs: scheduled.append((delay, args))
+    )
+
+    await tasks._run_job_async(str(job.id))
+
+    assert provider.submissions == 1
+    assert scheduled == [(12, (str(job.id),))]
+    await db_session.refresh(job)
+    assert job.status == "queued"
+    assert 11 < await genapi_limiter_stub.acquire("gpt-image-1-5", "other") <= 12
+
+    await tasks._run_job_async(str(job.id))
+    assert provider.submissions == 1
+    assert scheduled[-1][0] > 11
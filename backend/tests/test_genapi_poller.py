@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from app.providers.genapi.client import eta_poll_delay
+from app.providers.genapi.errors import GenApiRetryableError
+from app.providers.genapi.poller import GenApiPoller
+
+
+class FakePollClient:
+    def __init__(self, statuses: dict[str, list[str]]):
+        self.statuses = statuses
+        self.calls: list[str] = []
+
+    async def poll(self, request_id: str) -> dict:
+        self.calls.append(request_id)
+        queue = self.statuses[request_id]
+        status = queue.pop(0) if len(queue) > 1 else queue[0]
+        return {"status": status, "request_id": request_id}
+
+
+@pytest.mark.asyncio
+async def test_poller_wakes_each_waiter_with_its_terminal_payload():
+    client = FakePollClient(
+        {
+            "a": ["processing", "success"],
+            "b": ["processing", "processing", "failed"],
+            "c": ["done"],
+        }
+    )
+    poller = GenApiPoller(client_factory=lambda: client, tick_s=0.01, max_rps=1000)
+
+    results = await asyncio.gather(
+        *(poller.wait(request_id, timeout_s=5, interval_s=0.01) for request_id in "abc")
+    )
+
+    assert [item["status"] for item in results] == ["success", "failed", "done"]
+    assert poller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_poller_caps_polls_per_tick():
+    client = FakePollClient({str(index): ["processing"] for index in range(10)})
+    poller = GenApiPoller(client_factory=lambda: client, tick_s=0.05, max_rps=40)
+
+    with pytest.raises(GenApiRetryableError):
+        await asyncio.gather(
+            *(poller.wait(str(index), timeout_s=0.12, interval_s=0.01) for index in range(10))
+        )
+
+    # 2 polls per 50 ms tick over roughly three ticks.
+    assert len(client.calls) <= 8
+
+
+def test_eta_schedule_polls_densest_near_completion():
+    delays = []
+    elapsed = 0.0
+    while elapsed < 600:
+        delay = eta_poll_delay(elapsed, 600, 2.0)
+        delays.append(delay)
+        elapsed += delay
+
+    assert delays[0] == 300
+    assert len(delays) < 15
+    assert eta_poll_delay(660, 600, 2.0) == pytest.approx(2.2)
+    assert eta_poll_delay(6000, 600, 2.0) == 10.0
+
+
+@pytest.mark.asyncio
+async def test_poller_waits_for_eta_before_first_poll():
+    client = FakePollClient({"slow": ["processing", "processing", "success"]})
+    poller = GenApiPoller(client_factory=lambda: client, tick_s=0.01, max_rps=1000)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    waiter = asyncio.create_task(poller.wait("slow", timeout_s=5, interval_s=0.01, eta_s=0.2))
+    await asyncio.sleep(0.05)
+    assert client.calls == []
+
+    result = await waiter
+
+    assert result["status"] == "success"
+    assert loop.time() - started >= 0.1
+
+
+@pytest.mark.asyncio
+async def test_learned_duration_moves_eta_from_the_prior(duration_stats_stub):
+    stats = duration_stats_stub
+    assert await stats.expected_seconds("veo", prior_s=120) == 120
+    assert await stats.expected_seconds("veo", prior_s=None) is None
+
+    for _ in range(10):
+        await stats.record("veo", 400)
+
+    assert await stats.expected_seconds("veo", prior_s=120) == 420
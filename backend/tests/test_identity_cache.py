@@ -0,0 +1,59 @@
+import uuid
+
+import pytest
+
+from app.auth.identity_cache import CachedIdentity
+from app.core.repositories.users import UserRepository
+
+
+@pytest.mark.asyncio
+async def test_repeat_requests_skip_user_lookup(
+    client, auth_settings, telegram_init_data, monkeypatch, redis_stub
+):
+    headers = {"X-Telegram-Init-Data": telegram_init_data({"id": 5151, "username": "gull"})}
+    response = await client.get("/api/v1/credits/balance", headers=headers)
+    assert response.status_code == 200
+    assert any(key.endswith(":telegram:5151") for key in redis_stub.data)
+
+    async def fail_lookup(self, user_payload):
+        raise AssertionError("cached identity must not hit the users table")
+
+    monkeypatch.setattr(UserRepository, "get_or_create_from_telegram", fail_lookup)
+    response = await client.get("/api/v1/credits/balance", headers=headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_profile_change_and_invalidation_refresh_identity(
+    client, auth_settings, telegram_init_data, identity_cache_stub, monkeypatch
+):
+    await client.get(
+        "/api/v1/credits/balance",
+        headers={"X-Telegram-Init-Data": telegram_init_data({"id": 6262, "username": "old"})},
+    )
+    lookups = []
+    original = UserRepository.get_or_create_from_telegram
+
+    async def counting_lookup(self, user_payload):
+        lookups.append(user_payload)
+        return await original(self, user_payload)
+
+    monkeypatch.setattr(UserRepository, "get_or_create_from_telegram", counting_lookup)
+    await client.get(
+        "/api/v1/credits/balance",
+        headers={"X-Telegram-Init-Data": telegram_init_data({"id": 6262, "username": "new"})},
+    )
+    assert [payload["username"] for payload in lookups] == ["new"]
+
+    await identity_cache_stub.invalidate("6262")
+    assert await identity_cache_stub.get("6262") is None
+
+
+@pytest.mark.asyncio
+async def test_local_tier_is_bounded(identity_cache_stub, redis_stub):
+    identity_cache_stub.max_size = 2
+    for index in range(3):
+        await identity_cache_stub.set(str(index), CachedIdentity(uuid.uuid4(), "hash"))
+    assert list(identity_cache_stub._local) == ["1", "2"]
+    redis_stub.data.clear()
+    assert await identity_cache_stub.get("0") is None
@@ -0,0 +1,157 @@
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.v1.deps import get_current_user, get_rq_queues
+from app.core import job_files
+from app.core.job_events import CANCEL_CHANNEL, publish_job_cancel
+from app.core.models.job import Job
+from app.core.repositories.credits import CreditRepository
+from app.core.repositories.jobs import JobRepository
+from app.core.repositories.users import UserRepository
+from app.core.settings import get_settings
+from app.main import app
+from app.providers.genapi.poller import GenApiPoller
+from app.workers import tasks
+
+
+class RemovableQueue:
+    def __init__(self):
+        self.enqueued: list[tuple] = []
+        self.removed: list[str] = []
+
+    def enqueue(self, func, *args, **kwargs):
+        self.enqueued.append((func, args, kwargs.get("job_id")))
+
+    def remove(self, job_id):
+        self.removed.append(job_id)
+
+
+class EndlessGenApi:
+    def __init__(self):
+        self.submissions: list[dict] = []
+        self.cancelled: list[str] = []
+
+    async def submit_network(self, network_id: str, params: dict, files=None) -> dict:
+        self.submissions.append(params)
+        return {"request_id": "req-long", "status": "processing"}
+
+    async def poll(self, request_id: str) -> dict:
+        return {"status": "processing", "request_id": request_id}
+
+    async def cancel(self, request_id: str) -> dict:
+        self.cancelled.append(request_id)
+        return {"status": "cancelled"}
+
+
+@pytest.fixture()
+def worker_session(monkeypatch, test_engine):
+    monkeypatch.setattr(
+        tasks,
+        "async_session",
+        async_sessionmaker(test_engine, expire_on_commit=False, class_=AsyncSession),
+    )
+
+
+async def _job(db_session, platform_user_id: str, status: str = "queued", cost: int = 0) -> Job:
+    user, _ = await UserRepository(db_session).get_or_create_from_telegram({"id": platform_user_id})
+    job = Job(
+        user_id=user.id,
+        type="text",
+        status=status,
+        payload={"network_id": "gpt", "params": {"prompt": "hi"}},
+        cost=cost,
+    )
+    db_session.add(job)
+    await db_session.commit()
+    return job
+
+
+@pytest.mark.asyncio
+async def test_cancel_unqueues_and_refunds_and_job_never_runs(
+    client, db_session, redis_stub, worker_session
+):
+    job = await _job(db_session, "cancel-1", cost=5)
+    user, _ = await UserRepository(db_session).get_or_create_from_telegram({"id": "cancel-1"})
+    queue = RemovableQueue()
+    assert await tasks.enqueue_job(lambda name: queue, db_session, job) is True
+    assert queue.enqueued[0][2] == tasks.run_job_rq_id(job.id)
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_rq_queues] = lambda: lambda name: queue
+    try:
+        response = await client.post(f"/api/v1/jobs/{job.id}/cancel")
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        app.dependency_overrides.pop(get_rq_queues, None)
+
+    assert response.status_code == 200
+    assert response.json()["error"] == "Canceled"
+    assert queue.removed == [tasks.run_job_rq_id(job.id)]
+    assert (CANCEL_CHANNEL, str(job.id)) in redis_stub.published
+    assert await CreditRepository(db_session).has_job_reason(job.id, "job_refund")
+
+    await tasks._run_job_async(str(job.id))
+    await db_session.refresh(job)
+    assert job.status == "error"
+    assert job.started_at is None
+
+
+@pytest.mark.asyncio
+async def test_cancel_aborts_running_job(db_session, worker_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "genapi_cancel_path", "/request/cancel/{request_id}")
+    provider = EndlessGenApi()
+    poller = GenApiPoller(client_factory=lambda: provider, tick_s=0.01, max_rps=1000)
+    monkeypatch.setattr(tasks, "get_genapi_client", lambda: provider)
+    monkeypatch.setattr(tasks, "get_genapi_poller", lambda: poller)
+    job = await _job(db_session, "cancel-2")
+
+    running = asyncio.create_task(tasks._run_job_async(str(job.id)))
+    while not provider.submissions:
+        await asyncio.sleep(0.01)
+    assert await JobRepository(db_session).mark_cancelled(job, job.created_at)
+    await publish_job_cancel(job.id)
+
+    await asyncio.wait_for(running, 2)
+    assert provider.cancelled == ["req-long"]
+    assert poller.in_flight == 0
+    await db_session.refresh(job)
+    assert job.status == "error"
+    assert job.error == "Canceled"
+
+
+@pytest.mark.asyncio
+async def test_late_result_does_not_overwrite_cancelled_job(db_session):
+    job = await _job(db_session, "cancel-3", status="processing")
+    assert await JobRepository(db_session).mark_cancelled(job, job.created_at)
+
+    await tasks.complete_job(db_session, job, {"status": "success", "result": "late"})
+
+    await db_session.refresh(job)
+    assert job.status == "error"
+    assert job.result is None
+
+
+@pytest.mark.asyncio
+async def test_duplicate_completion_keeps_delivered_files(db_session, monkeypatch, tmp_path):
+    monkeypatch.setattr(get_settings(), "files_storage_path", str(tmp_path))
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, headers={"Content-Type": "image/png"}, content=b"png")
+    )
+    job = await _job(db_session, "cancel-4", status="processing")
+    job.type = "image"
+    await db_session.commit()
+    response = {"status": "success", "files": ["https://cdn.example/out.png"]}
+
+    async with httpx.AsyncClient(transport=transport) as download_client:
+        monkeypatch.setattr(job_files, "get_download_client", lambda: download_client)
+        await tasks.complete_job(db_session, job, response)
+        # A duplicate callback or the safety poll delivers the same result again.
+        await tasks.complete_job(db_session, job, dict(response))
+
+    await db_session.refresh(job)
+    assert job.status == "done"
+    stored = tmp_path / job.result_files[0]["path"]
+    assert stored.read_bytes() == b"png"
+    assert sorted(path.name for path in stored.parent.iterdir()) == [stored.name]
@@ -0,0 +1,178 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.v1.routes import jobs as jobs_routes
+from app.core.job_events import (
+    JobEventSubscription,
+    get_cached_job_status,
+    job_channel,
+    publish_job_event,
+    status_key,
+    user_channel,
+)
+from app.core.models.job import Job
+from app.core.repositories.jobs import JobRepository
+from app.core.repositories.users import UserRepository
+from app.workers import tasks
+
+
+async def _job(db_session, platform_user_id: str, status: str = "queued") -> Job:
+    user, _ = await UserRepository(db_session).get_or_create_from_telegram({"id": platform_user_id})
+    job = Job(user_id=user.id, type="text", status=status, payload={}, cost=0)
+    db_session.add(job)
+    await db_session.commit()
+    return job
+
+
+@pytest.mark.asyncio
+async def test_transitions_are_published_with_result(db_session, redis_stub):
+    job = await _job(db_session, "events-1")
+
+    async with JobEventSubscription([user_channel(job.user_id)], heartbeat_s=0.05) as events:
+        await tasks._claim_job(db_session, job)
+        await tasks.complete_job(db_session, job, {"status": "success", "result": "Hi"})
+        received = []
+        async for event in events:
+            if event is None:
+                break
+            received.append(event)
+
+    assert [event["status"] for event in received] == ["processing", "done"]
+    assert received[-1]["result"]["items"][0]["text"] == "Hi"
+    assert {channel for channel, _ in redis_stub.published} == {
+        job_channel(job.id),
+        user_channel(job.user_id),
+    }
+
+
+@pytest.mark.asyncio
+async def test_status_cache_never_moves_a_finished_job_back(db_session, redis_stub, monkeypatch):
+    job = await _job(db_session, "events-stale")
+    await tasks._claim_job(db_session, job)
+    await tasks.complete_job(db_session, job, {"status": "success", "result": "Hi"})
+
+    job.status = "processing"
+    await publish_job_event(job)
+    assert (await get_cached_job_status(job.id))["status"] == "done"
+
+    other = await _job(db_session, "events-stale-2")
+    await tasks._claim_job(db_session, other)
+
+    def broken_pipeline(transaction=True):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(redis_stub, "pipeline", broken_pipeline)
+    other.status = "error"
+    await publish_job_event(other)
+    assert await redis_stub.get(status_key(other.id)) is None
+
+
+@pytest.mark.asyncio
+async def test_subscription_yields_heartbeat_when_idle(db_session):
+    job = await _job(db_session, "events-2")
+    async with JobEventSubscription([job_channel(job.id)], heartbeat_s=0.01) as events:
+        iterator = events.__aiter__()
+        assert await iterator.__anext__() is None
+        await publish_job_event(job)
+        assert (await iterator.__anext__())["status"] == "queued"
+
+
+@pytest.mark.asyncio
+async def test_subscriptions_share_one_pubsub_connection(db_session, redis_stub):
+    job = await _job(db_session, "events-4")
+    async with JobEventSubscription([job_channel(job.id)], heartbeat_s=0.05) as first:
+        async with JobEventSubscription([user_channel(job.user_id)], heartbeat_s=0.05) as second:
+            assert len(redis_stub.subscribers) == 1
+            await publish_job_event(job)
+            assert (await first.__aiter__().__anext__())["id"] == str(job.id)
+            assert (await second.__aiter__().__anext__())["id"] == str(job.id)
+            assert await second.__aiter__().__anext__() is None
+
+    assert redis_stub.subscribers[0].channels == set()
+
+
+@pytest.mark.asyncio
+async def test_job_stream_closes_after_terminal_snapshot(
+    client, db_session, auth_settings, telegram_init_data, monkeypatch
+):
+    headers = {"X-Telegram-Init-Data": telegram_init_data({"id": 7373})}
+    user_response = await client.get("/api/v1/credits/balance", headers=headers)
+    assert user_response.status_code == 200
+    job = await _job(db_session, "7373", status="done")
+    monkeypatch.setattr(
+        jobs_routes,
+        "async_session",
+        async_sessionmaker(db_session.bind, expire_on_commit=False, class_=AsyncSession),
+    )
+
+    response = await client.get(f"/api/v1/jobs/{job.id}/events", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    event_line = next(line for line in response.text.splitlines() if line.startswith("data: "))
+    assert json.loads(event_line.removeprefix("data: "))["status"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_result_long_poll_returns_when_job_finishes(
+    client, db_session, auth_settings, telegram_init_data, monkeypatch
+):
+    headers = {"X-Telegram-Init-Data": telegram_init_data({"id": 8484})}
+    await client.get("/api/v1/credits/balance", headers=headers)
+    job = await _job(db_session, "8484", status="processing")
+    monkeypatch.setattr(
+        jobs_routes,
+        "async_session",
+        async_sessionmaker(db_session.bind, expire_on_commit=False, class_=AsyncSession),
+    )
+
+    response = await client.get(f"/api/v1/jobs/{job.id}/result?wait=0.05", headers=headers)
+    assert response.status_code == 202
+
+    async def finish_soon():
+        await asyncio.sleep(0.05)
+        await tasks.complete_job(db_session, job, {"status": "success", "result": "Done"})
+
+    finisher = asyncio.create_task(finish_soon())
+    response = await client.get(f"/api/v1/jobs/{job.id}/result?wait=5", headers=headers)
+    await finisher
+
+    assert response.status_code == 200
+    assert response.json()["result"]["items"][0]["text"] == "Done"
+
+
+@pytest.mark.asyncio
+async def test_active_job_reads_are_served_from_status_cache(
+    client, db_session, auth_settings, telegram_init_data, monkeypatch
+):
+    headers = {"X-Telegram-Init-Data": telegram_init_data({"id": 9595})}
+    await client.get("/api/v1/credits/balance", headers=headers)
+    job = await _job(db_session, "9595")
+    await tasks._claim_job(db_session, job)
+    assert (await get_cached_job_status(job.id))["status"] == "processing"
+    monkeypatch.setattr(
+        jobs_routes,
+        "async_session",
+        async_sessionmaker(db_session.bind, expire_on_commit=False, class_=AsyncSession),
+    )
+
+    async def no_db_read(self, job_id):
+        raise AssertionError("active job read hit the database")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(JobRepository, "get_job", no_db_read)
+        detail = await client.get(f"/api/v1/jobs/{job.id}", headers=headers)
+        result = await client.get(f"/api/v1/jobs/{job.id}/result", headers=headers)
+    assert detail.status_code == 200
+    assert detail.json()["status"] == "processing"
+    assert result.status_code == 202
+
+    other = {"X-Telegram-Init-Data": telegram_init_data({"id": 9596})}
+    assert (await client.get(f"/api/v1/jobs/{job.id}", headers=other)).status_code == 404
+
+    await tasks.complete_job(db_session, job, {"status": "success", "result": "Cached"})
+    detail = await client.get(f"/api/v1/jobs/{job.id}", headers=headers)
+    assert detail.json()["result"]["items"][0]["text"] == "Cached"
@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+
+import httpx
+import pytest
+
+from app.core import job_files
+from app.core.settings import get_settings
+
+PAYLOAD = b"x" * (200 * 1024)
+
+
+def _client() -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"Content-Type": "video/mp4"}, content=PAYLOAD)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture()
+def storage(monkeypatch, tmp_path):
+    monkeypatch.setattr(get_settings(), "files_storage_path", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_stream_download_records_hash_and_size(storage):
+    async with _client() as client:
+        stored = await job_files.stream_download(client, "https://cdn.example/out.mp4", storage)
+
+    assert stored["sha256"] == hashlib.sha256(PAYLOAD).hexdigest()
+    assert stored["size_bytes"] == len(PAYLOAD)
+    assert stored["filename"].endswith(".mp4")
+    assert (storage / stored["filename"]).read_bytes() == PAYLOAD
+    assert not list(storage.glob(".*.part"))
+
+
+@pytest.mark.asyncio
+async def test_stream_download_enforces_max_size(storage):
+    async with _client() as client:
+        with pytest.raises(job_files.DownloadTooLargeError):
+            await job_files.stream_download(
+                client, "https://cdn.example/out.mp4", storage, max_bytes=1024
+            )
+
+    assert list(storage.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_persist_result_files_downloads_concurrently_in_order(storage, monkeypatch):
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # Later items finish first so completion order differs from item order.
+        await asyncio.sleep(0.01 * (5 - int(request.url.path.strip("/out.png"))))
+        in_flight -= 1
+        return httpx.Response(200, headers={"Content-Type": "image/png"}, content=request.url.path.encode())
+
+    monkeypatch.setattr(get_settings(), "files_download_concurrency_per_job", 2)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        monkeypatch.setattr(job_files, "get_download_client", lambda: client)
+        result = {
+            "type": "image",
+            "items": [{"kind": "file", "url": f"https://cdn.example/{i}/out.png"} for i in range(5)],
+        }
+        _, stored_files = await job_files.persist_result_files("job-1", result)
+
+    assert peak == 2
+    assert [item["url"] for item in result["items"]] == [item["url"] for item in stored_files]
+    for index, stored in enumerate(stored_files):
+        assert (storage / stored["path"]).read_bytes() == f"/{index}/out.png".encode()
+        assert stored["download_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_identical_results_share_one_blob(storage, monkeypatch):
+    async with _client() as client:
+        monkeypatch.setattr(job_files, "get_download_client", lambda: client)
+        stored = []
+        for job_id in ("job-a", "job-b"):
+            result = {"type": "video", "items": [{"kind": "file", "url": "https://cdn.example/out.mp4"}]}
+            _, files = await job_files.persist_result_files(job_id, result)
+            job_files.discard_downloaded_files(job_id)
+            stored.append(files[0])
+
+    sha256 = hashlib.sha256(PAYLOAD).hexdigest()
+    assert stored[0]["filename"] == stored[1]["filename"] == f"{sha256}.mp4"
+    blob = job_files.blob_path(sha256, ".mp4")
+    assert blob.stat().st_nlink == 3
+    assert (storage / stored[0]["path"]).stat().st_ino == blob.stat().st_ino
+
+    (storage / stored[0]["path"]).unlink()
+    assert job_files.release_blob(sha256, ".mp4") == 0
+    (storage / stored[1]["path"]).unlink()
+    assert job_files.release_blob(sha256, ".mp4") == len(PAYLOAD)
+    assert not blob.exists()
+
+
+@pytest.mark.asyncio
+async def test_failed_download_is_reported_without_retrying(storage, monkeypatch):
+    requests: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(str(request.url))
+        return httpx.Response(502)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        monkeypatch.setattr(job_files, "get_download_client", lambda: client)
+        result = {"type": "video", "items": [{"kind": "file", "url": "https://cdn.example/out.mp4"}]}
+        with pytest.raises(job_files.ResultDownloadError):
+            await job_files.persist_result_files("job-3", result)
+
+    assert requests == ["https://cdn.example/out.mp4"]
+
+
+@pytest.mark.asyncio
+async def test_job_retry_downloads_only_the_missing_files(storage, monkeypatch):
+    requests: list[str] = []
+    broken = {"https://cdn.example/b.mp4"}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        requests.append(url)
+        if url in broken:
+            await asyncio.sleep(0.05)
+            return httpx.Response(502)
+        return httpx.Response(200, headers={"Content-Type": "video/mp4"}, content=url.encode())
+
+    def result():
+        return {
+            "type": "video",
+            "items": [
+                {"kind": "file", "url": "https://cdn.example/a.mp4"},
+                {"kind": "file", "url": "https://cdn.example/b.mp4"},
+            ],
+        }
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        monkeypatch.setattr(job_files, "get_download_client", lambda: client)
+        staging_dir = job_files.create_staging_dir("job-retry")
+        with pytest.raises(job_files.ResultDownloadError):
+            await job_files.persist_result_files("job-retry", result(), staging_dir=staging_dir)
+        job_files.discard_staged_files(staging_dir)
+
+        broken.clear()
+        requests.clear()
+        staging_dir = job_files.create_staging_dir("job-retry")
+        _, files = await job_files.persist_result_files("job-retry", result(), staging_dir=staging_dir)
+        job_files.publish_staged_files(staging_dir)
+        job_files.discard_staged_files(staging_dir)
+
+    assert requests == ["https://cdn.example/b.mp4"]
+    assert [(storage / item["path"]).read_bytes() for item in files] == [
+        b"https://cdn.example/a.mp4",
+        b"https://cdn.example/b.mp4",
+    ]
+
+    job_files.discard_downloaded_files("job-retry")
+    # Only the blob store and the published job file still link each blob.
+    assert [(storage / item["path"]).stat().st_nlink for item in files] == [2, 2]
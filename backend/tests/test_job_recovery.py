@@ -0,0 +1,149 @@
+import datetime as dt
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.models.job import Job
+from app.core.repositories.users import UserRepository
+from app.core.settings import get_settings
+from app.providers.genapi.poller import GenApiPoller
+from app.workers import tasks
+from app.workers.heartbeat import JobHeartbeat
+
+
+class RecordingQueue:
+    def __init__(self):
+        self.enqueued: list[tuple] = []
+
+    def enqueue(self, func, *args, **kwargs):
+        self.enqueued.append((func, args))
+
+
+class ResumedGenApi:
+    def __init__(self):
+        self.polls: list[str] = []
+
+    async def submit_network(self, network_id: str, params: dict, files=None) -> dict:
+        raise AssertionError("a resumed job must not be submitted again")
+
+    async def poll(self, request_id: str) -> dict:
+        self.polls.append(request_id)
+        return {"status": "success", "result": "resumed", "request_id": request_id}
+
+
+@pytest.fixture()
+def worker_session(monkeypatch, test_engine):
+    session_factory = async_sessionmaker(test_engine, expire_on_commit=False, class_=AsyncSession)
+    monkeypatch.setattr(tasks, "async_session", session_factory)
+    return session_factory
+
+
+async def _processing_job(db_session, platform_user_id: str, heartbeat_age_s: float, **columns):
+    user, _ = await UserRepository(db_session).get_or_create_from_telegram({"id": platform_user_id})
+    heartbeat_at = dt.datetime.utcnow() - dt.timedelta(seconds=heartbeat_age_s)
+    job = Job(
+        user_id=user.id,
+        type="text",
+        status="processing",
+        payload={},
+        cost=0,
+        dispatched_at=heartbeat_at,
+        started_at=heartbeat_at,
+        heartbeat_at=heartbeat_at,
+        **columns,
+    )
+    db_session.add(job)
+    await db_session.commit()
+    return job
+
+
+@pytest.mark.asyncio
+async def test_stalled_jobs_are_resumed_or_requeued(db_session, worker_session, monkeypatch):
+    stalled_s = get_settings().jobs_stalled_after_seconds
+    submitted = await _processing_job(
+        db_session,
+        "recovery-1",
+        stalled_s + 60,
+        provider_request_id="req-1",
+        provider_submitted_at=dt.datetime.utcnow() - dt.timedelta(seconds=stalled_s + 90),
+    )
+    unsubmitted = await _processing_job(db_session, "recovery-2", stalled_s + 60)
+    alive = await _processing_job(db_session, "recovery-3", 5, provider_request_id="req-3")
+    queue = RecordingQueue()
+    monkeypatch.setattr(tasks, "_redis_queues", lambda: lambda name: queue)
+
+    result = await tasks._resume_stalled_jobs_async()
+
+    assert result == {"resumed": 1, "requeued": 1}
+    assert queue.enqueued == [(tasks.resume_job, (str(submitted.id),))]
+    await db_session.refresh(unsubmitted)
+    assert unsubmitted.status == "queued"
+    assert unsubmitted.dispatched_at is None
+    assert unsubmitted.started_at is None
+    await db_session.refresh(alive)
+    assert alive.status == "processing"
+
+    # The resumed job now carries a fresh heartbeat, so the next sweep leaves it alone.
+    assert await tasks._resume_stalled_jobs_async() == {"resumed": 0, "requeued": 0}
+
+
+@pytest.mark.asyncio
+async def test_resumed_job_polls_its_existing_request(db_session, worker_session, monkeypatch):
+    job = await _processing_job(
+        db_session,
+        "recovery-4",
+        600,
+        provider_request_id="req-4",
+        provider_submitted_at=dt.datetime.utcnow() - dt.timedelta(seconds=30),
+    )
+    provider = ResumedGenApi()
+    poller = GenApiPoller(client_factory=lambda: provider, tick_s=0.01, max_rps=1000)
+    monkeypatch.setattr(tasks, "get_genapi_client", lambda: provider)
+    monkeypatch.setattr(tasks, "get_genapi_poller", lambda: poller)
+
+    await tasks._resume_job_async(str(job.id))
+
+    assert provider.polls == ["req-4"]
+    await db_session.refresh(job)
+    assert job.status == "done"
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_marks_tracked_jobs_alive(db_session, worker_session):
+    job = await _processing_job(db_session, "recovery-5", 600)
+    updated_at = job.updated_at
+    heartbeat = JobHeartbeat(worker_session, interval_s=60)
+
+    async with heartbeat.track(job.id):
+        await heartbeat.beat()
+
+    await db_session.refresh(job)
+    age_s = (dt.datetime.utcnow() - job.heartbeat_at.replace(tzinfo=None)).total_seconds()
+    assert age_s < 5
+    assert job.updated_at == updated_at
+
+
+@pytest.mark.asyncio
+async def test_provider_duration_is_measured_from_submission(
+    db_session, worker_session, duration_stats_stub, monkeypatch
+):
+    job = await _processing_job(
+        db_session,
+        "recovery-6",
+        600,
+        provider_request_id="req-6",
+        provider_submitted_at=dt.datetime.utcnow() - dt.timedelta(seconds=20),
+    )
+    recorded: list[tuple[str, float]] = []
+
+    async def record(network_id, duration_s):
+        recorded.append((network_id, duration_s))
+
+    monkeypatch.setattr(duration_stats_stub, "record", record)
+
+    await tasks.complete_job(db_session, job, {"status": "success", "result": "ok"})
+    # A duplicate completion, e.g. the safety poll after the callback, adds no sample.
+    await tasks.complete_job(db_session, job, {"status": "success", "result": "ok"})
+
+    assert len(recorded) == 1
+    assert 20 <= recorded[0][1] < 60
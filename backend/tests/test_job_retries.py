@@ -0,0 +1,174 @@
+import datetime as dt
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.models.job import Job
+from app.core.repositories.users import UserRepository
+from app.core.settings import get_settings
+from app.providers.genapi.errors import (
+    GenApiRateLimitedError,
+    GenApiRetryableError,
+    GenApiTimeoutError,
+)
+from app.providers.genapi.poller import GenApiPoller
+from app.workers import tasks
+
+
+class FlakyGenApi:
+    def __init__(self, submit_error: Exception | None = None, poll_error: Exception | None = None):
+        self.submit_error = submit_error
+        self.poll_error = poll_error
+        self.submissions = 0
+
+    async def submit_network(self, network_id: str, params: dict, files=None) -> dict:
+        self.submissions += 1
+        if self.submit_error:
+            raise self.submit_error
+        return {"request_id": "req-flaky", "status": "processing"}
+
+    async def poll(self, request_id: str) -> dict:
+        raise self.poll_error
+
+
+@pytest.fixture()
+def scheduled(monkeypatch, test_engine):
+    calls: list[tuple] = []
+    monkeypatch.setattr(
+        tasks,
+        "async_session",
+        async_sessionmaker(test_engine, expire_on_commit=False, class_=AsyncSession),
+    )
+    monkeypatch.setattr(
+        tasks,
+        "enqueue_in",
+        lambda delay, func, *args, **kwargs: calls.append((delay, func, args)) or True,
+    )
+    return calls
+
+
+async def _queued_job(db_session, platform_user_id: str, attempts: int = 0) -> Job:
+    user, _ = await UserRepository(db_session).get_or_create_from_telegram({"id": platform_user_id})
+    job = Job(
+        user_id=user.id,
+        type="text",
+        status="queued",
+        payload={"network_id": "gpt", "params": {"prompt": "hi"}},
+        cost=0,
+        attempts=attempts,
+    )
+    db_session.add(job)
+    await db_session.commit()
+    return job
+
+
+def test_retry_backoff_grows_with_jitter_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(get_settings(), "jobs_retry_base_seconds", 2.0)
+    monkeypatch.setattr(get_settings(), "jobs_retry_max_seconds", 60.0)
+
+    assert all(1.0 <= tasks.retry_backoff_seconds(1) <= 2.0 for _ in range(20))
+    assert all(4.0 <= tasks.retry_backoff_seconds(3) <= 8.0 for _ in range(20))
+    assert all(30.0 <= tasks.retry_backoff_seconds(12) <= 60.0 for _ in range(20))
+    assert len({tasks.retry_backoff_seconds(3) for _ in range(20)}) > 1
+
+
+@pytest.mark.asyncio
+async def test_failed_submit_is_rescheduled_then_failed(db_session, scheduled, monkeypatch):
+    provider = FlakyGenApi(submit_error=GenApiRetryableError("retryable_status"))
+    monkeypatch.setattr(tasks, "get_genapi_client", lambda: provider)
+    job = await _queued_job(db_session, "retry-1")
+
+    started = dt.datetime.utcnow()
+    await tasks._run_job_async(str(job.id))
+
+    assert (dt.datetime.utcnow() - started).total_seconds() < 1
+    assert [(func, args) for _, func, args in scheduled] == [(tasks.run_job, (str(job.id),))]
+    await db_session.refresh(job)
+    assert job.status == "queued"
+    assert job.attempts == 1
+
+    job.attempts = get_settings().jobs_retry_max_attempts - 1
+    await db_session.commit()
+    with pytest.raises(GenApiRetryableError):
+        await tasks._run_job_async(str(job.id))
+    await db_session.refresh(job)
+    assert job.status == "error"
+    assert provider.submissions == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_poll_resumes_the_submitted_request(db_session, scheduled, monkeypatch):
+    provider = FlakyGenApi(poll_error=GenApiRetryableError("network_error"))
+    poller = GenApiPoller(client_factory=lambda: provider, tick_s=0.01, max_rps=1000, max_errors=1)
+    monkeypatch.setattr(tasks, "get_genapi_client", lambda: provider)
+    monkeypatch.setattr(tasks, "get_genapi_poller", lambda: poller)
+    job = await _queued_job(db_session, "retry-2")
+
+    await tasks._run_job_async(str(job.id))
+
+    assert provider.submissions == 1
+    assert [(func, args) for _, func, args in scheduled] == [(tasks.resume_job, (str(job.id),))]
+    await db_session.refresh(job)
+    assert job.status == "processing"
+    assert job.provider_request_id == "req-flaky"
+    assert job.attempts == 1
+    assert job.heartbeat_at.replace(tzinfo=None) > dt.datetime.utcnow()
+
+
+class FinishedGenApi:
+    def __init__(self):
+        self.polls = 0
+
+    async def poll(self, request_id: str) -> dict:
+        self.polls += 1
+        return {"status": "success", "result": "late but done", "request_id": request_id}
+
+
+@pytest.mark.asyncio
+async def test_download_retry_after_the_deadline_skips_the_polling_window(
+    db_session, scheduled, monkeypatch
+):
+    provider = FinishedGenApi()
+    poller = GenApiPoller(client_factory=lambda: provider, tick_s=0.01, max_rps=1000)
+    monkeypatch.setattr(tasks, "get_genapi_client", lambda: provider)
+    monkeypatch.setattr(tasks, "get_genapi_poller", lambda: poller)
+    long_ago = dt.datetime.utcnow() - dt.timedelta(hours=2)
+    job = await _queued_job(db_session, "retry-3", attempts=1)
+    job.status = "processing"
+    job.started_at = long_ago
+    job.provider_request_id = "req-done"
+    job.provider_submitted_at = long_ago
+    job.provider_status = "success"
+    await db_session.commit()
+
+    await tasks._resume_job_async(str(job.id))
+
+    assert provider.polls == 1
+    await db_session.refresh(job)
+    assert job.status == "done"
+
+
+@pytest.mark.asyncio
+async def test_poll_timeout_is_final(db_session, scheduled):
+    job = await _queued_job(db_session, "retry-4")
+
+    assert not await tasks._retry_later(db_session, job, "gpt", GenApiTimeoutError())
+    assert tasks._human_error_message(GenApiTimeoutError()) == "Generation timed out."
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_polls_keep_the_submitted_request(db_session, scheduled, monkeypatch):
+    provider = FlakyGenApi(poll_error=GenApiRateLimitedError(retry_after_s=30))
+    poller = GenApiPoller(client_factory=lambda: provider, tick_s=0.01, max_rps=1000, max_errors=1)
+    monkeypatch.setattr(tasks, "get_genapi_client", lambda: provider)
+    monkeypatch.setattr(tasks, "get_genapi_poller", lambda: poller)
+    job = await _queued_job(db_session, "retry-5")
+
+    await tasks._run_job_async(str(job.id))
+
+    assert provider.submissions == 1
+    assert [(func, args) for _, func, args in scheduled] == [(tasks.resume_job, (str(job.id),))]
+    assert scheduled[0][0] >= 30
+    await db_session.refresh(job)
+    assert job.status == "processing"
+    assert job.provider_request_id == "req-flaky"
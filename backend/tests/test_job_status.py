@@ -0,0 +1,57 @@
+import datetime as dt
+
+import pytest
+
+from app.api.v1.deps import get_current_user
+from app.core.models.job import Job
+from app.core.repositories.users import UserRepository
+from app.main import app
+
+
+@pytest.fixture()
+async def owner(db_session):
+    user, _ = await UserRepository(db_session).get_or_create_from_telegram({"id": "status-1"})
+    await db_session.commit()
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield user
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.asyncio
+async def test_bulk_status_is_owner_scoped_and_filters_by_since(client, db_session, owner):
+    stranger, _ = await UserRepository(db_session).get_or_create_from_telegram({"id": "status-2"})
+    old = dt.datetime(2024, 1, 1)
+    done = Job(
+        user_id=owner.id,
+        type="image",
+        status="done",
+        payload={},
+        result={"type": "image", "items": [{"kind": "file", "url": "/api/v1/files/x/a.png"}]},
+        updated_at=old,
+    )
+    running = Job(user_id=owner.id, type="video", status="processing", payload={})
+    foreign = Job(user_id=stranger.id, type="text", status="queued", payload={})
+    db_session.add_all([done, running, foreign])
+    await db_session.commit()
+
+    ids = ",".join(str(job.id) for job in (done, running, foreign))
+    response = await client.get(f"/api/v1/jobs/status?ids={ids}")
+    assert response.status_code == 200
+    items = {item["id"]: item for item in response.json()["items"]}
+    assert set(items) == {str(done.id), str(running.id)}
+    assert items[str(done.id)]["result_summary"] == {
+        "type": "image",
+        "items": 1,
+        "preview_url": "/api/v1/files/x/a.png",
+    }
+
+    response = await client.get(
+        "/api/v1/jobs/status", params={"ids": ids, "since": "2024-06-01T00:00:00"}
+    )
+    assert [item["id"] for item in response.json()["items"]] == [str(running.id)]
+
+
+@pytest.mark.asyncio
+async def test_bulk_status_rejects_bad_ids(client, owner):
+    response = await client.get("/api/v1/jobs/status?ids=nope")
+    assert response.status_code == 400
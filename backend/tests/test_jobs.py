@@ -1,6 +1,6 @@
 import pytest
 
-from app.api.v1.deps import get_rq_queue
+from app.api.v1.deps import get_rq_queues
 from app.auth.tokens import create_access_token
 from app.core.repositories.credits import CreditRepository
 from app.core.repositories.users import UserRepository
@@ -26,9 +26,9 @@ async def test_create_job(client, db_session):
     queue = DummyQueue()
 
     def override_queue():
-        return queue
+        return lambda name: queue
 
-    client.app.dependency_overrides[get_rq_queue] = override_queue
+    client.app.dependency_overrides[get_rq_queues] = override_queue
 
     response = await client.post(
         "/api/v1/jobs",
@@ -44,4 +44,4 @@ async def test_create_job(client, db_session):
     assert data["status"] == "queued"
     assert queue.enqueued
 
-    client.app.dependency_overrides.pop(get_rq_queue, None)
+    client.app.dependency_overrides.pop(get_rq_queues, None)
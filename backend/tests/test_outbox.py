@@ -0,0 +1,101 @@
+import datetime as dt
+import time
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.models.job import Job
+from app.core.repositories.jobs import JobRepository
+from app.core.repositories.users import UserRepository
+from app.core.settings import get_settings
+from app.workers import tasks
+
+
+class SlowQueue:
+    def __init__(self, delay_s: float = 0.0):
+        self.delay_s = delay_s
+        self.enqueued: list[tuple] = []
+
+    def enqueue(self, func, *args, **kwargs):
+        time.sleep(self.delay_s)
+        self.enqueued.append((func, args))
+
+
+async def _queued_job(db_session, platform_user_id: str, created_at=None) -> Job:
+    user, _ = await UserRepository(db_session).get_or_create_from_telegram({"id": platform_user_id})
+    job = Job(
+        user_id=user.id, type="text", status="queued", payload={}, cost=0, created_at=created_at
+    )
+    db_session.add(job)
+    await db_session.commit()
+    return job
+
+
+@pytest.mark.asyncio
+async def test_slow_enqueue_falls_back_to_outbox(db_session, test_engine, monkeypatch):
+    monkeypatch.setattr(get_settings(), "jobs_enqueue_timeout_seconds", 0.01)
+    monkeypatch.setattr(get_settings(), "jobs_outbox_grace_seconds", 0)
+    job = await _queued_job(db_session, "outbox-1")
+
+    slow_queue = SlowQueue(delay_s=0.2)
+    assert await tasks.enqueue_job(lambda name: slow_queue, db_session, job) is False
+    assert job.dispatched_at is None
+
+    queue = SlowQueue()
+    monkeypatch.setattr(tasks, "Queue", lambda *args, **kwargs: queue)
+    monkeypatch.setattr(tasks, "get_redis", lambda: None)
+    monkeypatch.setattr(
+        tasks,
+        "async_session",
+        async_sessionmaker(test_engine, expire_on_commit=False, class_=AsyncSession),
+    )
+    result = await tasks._dispatch_pending_jobs_async()
+
+    assert result["dispatched"] >= 1
+    assert (tasks.run_job, (str(job.id),)) in queue.enqueued
+    await db_session.refresh(job)
+    assert job.dispatched_at is not None
+
+
+@pytest.mark.asyncio
+async def test_job_is_claimed_only_once(db_session):
+    job = await _queued_job(db_session, "outbox-2")
+
+    assert await tasks._claim_job(db_session, job) is True
+    assert job.status == "processing"
+    assert await tasks._claim_job(db_session, job) is False
+
+
+@pytest.mark.asyncio
+async def test_dispatch_is_fair_across_users_and_capped(db_session, test_engine, monkeypatch):
+    monkeypatch.setattr(get_settings(), "jobs_max_active_per_user", 2)
+    monkeypatch.setattr(get_settings(), "jobs_outbox_grace_seconds", 0)
+    start = dt.datetime.utcnow() - dt.timedelta(minutes=5)
+    burst = [
+        await _queued_job(db_session, "fair-1", created_at=start + dt.timedelta(seconds=index))
+        for index in range(5)
+    ]
+    late = await _queued_job(db_session, "fair-2", created_at=start + dt.timedelta(seconds=10))
+    queue = SlowQueue()
+    monkeypatch.setattr(tasks, "Queue", lambda *args, **kwargs: queue)
+    monkeypatch.setattr(tasks, "get_redis", lambda: None)
+    monkeypatch.setattr(
+        tasks,
+        "async_session",
+        async_sessionmaker(test_engine, expire_on_commit=False, class_=AsyncSession),
+    )
+
+    await tasks._dispatch_pending_jobs_async()
+
+    enqueued = [args[0] for _, args in queue.enqueued]
+    assert str(late.id) in enqueued
+    burst_ids = [str(job.id) for job in burst]
+    assert [job_id for job_id in enqueued if job_id in burst_ids] == burst_ids[:2]
+    assert await JobRepository(db_session).own_jobs_ahead(burst[3]) == 3
+
+    await tasks._claim_job(db_session, burst[0])
+    await tasks.complete_job(db_session, burst[0], {"status": "success", "result": "ok"})
+
+    assert queue.enqueued[-1][1] == (str(burst[2].id),)
+    await db_session.refresh(burst[3])
+    assert burst[3].dispatched_at is None
@@ -0,0 +1,52 @@
+import datetime as dt
+
+import pytest
+
+from app.core.pagination import InvalidCursorError, decode_cursor
+from app.core.repositories.credits import CreditRepository
+from app.core.repositories.jobs import JobRepository
+from app.core.repositories.users import UserRepository
+
+
+@pytest.mark.asyncio
+async def test_job_listing_keyset_pages_match_offset_pages(db_session):
+    user, _ = await UserRepository(db_session).get_or_create_from_telegram({"id": "page-1"})
+    repo = JobRepository(db_session)
+    created_at = dt.datetime(2024, 12, 1)
+    for index in range(5):
+        job = await repo.create_job(user.id, "text", {"index": index}, cost=0)
+        # Two jobs share each timestamp so the id tiebreaker is exercised.
+        job.created_at = created_at + dt.timedelta(seconds=index // 2)
+    await db_session.commit()
+
+    by_offset, total, _ = await repo.list_jobs(user.id, limit=5)
+    assert total == 5
+
+    seen = []
+    cursor = None
+    while True:
+        items, total, cursor = await repo.list_jobs(user.id, limit=2, cursor=cursor)
+        seen.extend(items)
+        if cursor is None:
+            break
+    assert [job.id for job in seen] == [job.id for job in by_offset]
+    assert total == 5
+
+
+@pytest.mark.asyncio
+async def test_ledger_total_comes_from_counter(db_session):
+    user, _ = await UserRepository(db_session).get_or_create_from_telegram({"id": "page-2"})
+    repo = CreditRepository(db_session)
+    for delta in (10, 20, 30):
+        await repo.create_tx(user.id, delta=delta, reason="topup_mock")
+    await db_session.commit()
+
+    items, total, next_cursor = await repo.list_tx(user.id, limit=2)
+    assert total == 3
+    assert len(items) == 2
+    assert next_cursor is not None
+
+
+def test_decode_cursor_rejects_garbage():
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor")
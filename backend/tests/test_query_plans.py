@@ -0,0 +1,68 @@
+import datetime as dt
+import re
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from app.core.models.job import Job
+from app.core.pagination import encode_cursor
+from app.core.repositories.credits import CreditRepository
+from app.core.repositories.jobs import JobRepository
+from app.core.repositories.users import UserRepository
+from app.workers.tasks import _expired_jobs_stmt, _expired_uploads_stmt
+
+HOT_TABLES = ("jobs", "credit_ledger", "uploads")
+FULL_SCAN = re.compile(rf"^SCAN ({'|'.join(HOT_TABLES)})\b")
+
+
+@pytest.fixture()
+def captured_queries(test_engine):
+    queries: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            queries.append((statement, parameters))
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", capture)
+    yield queries
+    event.remove(test_engine.sync_engine, "before_cursor_execute", capture)
+
+
+async def _explain(db_session, statement: str, parameters) -> list[str]:
+    connection = await db_session.connection()
+    rows = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [row[-1] for row in rows]
+
+
+@pytest.mark.asyncio
+async def test_hot_queries_use_indexes(db_session, captured_queries):
+    user, _ = await UserRepository(db_session).get_or_create_from_telegram({"id": "plans-1"})
+    await db_session.commit()
+    jobs = JobRepository(db_session)
+    credits = CreditRepository(db_session)
+    now = dt.datetime.utcnow()
+
+    captured_queries.clear()
+    _, _, cursor = await jobs.list_jobs(user.id, limit=1)
+    await jobs.list_jobs(user.id, limit=1, cursor=cursor or _cursor_for(now))
+    await credits.list_tx(user.id, limit=1)
+    await credits.list_tx(user.id, limit=1, cursor=_cursor_for(now))
+    await credits.has_job_reason(uuid.uuid4(), "job_refund")
+    await db_session.execute(_expired_uploads_stmt(now))
+    await db_session.execute(_expired_jobs_stmt(now))
+    await jobs.count_dispatched_active(user.id)
+    await jobs.list_waiting(user.id, limit=3)
+    await jobs.own_jobs_ahead(Job(user_id=user.id, created_at=now))
+    await jobs.list_stalled(now, limit=10)
+    queries = list(captured_queries)
+
+    assert len(queries) >= 11
+    for statement, parameters in queries:
+        plan = await _explain(db_session, statement, parameters)
+        assert not [step for step in plan if FULL_SCAN.match(step)], (statement, plan)
+        assert not [step for step in plan if "TEMP B-TREE" in step], (statement, plan)
+
+
+def _cursor_for(created_at: dt.datetime) -> str:
+    return encode_cursor(created_at, uuid.uuid4())
@@ -0,0 +1,182 @@
+import asyncio
+
+import pytest
+
+from pydantic import ValidationError
+
+from app.core.settings import Settings
+from app.workers import executor as executor_module
+from app.workers import rq as rq_module
+from app.workers import tasks
+from app.workers.executor import ConcurrentJobExecutor
+from app.workers.rq import parse_queue_spec, queue_slot_reserves
+
+
+def test_jobs_are_routed_by_preset_timeout():
+    assert tasks.resolve_job_queue("text", {"network_id": "gpt-5-2"}) == ("pelicanone-fast", 420)
+    assert tasks.resolve_job_queue("image", {"network_id": "gpt-image-1-5"}) == (
+        "pelicanone-media",
+        900,
+    )
+    assert tasks.resolve_job_queue("upscale", {"network_id": "seedvr-video"}) == (
+        "pelicanone-long",
+        2100,
+    )
+    assert tasks.resolve_job_queue("audio", {})[0] == "pelicanone-long"
+
+
+def test_queue_spec_weights_reserve_slots_for_fast():
+    spec = parse_queue_spec("fast=4, media=2,long=1,default")
+
+    assert [name for name, _ in spec] == [
+        "pelicanone-fast",
+        "pelicanone-media",
+        "pelicanone-long",
+        "pelicanone",
+    ]
+    assert queue_slot_reserves(spec, 32) == {"pelicanone-fast": 16}
+    assert queue_slot_reserves(spec, 1) == {}
+    assert queue_slot_reserves(parse_queue_spec("media,long"), 8) == {}
+
+
+def test_stock_worker_ticks_rq_scheduler(monkeypatch):
+    started: list = []
+    worked: list[bool] = []
+
+    class StockWorker:
+        def __init__(self, queues, connection):
+            self.queues = queues
+            self.connection = connection
+            workers.append(self)
+
+        def work(self, with_scheduler=False):
+            worked.append(with_scheduler)
+
+    scheduler = object()
+    blocking_conn = object()
+    workers: list = []
+    monkeypatch.setattr(rq_module, "get_redis", lambda: object())
+    monkeypatch.setattr(rq_module, "get_blocking_redis", lambda: blocking_conn)
+    monkeypatch.setattr(rq_module, "_schedule_periodic", lambda *args: None)
+    monkeypatch.setattr(rq_module, "get_scheduler", lambda name: scheduler)
+    monkeypatch.setattr(rq_module, "_start_scheduler_thread", started.append)
+    monkeypatch.setattr(rq_module, "Worker", StockWorker)
+
+    rq_module.main(["--concurrency", "1", "--queues", "fast"])
+
+    assert started == [scheduler]
+    assert worked == [True]
+    assert workers[0].connection is blocking_conn
+
+
+def test_worker_socket_timeout_must_outlast_the_dequeue_timeout():
+    with pytest.raises(ValidationError):
+        Settings(WORKER_DEQUEUE_TIMEOUT_SECONDS=5, WORKER_REDIS_SOCKET_TIMEOUT_SECONDS=5)
+
+    settings = Settings(WORKER_DEQUEUE_TIMEOUT_SECONDS=5, WORKER_REDIS_SOCKET_TIMEOUT_SECONDS=15)
+    assert settings.worker_redis_socket_timeout_seconds > settings.worker_dequeue_timeout_seconds
+
+
+class FakeQueue:
+    def __init__(self, name: str, job_ids: list[str]):
+        self.name = name
+        self.job_ids = list(job_ids)
+
+
+class FakeRQJob:
+    func_name = "app.workers.tasks.run_job"
+    kwargs = {}
+    timeout = None
+
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.args = (job_id,)
+
+
+class QueueExecutor(ConcurrentJobExecutor):
+    def _dequeue(self, queues):
+        for queue in queues:
+            if queue.job_ids:
+                return FakeRQJob(queue.job_ids.pop(0)), queue
+        if not any(queue.job_ids for queue in self.queues):
+            self.request_stop()
+        return None
+
+    def _mark_started(self, job):
+        return None
+
+    def _mark_finished(self, job, queue):
+        return None
+
+    def _mark_failed(self, job, queue, exc_string):
+        return None
+
+
+@pytest.mark.asyncio
+async def test_reserved_slots_stay_free_for_fast_jobs(monkeypatch):
+    started: list[str] = []
+    release_long = asyncio.Event()
+
+    async def fake_run_job(job_id: str):
+        started.append(job_id)
+        if job_id.startswith("video"):
+            await release_long.wait()
+        return {}
+
+    async def noop():
+        return None
+
+    monkeypatch.setattr(executor_module, "get_async_entrypoint", lambda name: fake_run_job)
+    monkeypatch.setattr(executor_module, "close_genapi_client", noop)
+
+    long_queue = FakeQueue("pelicanone-long", [f"video-{index}" for index in range(4)])
+    fast_queue = FakeQueue("pelicanone-fast", [])
+    executor = QueueExecutor(
+        [fast_queue, long_queue],
+        connection=None,
+        concurrency=3,
+        dequeue_timeout=0,
+        reserved_slots={"pelicanone-fast": 2},
+    )
+    runner = asyncio.create_task(executor.run())
+    await asyncio.sleep(0.05)
+    fast_queue.job_ids.extend(["text-1", "text-2"])
+    await asyncio.sleep(0.05)
+
+    assert started == ["video-0", "text-1", "text-2"]
+    release_long.set()
+    await asyncio.wait_for(runner, 5)
+    assert sorted(started) == ["text-1", "text-2"] + [f"video-{index}" for index in range(4)]
+
+
+@pytest.mark.asyncio
+async def test_only_busy_queue_borrows_idle_slots(monkeypatch):
+    running: list[str] = []
+    peak: list[int] = []
+
+    async def fake_run_job(job_id: str):
+        running.append(job_id)
+        peak.append(len(running))
+        await asyncio.sleep(0.02)
+        running.remove(job_id)
+        return {}
+
+    async def noop():
+        return None
+
+    monkeypatch.setattr(executor_module, "get_async_entrypoint", lambda name: fake_run_job)
+    monkeypatch.setattr(executor_module, "close_genapi_client", noop)
+
+    fast_queue = FakeQueue("pelicanone-fast", [])
+    media_queue = FakeQueue("pelicanone-media", [f"image-{index}" for index in range(6)])
+    long_queue = FakeQueue("pelicanone-long", [])
+    executor = QueueExecutor(
+        [fast_queue, media_queue, long_queue],
+        connection=None,
+        concurrency=4,
+        dequeue_timeout=0,
+        reserved_slots={"pelicanone-fast": 1},
+    )
+    await asyncio.wait_for(executor.run(), 5)
+
+    assert max(peak) == 3
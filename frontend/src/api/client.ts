@@ -3,6 +3,12 @@ import { getTelegramInitData } from "../adapters/telegram";
 export const API_BASE = "/api/v1";
 
 const TELEGRAM_INITDATA_HEADER = "X-Telegram-Init-Data";
+const SESSION_REFRESH_MARGIN_MS = 60_000;
+
+type SessionToken = { token: string; expiresAt: number };
+
+let sessionToken: SessionToken | null = null;
+let pendingSession: Promise<SessionToken | null> | null = null;
 
 function hasInitDataValue(initData: string | null | undefined) {
   return Boolean(initData && initData.trim().length > 0);
@@ -17,11 +23,56 @@ export function getTelegramInitDataHeader(): string | null {
   return hasInitDataValue(initData) ? (initData as string) : null;
 }
 
+async function exchangeInitData(initData: string): Promise<SessionToken | null> {
+  try {
+    const response = await fetch(`${API_BASE}/auth/telegram`, {
+      method: "POST",
+      headers: { [TELEGRAM_INITDATA_HEADER]: initData }
+    });
+    if (!response.ok) {
+      return null;
+    }
+    const payload = (await response.json()) as { access_token: string; expires_in: number };
+    return {
+      token: payload.access_token,
+      expiresAt: Date.now() + payload.expires_in * 1000 - SESSION_REFRESH_MARGIN_MS
+    };
+  } catch {
+    return null;
+  }
+}
+
+// Trade Telegram initData for a short-lived session token so the backend can
+// skip the initData signature check and user lookup on every request.
+export async function ensureSessionToken(): Promise<void> {
+  if (sessionToken && sessionToken.expiresAt > Date.now()) {
+    return;
+  }
+  const initData = getTelegramInitDataHeader();
+  if (!initData) {
+    return;
+  }
+  if (!pendingSession) {
+    pendingSession = exchangeInitData(initData).finally(() => {
+      pendingSession = null;
+    });
+  }
+  sessionToken = await pendingSession;
+}
+
+export function clearSessionToken() {
+  sessionToken = null;
+}
+
 export function buildApiHeaders(optionsHeaders: HeadersInit = {}) {
   const headers = new Headers(optionsHeaders);
-  const initData = getTelegramInitDataHeader();
-  if (initData) {
-    headers.set(TELEGRAM_INITDATA_HEADER, initData);
+  if (sessionToken && sessionToken.expiresAt > Date.now()) {
+    headers.set("Authorization", `Bearer ${sessionToken.token}`);
+  } else {
+    const initData = getTelegramInitDataHeader();
+    if (initData) {
+      headers.set(TELEGRAM_INITDATA_HEADER, initData);
+    }
   }
   if (!headers.has("Content-Type")) {
     headers.set("Content-Type", "application/json");
@@ -47,8 +98,17 @@ export async function apiFetch<T>(path: string, options: RequestInit = {}): Prom
   if (!initData) {
     throw new Error("telegram_initdata_missing");
   }
+  await ensureSessionToken();
   const headers = buildApiHeaders(options.headers || {});
-  const response = await fetch(`${API_BASE}${path}`, { ...options, headers });
+  let response = await fetch(`${API_BASE}${path}`, { ...options, headers });
+  if (response.status === 401 && headers.has("Authorization")) {
+    clearSessionToken();
+    await ensureSessionToken();
+    response = await fetch(`${API_BASE}${path}`, {
+      ...options,
+      headers: buildApiHeaders(options.headers || {})
+    });
+  }
   if (!response.ok) {
     const detail = await parseErrorDetail(response);
     throw new Error(detail || "request_failed");
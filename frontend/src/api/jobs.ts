@@ -2,6 +2,7 @@ import {
   apiFetch,
   API_BASE,
   buildApiHeaders,
+  ensureSessionToken,
   getTelegramInitDataHeader
 } from "./client";
 
@@ -21,6 +22,8 @@ export type JobDetail = {
   result?: JobResultPayload | null;
   result_files?: Array<Record<string, unknown>> | null;
   error?: string | null;
+  own_jobs_ahead?: number | null;
+  eta_seconds?: number | null;
 };
 
 export type JobResult = {
@@ -60,6 +63,7 @@ export async function getJobDetail(id: string): Promise<JobDetailResponse> {
   if (!getTelegramInitDataHeader()) {
     return { ok: false, statusCode: 401, error: "telegram_initdata_missing" };
   }
+  await ensureSessionToken();
   const headers = buildApiHeaders();
   const response = await fetch(`${API_BASE}/jobs/${id}`, { headers });
   const text = await response.text();
@@ -81,6 +85,7 @@ export async function getJobResult(id: string): Promise<JobResultResponse> {
   if (!getTelegramInitDataHeader()) {
     return { status: "error", error: "telegram_initdata_missing", httpStatus: 401 };
   }
+  await ensureSessionToken();
   const headers = buildApiHeaders();
   const response = await fetch(`${API_BASE}/jobs/${id}/result`, { headers });
   const text = await response.text();
@@ -102,3 +107,70 @@ export async function getJobResult(id: string): Promise<JobResultResponse> {
   }
   return { ...payload, httpStatus: response.status };
 }
+
+export type JobEvent = {
+  id: string;
+  status: string;
+  error?: string | null;
+  updated_at?: string | null;
+  result?: JobResultPayload | null;
+  result_files?: Array<Record<string, unknown>> | null;
+};
+
+// Reads the job's Server-Sent Events stream with fetch so auth headers can be
+// sent. Resolves when the server closes the stream after a terminal event and
+// rejects if the stream cannot be opened or breaks.
+export async function streamJobEvents(
+  id: string,
+  onEvent: (event: JobEvent) => void,
+  signal: AbortSignal
+): Promise<void> {
+  await ensureSessionToken();
+  const response = await fetch(`${API_BASE}/jobs/${id}/events`, {
+    headers: buildApiHeaders({ Accept: "text/event-stream" }),
+    signal
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`events_unavailable_${response.status}`);
+  }
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) {
+      return;
+    }
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      const data = rawEvent
+        .split("\n")
+        .filter((line) => line.startsWith("data: "))
+        .map((line) => line.slice(6))
+        .join("\n");
+      if (data) {
+        onEvent(JSON.parse(data) as JobEvent);
+      }
+      boundary = buffer.indexOf("\n\n");
+    }
+  }
+}
+
+export type JobStatus = {
+  id: string;
+  status: string;
+  updated_at: string;
+  error?: string | null;
+  result_summary?: { type?: string; items: number; preview_url?: string | null } | null;
+};
+
+export async function getJobStatuses(ids: string[], since?: string) {
+  const params = new URLSearchParams({ ids: ids.join(",") });
+  if (since) {
+    params.set("since", since);
+  }
+  return apiFetch<{ items: JobStatus[]; server_time: string }>(`/jobs/status?${params}`);
+}
@@ -52,7 +52,8 @@ export const ru = {
     model: "Модель",
     parameters: "Параметры",
     externalLink: "Внешняя ссылка",
-    price: "Цена"
+    price: "Цена",
+    ownJobsAhead: "Ваших задач перед этой"
   },
   messages: {
     loadingPresets: "Загрузка пресетов...",
@@ -70,6 +71,7 @@ export const ru = {
   errors: {
     generationFailed: "Ошибка генерации",
     insufficientFunds: "Недостаточно средств на балансе.",
+    providerUnavailable: "Сервис генерации временно недоступен. Попробуйте позже.",
     requestFailed: "Не удалось выполнить запрос",
     copyFailed: "Не удалось скопировать",
     copySuccess: "Скопировано!"
@@ -1,17 +1,51 @@
 import { useEffect, useState } from "react";
-import { Job, listJobs } from "../api/jobs";
+import { getJobStatuses, Job, listJobs } from "../api/jobs";
 import { JobCard } from "../components/JobCard";
 import { ru } from "../i18n/ru";
 
 import { NavHandler } from "./types";
 
+const STATUS_REFRESH_MS = 5000;
+
+function isFinished(job: Job) {
+  return job.status === "done" || job.status === "error";
+}
+
 export function History({ onNavigate }: { onNavigate?: NavHandler }) {
   const [jobs, setJobs] = useState<Job[]>([]);
+  const activeIds = jobs.filter((job) => !isFinished(job)).map((job) => job.id);
+  const activeKey = activeIds.join(",");
 
   useEffect(() => {
     listJobs().then((data) => setJobs(data.items)).catch(() => setJobs([]));
   }, []);
 
+  // Refresh only the unfinished jobs, in one batched request that returns
+  // just the ones that changed since the previous answer.
+  useEffect(() => {
+    if (activeIds.length === 0) {
+      return;
+    }
+    let since: string | undefined;
+    const timer = window.setInterval(() => {
+      getJobStatuses(activeIds, since)
+        .then((data) => {
+          since = data.server_time;
+          const updates = new Map(data.items.map((item) => [item.id, item.status]));
+          if (updates.size === 0) {
+            return;
+          }
+          setJobs((current) =>
+            current.map((job) =>
+              updates.has(job.id) ? { ...job, status: updates.get(job.id) as string } : job
+            )
+          );
+        })
+        .catch(() => undefined);
+    }, STATUS_REFRESH_MS);
+    return () => window.clearInterval(timer);
+  }, [activeKey]);
+
   return (
     <div className="flex flex-col gap-4">
       <h2 className="text-xl font-semibold">{ru.titles.history}</h2>
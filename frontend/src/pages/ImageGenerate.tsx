@@ -1,6 +1,13 @@
 import { useEffect, useMemo, useState } from "react";
 import { hasTelegramInitData } from "../api/client";
-import { createJob, getJobDetail, listJobs, type Job, type JobDetail } from "../api/jobs";
+import {
+  createJob,
+  getJobDetail,
+  listJobs,
+  streamJobEvents,
+  type Job,
+  type JobDetail
+} from "../api/jobs";
 import { GenerationForm, GenerationParams } from "../components/GenerationForm";
 import { JobCard } from "../components/JobCard";
 import { ResultPanel } from "../components/ResultPanel";
@@ -55,6 +62,9 @@ export function ImageGenerate({ onNavigate }: { onNavigate: NavHandler }) {
         }
       });
       localStorage.setItem("last_job_id", job.id);
+      if (job.eta_seconds) {
+        setActiveEtaSeconds(job.eta_seconds);
+      }
       setJobs((current) => [job, ...current.filter((item) => item.id !== job.id)]);
       setActiveJobId(job.id);
       setActiveJob(job);
@@ -64,6 +74,8 @@ export function ImageGenerate({ onNavigate }: { onNavigate: NavHandler }) {
       const message = err instanceof Error ? err.message : "";
       if (message === "Not enough credits.") {
         setError(ru.errors.insufficientFunds);
+      } else if (message === "provider_unavailable") {
+        setError(ru.errors.providerUnavailable);
       } else if (message === "telegram_initdata_missing") {
         setError(ru.messages.telegramInitDataMissing);
       } else {
@@ -115,16 +127,38 @@ export function ImageGenerate({ onNavigate }: { onNavigate: NavHandler }) {
       }
     };
 
+    const startPolling = () => {
+      timer = window.setInterval(fetchJob, 2500);
+      timeoutTimer = window.setTimeout(() => {
+        setIsPolling(false);
+        if (timer) {
+          window.clearInterval(timer);
+        }
+      }, 180 * 1000);
+    };
+
+    const controller = new AbortController();
     fetchJob();
-    timer = window.setInterval(fetchJob, 2500);
-    timeoutTimer = window.setTimeout(() => {
-      setIsPolling(false);
-      if (timer) {
-        window.clearInterval(timer);
-      }
-    }, 180 * 1000);
+    let streamFinished = false;
+    streamJobEvents(
+      activeJobId,
+      (event) => {
+        if (event.status === "done" || event.status === "error") {
+          streamFinished = true;
+        }
+        fetchJob();
+      },
+      controller.signal
+    )
+      .catch(() => undefined)
+      .then(() => {
+        if (!controller.signal.aborted && !streamFinished) {
+          startPolling();
+        }
+      });
 
     return () => {
+      controller.abort();
       if (timer) {
         window.clearInterval(timer);
       }
@@ -2,6 +2,7 @@ import { useEffect, useMemo, useState } from "react";
 import {
   getJobDetail,
   getJobResult,
+  streamJobEvents,
   type JobDetail,
   type JobResultPayload,
   type ResultItem
@@ -159,16 +160,40 @@ export function JobDetails({
       }
     };
 
+    const startPolling = () => {
+      timer = window.setInterval(fetchJob, 2000);
+      timeoutTimer = window.setTimeout(() => {
+        setIsPolling(false);
+        if (timer) {
+          window.clearInterval(timer);
+        }
+      }, 180 * 1000);
+    };
+
+    // Refresh on each pushed status change. If the stream cannot be opened or
+    // ends before a terminal event, fall back to polling until the job is final.
+    const controller = new AbortController();
     fetchJob();
-    timer = window.setInterval(fetchJob, 2000);
-    timeoutTimer = window.setTimeout(() => {
-      setIsPolling(false);
-      if (timer) {
-        window.clearInterval(timer);
-      }
-    }, 180 * 1000);
+    let streamFinished = false;
+    streamJobEvents(
+      jobId,
+      (event) => {
+        if (event.status === "done" || event.status === "error") {
+          streamFinished = true;
+        }
+        fetchJob();
+      },
+      controller.signal
+    )
+      .catch(() => undefined)
+      .then(() => {
+        if (!controller.signal.aborted && !streamFinished) {
+          startPolling();
+        }
+      });
 
     return () => {
+      controller.abort();
       if (timer) {
         window.clearInterval(timer);
       }
@@ -244,6 +269,11 @@ export function JobDetails({
             <div className="text-sm text-gray-500">
               {ru.labels.status}: {formatStatus(job.status)} · {formatDateTime(job.created_at)}
             </div>
+            {job.status === "queued" && job.own_jobs_ahead != null ? (
+              <div className="text-sm text-gray-500">
+                {ru.labels.ownJobsAhead}: {job.own_jobs_ahead}
+              </div>
+            ) : null}
           </>
         ) : null}
       </div>